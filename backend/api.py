@@ -2,15 +2,34 @@
 
 from core.logging_utils import logger
 from core.config import config
-from core.storage import save_session
-from core.question_bank import generate_questions
+from core.storage import (
+    enqueue_save_session,
+    get_storage_stats,
+    get_tech_stack_stats,
+    iter_sessions,
+    shutdown_storage
+)
+from core.admission import AdmissionRejected, LLMAdmission, TokenBucketLimiter
+from core.idempotency import (
+    IdempotencyKeyReusedError,
+    lookup_response,
+    request_fingerprint,
+    store_response
+)
+from core.question_bank import async_question_flights, generate_questions_async
+from core.retention import create_retention_scheduler
+from core.session_locks import SessionLocks
+from core.session_state import SessionConflictError
+from core.session_store import get_session_store
 from core.prompts import (
     get_system_prompt,
     get_greeting_message,
     get_exit_handler,
     get_fallback_prompt
 )
-from core.llm import get_llm_provider
+from core.llm import LLMStreamError, close_async_llm_provider, get_async_llm_provider
+from core.llm_cache import get_llm_cache
+from core.question_pool import get_question_pool
 from core.validators import (
     validate_full_name,
     validate_email,
@@ -20,12 +39,25 @@ from core.validators import (
     validate_desired_position,
     validate_current_location
 )
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import HTTPConnection
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List, Dict, Any
+from collections import OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from typing import Optional, List, Dict, Any, AsyncIterator, Awaitable, Callable, Iterator, Tuple
+import asyncio
+import copy
+import hashlib
+import json
+import math
+import os
+import secrets
+import socket
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
 import sys
 from pathlib import Path
@@ -46,8 +78,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory session storage (replace with database in production)
-sessions: Dict[str, Dict[str, Any]] = {}
+# Live session state, capped in memory and hibernated to disk when idle
+sessions = get_session_store()
+
+# One turn at a time per session, so retries and double submits never interleave
+session_locks = SessionLocks()
+
+# Questions being generated while the remaining fields are collected:
+# session_id -> (tech stack, task), oldest first
+question_tasks: "OrderedDict[str, Tuple[Tuple[str, ...], asyncio.Task]]" = OrderedDict()
+
+# Admission control: a cap on concurrent LLM calls with a bounded wait queue,
+# and per-client token buckets (None when RATE_LIMIT_PER_MINUTE is 0)
+llm_admission = LLMAdmission(
+    max_concurrent=config.LLM_MAX_CONCURRENT,
+    max_queue=config.LLM_MAX_QUEUE,
+    max_wait=config.LLM_QUEUE_TIMEOUT_SECONDS
+)
+rate_limiter = (
+    TokenBucketLimiter(config.RATE_LIMIT_PER_MINUTE, config.RATE_LIMIT_BURST)
+    if config.RATE_LIMIT_PER_MINUTE > 0 else None
+)
+
+# Question generation jobs: tasks are referenced here by job id until they
+# finish, and at most QUESTION_JOB_WORKERS of them call the LLM at once
+question_job_tasks: Dict[str, asyncio.Task] = {}
+question_job_slots = asyncio.Semaphore(max(1, config.QUESTION_JOB_WORKERS))
+
+# Identifies this worker process as the owner of the jobs it runs
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Coroutine that pushes a progress event to the client during a turn
+Notify = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Periodic purge of stored sessions (None unless RETENTION_* is configured)
+retention_scheduler = create_retention_scheduler()
 
 
 # Request/Response Models
@@ -76,6 +141,9 @@ class SessionResponse(BaseModel):
     collected_fields: Dict[str, Any]
     missing_fields: List[str]
     chat_history: List[Dict[str, str]]
+    # Index of chat_history[0] in the full history, and the full length
+    history_start: int = 0
+    history_total: int = 0
 
 
 class MessageResponse(BaseModel):
@@ -84,7 +152,7 @@ class MessageResponse(BaseModel):
     conversation_stage: str
     fields_collected: Dict[str, Any]
     missing_fields: List[str]
-    questions: Optional[List[Dict[str, str]]] = None
+    questions: Optional[List[Dict[str, Any]]] = None
 
 
 class QuestionGenerationRequest(BaseModel):
@@ -95,17 +163,151 @@ class QuestionGenerationRequest(BaseModel):
 # Helper functions
 def get_or_create_session(session_id: str) -> Dict[str, Any]:
     """Get or create a session."""
-    if session_id not in sessions:
-        sessions[session_id] = {
-            "session_id": session_id,
-            "conversation_stage": "greeting",
-            "collected_fields": {},
-            "chat_history": [],
-            "llm_messages": [],
-            "questions_generated": False,
-            "created_at": datetime.now().isoformat()
-        }
-    return sessions[session_id]
+    return sessions.get_or_create(session_id, lambda: {
+        "session_id": session_id,
+        "conversation_stage": "greeting",
+        "collected_fields": {},
+        "chat_history": [],
+        "llm_messages": [],
+        "questions_generated": False,
+        "created_at": datetime.now().isoformat()
+    })
+
+
+def get_existing_session(session_id: str) -> Dict[str, Any]:
+    """Get a session, raising 404 for unknown ids instead of creating one."""
+    session = sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session
+
+
+def save_session_state(session_id: str, session: Dict[str, Any]) -> None:
+    """Persist changes to a session, raising 409 if another worker changed it first."""
+    try:
+        sessions.save(session_id, session)
+    except SessionConflictError:
+        raise HTTPException(
+            status_code=409, detail="Session was modified concurrently; please retry"
+        ) from None
+
+
+def require_admin(admin_key: Optional[str]) -> None:
+    """Reject the request unless it carries the configured admin key; fail closed if none is set."""
+    if not config.ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_API_KEY")
+    if not secrets.compare_digest(admin_key or "", config.ADMIN_API_KEY):
+        raise HTTPException(status_code=401, detail="Invalid or missing admin key")
+
+
+def _too_many_requests(detail: str, retry_after: float) -> HTTPException:
+    """Build a 429 error carrying a Retry-After header."""
+    return HTTPException(
+        status_code=429, detail=detail, headers={"Retry-After": str(math.ceil(retry_after))}
+    )
+
+
+def _rate_limit_key(connection: HTTPConnection, session_id: str) -> str:
+    """Identify the client a request counts against."""
+    if config.RATE_LIMIT_KEY == "session":
+        return session_id
+    if config.RATE_LIMIT_CLIENT_HEADER:
+        forwarded = connection.headers.get(config.RATE_LIMIT_CLIENT_HEADER, "")
+        # The trusted proxy appends the address it saw; earlier entries come from the client
+        client = forwarded.split(",")[-1].strip()
+        if client:
+            return client
+    return connection.client.host if connection.client else "unknown"
+
+
+def check_rate_limit(connection: HTTPConnection, session_id: str) -> None:
+    """Reject the request with 429 if the client has used up its rate limit."""
+    if rate_limiter is None:
+        return
+    wait = rate_limiter.acquire(_rate_limit_key(connection, session_id))
+    if wait > 0:
+        raise _too_many_requests("Rate limit exceeded; please slow down", wait)
+
+
+@asynccontextmanager
+async def llm_slot(background: bool = False) -> AsyncIterator[None]:
+    """Hold one of the global LLM slots, raising 429 when none frees up in time."""
+    async with AsyncExitStack() as stack:
+        try:
+            await stack.enter_async_context(llm_admission.slot(background))
+        except AdmissionRejected as e:
+            raise _too_many_requests("Server is busy; please retry", e.retry_after) from None
+        yield
+
+
+@contextmanager
+def _rollback_on_error(session: Dict[str, Any]) -> Iterator[None]:
+    """
+    Undo a turn's changes to a session when it fails or is cancelled.
+
+    Resident sessions are changed in place, so without this a turn
+    rejected part-way (e.g. with 429 while waiting for an LLM slot) would
+    leave its field stored and the retry would skip past it. The same
+    goes for provider errors, a client that disconnects mid-turn and
+    cancellation.
+    """
+    snapshot = copy.deepcopy(session)
+    try:
+        yield
+    except BaseException:
+        session.clear()
+        session.update(snapshot)
+        raise
+
+
+def _error_data(e: HTTPException) -> Dict[str, Any]:
+    """Describe an error for a stream or WebSocket event."""
+    data = {"status": e.status_code, "detail": e.detail}
+    if e.headers and "Retry-After" in e.headers:
+        data["retry_after"] = int(e.headers["Retry-After"])
+    return data
+
+
+def _replayed_response(
+    session: Dict[str, Any],
+    idempotency_key: Optional[str],
+    fingerprint: str
+) -> Optional[MessageResponse]:
+    """Get the stored reply to a retried request, raising 422 if the key was reused."""
+    if not idempotency_key:
+        return None
+    try:
+        stored = lookup_response(session, idempotency_key, fingerprint)
+    except IdempotencyKeyReusedError:
+        raise HTTPException(
+            status_code=422, detail="Idempotency-Key was already used for a different request"
+        ) from None
+    return MessageResponse(**stored) if stored is not None else None
+
+
+def _session_etag(page: Dict[str, Any]) -> str:
+    """
+    Entity tag for one page of a session, derived from the page itself.
+
+    A turn changes the session in memory before it is saved, so any
+    counter bumped on save would let a GET made mid-turn return 304 for
+    content that has already changed.
+    """
+    body = json.dumps(page, sort_keys=True, separators=(",", ":"), default=str)
+    return '"' + hashlib.blake2b(body.encode("utf-8"), digest_size=12).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an entity tag (weak comparison)."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def _sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 
 def check_exit_keyword(text: str) -> bool:
@@ -114,6 +316,48 @@ def check_exit_keyword(text: str) -> bool:
     return any(keyword in text_lower for keyword in config.EXIT_KEYWORDS)
 
 
+@app.on_event("startup")
+def on_startup():
+    """Start background maintenance tasks."""
+    if retention_scheduler is not None:
+        retention_scheduler.start()
+
+
+@app.on_event("shutdown")
+async def stop_question_jobs():
+    """Cancel running question jobs, which marks them failed, before sessions are hibernated."""
+    tasks = list(question_job_tasks.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    """Stop background tasks and flush queued session saves."""
+    if retention_scheduler is not None:
+        retention_scheduler.stop()
+    sessions.close()
+    shutdown_storage()
+
+
+@app.on_event("startup")
+async def start_llm_clients():
+    """Open pooled LLM connections if LLM_WARMUP is set, and start the health check."""
+    llm_provider = get_async_llm_provider()
+    if config.LLM_WARMUP:
+        await llm_provider.warm_up()
+    llm_provider.start_health_probe(config.LLM_HEALTH_CHECK_INTERVAL)
+
+
+@app.on_event("shutdown")
+async def close_llm_clients():
+    """Close pooled connections held by the async LLM provider and the response cache."""
+    await close_async_llm_provider()
+    if get_llm_cache() is not None:
+        get_llm_cache().close()
+
+
 # API Endpoints
 @app.get("/")
 def root():
@@ -121,6 +365,54 @@ def root():
     return {"message": "TalentScout API", "version": "1.0.0"}
 
 
+@app.get("/api/metrics")
+def metrics():
+    """Operational metrics for storage and background workers."""
+    return {
+        "storage": get_storage_stats(),
+        "sessions": sessions.stats(),
+        "retention": retention_scheduler.stats() if retention_scheduler else None,
+        "llm": get_async_llm_provider().stats(),
+        "llm_cache": get_llm_cache().stats() if get_llm_cache() else None,
+        "question_pool": get_question_pool().stats() if get_question_pool() else None,
+        "question_flights": async_question_flights.stats(),
+        "admission": {
+            "llm": llm_admission.stats(),
+            "rate_limit": rate_limiter.stats() if rate_limiter else None
+        }
+    }
+
+
+@app.get("/api/export/sessions.ndjson")
+def export_sessions(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    tech: Optional[str] = None,
+    x_admin_key: Optional[str] = Header(default=None)
+):
+    """Stream stored sessions as NDJSON, one record per line."""
+    require_admin(x_admin_key)
+
+    def generate() -> Iterator[str]:
+        for session_data in iter_sessions(since=since, until=until, tech=tech):
+            yield json.dumps(session_data) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@app.get("/api/stats/tech-stack")
+def tech_stack_stats(
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    tech: Optional[str] = None,
+    limit: int = 20,
+    x_admin_key: Optional[str] = Header(default=None)
+):
+    """Count stored sessions per listed technology from precomputed counters."""
+    require_admin(x_admin_key)
+    return get_tech_stack_stats(since=since, until=until, tech=tech, limit=limit)
+
+
 @app.post("/api/sessions", response_model=SessionResponse)
 def create_session():
     """Create a new session."""
@@ -134,34 +426,237 @@ def create_session():
         {"role": "system", "content": get_system_prompt()})
     session["llm_messages"].append({"role": "assistant", "content": greeting})
     session["conversation_stage"] = "collection"
+    save_session_state(session_id, session)
 
     return SessionResponse(
         session_id=session_id,
         conversation_stage=session["conversation_stage"],
         collected_fields=session["collected_fields"],
         missing_fields=_get_missing_fields(session),
-        chat_history=session["chat_history"]
+        chat_history=session["chat_history"],
+        history_total=len(session["chat_history"])
     )
 
 
 @app.get("/api/sessions/{session_id}", response_model=SessionResponse)
-def get_session(session_id: str):
-    """Get session information."""
-    session = get_or_create_session(session_id)
-    return SessionResponse(
+def get_session(
+    session_id: str,
+    response: Response,
+    since: int = 0,
+    limit: Optional[int] = None,
+    if_none_match: Optional[str] = Header(default=None)
+):
+    """
+    Get session information.
+
+    chat_history holds only messages from index since onwards, at most
+    limit of them, so polling clients can fetch just what is new. The
+    response carries an ETag; a matching If-None-Match gets 304.
+    """
+    if since < 0 or (limit is not None and limit < 1):
+        raise HTTPException(status_code=400, detail="since must be >= 0 and limit >= 1")
+    session = get_existing_session(session_id)
+
+    history = session["chat_history"]
+    end = len(history) if limit is None else since + limit
+    page = SessionResponse(
         session_id=session_id,
         conversation_stage=session["conversation_stage"],
         collected_fields=session["collected_fields"],
         missing_fields=_get_missing_fields(session),
-        chat_history=session["chat_history"]
+        chat_history=history[since:end],
+        history_start=min(since, len(history)),
+        history_total=len(history)
     )
 
+    etag = _session_etag(page.model_dump())
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return page
+
 
 @app.post("/api/message", response_model=MessageResponse)
-def send_message(request: MessageRequest):
-    """Send a message and get response."""
-    session = get_or_create_session(request.session_id)
+async def send_message(
+    request: MessageRequest,
+    http_request: Request,
+    http_response: Response,
+    idempotency_key: Optional[str] = Header(default=None)
+):
+    """Send a message and get response; retries with the same Idempotency-Key are replayed."""
+    check_rate_limit(http_request, request.session_id)
+    fingerprint = request_fingerprint(request.message)
+    async with session_locks.lock(request.session_id):
+        session = await run_in_threadpool(get_or_create_session, request.session_id)
+        replay = _replayed_response(session, idempotency_key, fingerprint)
+        if replay is not None:
+            http_response.headers["Idempotent-Replayed"] = "true"
+            return replay
+
+        with _rollback_on_error(session):
+            response = await _process_message(session, request)
+        if idempotency_key:
+            store_response(session, idempotency_key, fingerprint, response.model_dump())
+        await run_in_threadpool(save_session_state, request.session_id, session)
+        return response
+
+
+@app.post("/api/message/stream")
+async def stream_message(
+    request: MessageRequest,
+    http_request: Request,
+    idempotency_key: Optional[str] = Header(default=None)
+):
+    """Send a message and stream the response as Server-Sent Events."""
+    check_rate_limit(http_request, request.session_id)
+    fingerprint = request_fingerprint(request.message)
+    llm_provider = get_async_llm_provider()
+
+    # Fail with a status code while one can still be sent
+    if not llm_provider.is_available():
+        raise HTTPException(status_code=500, detail="LLM provider not available")
+    if idempotency_key:
+        existing = await run_in_threadpool(sessions.get, request.session_id)
+        if existing is not None:
+            _replayed_response(existing, idempotency_key, fingerprint)
+
+    async def generate() -> AsyncIterator[str]:
+        # The lock is taken here rather than before the response starts, so
+        # it is always released when the client goes away
+        async with session_locks.lock(request.session_id):
+            try:
+                session = await run_in_threadpool(get_or_create_session, request.session_id)
+                replay = _replayed_response(session, idempotency_key, fingerprint)
+                if replay is not None:
+                    yield _sse_event("token", {"text": replay.response})
+                    yield _sse_event("done", replay.model_dump())
+                    return
+
+                with _rollback_on_error(session):
+                    final = await _begin_turn(session, request)
+                    if final is None:
+                        messages = _prepare_llm_messages(session, request.message)
+                        chunks = []
+                        async for chunk in _stream_reply(messages):
+                            chunks.append(chunk)
+                            yield _sse_event("token", {"text": chunk})
+                        final = await _finish_conversation_turn(session, request.session_id, "".join(chunks))
+
+                if idempotency_key:
+                    store_response(session, idempotency_key, fingerprint, final.model_dump())
+                await run_in_threadpool(save_session_state, request.session_id, session)
+            except HTTPException as e:
+                yield _sse_event("error", _error_data(e))
+                return
+            yield _sse_event("done", final.model_dump())
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.websocket("/api/ws/{session_id}")
+async def chat_websocket(websocket: WebSocket, session_id: str):
+    """Carry a whole conversation over one WebSocket, pushing progress as it happens."""
+    if not await run_in_threadpool(sessions.__contains__, session_id):
+        await websocket.close(code=4404, reason="Session not found")
+        return
+    await websocket.accept()
+
+    async def notify(event: Dict[str, Any]) -> None:
+        await websocket.send_json(event)
+
+    try:
+        while True:
+            try:
+                data = await websocket.receive_json()
+                message = str(data.get("message", "")).strip()
+            except (ValueError, AttributeError, KeyError):
+                # Invalid JSON, JSON that is not an object, or a binary frame
+                message = ""
+            if not message:
+                await notify({"type": "error", "status": 422, "detail": "Send {\"message\": \"...\"}"})
+                continue
+            try:
+                check_rate_limit(websocket, session_id)
+            except HTTPException as e:
+                await notify({"type": "error", **_error_data(e)})
+                continue
+
+            async with session_locks.lock(session_id):
+                # Reload each turn; another worker may have advanced the session
+                session = await run_in_threadpool(sessions.get, session_id)
+                if session is None:
+                    await websocket.close(code=4404, reason="Session not found")
+                    return
+
+                request = MessageRequest(session_id=session_id, message=message)
+                try:
+                    with _rollback_on_error(session):
+                        response = await _begin_turn(session, request, notify)
+                        if response is None:
+                            messages = _prepare_llm_messages(session, message)
+                            chunks = []
+                            async for chunk in _stream_reply(messages):
+                                chunks.append(chunk)
+                                await notify({"type": "token", "text": chunk})
+                            response = await _finish_conversation_turn(session, session_id, "".join(chunks))
+                    await run_in_threadpool(save_session_state, session_id, session)
+                except HTTPException as e:
+                    await notify({"type": "error", **_error_data(e)})
+                    continue
+
+            await notify({"type": "done", **response.model_dump()})
+    except WebSocketDisconnect:
+        logger.info("Chat WebSocket disconnected")
+
+
+async def _stream_reply(messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+    """Stream a chat completion while holding an LLM slot; a reply cut short raises 502."""
+    async with llm_slot():
+        try:
+            async for chunk in get_async_llm_provider().stream_response(
+                messages=messages,
+                temperature=0.7,
+                max_tokens=500
+            ):
+                yield chunk
+        except LLMStreamError:
+            raise HTTPException(status_code=502, detail="LLM response was interrupted") from None
+
+
+async def _process_message(session: Dict[str, Any], request: MessageRequest) -> MessageResponse:
+    """Apply one user message to a session and build the reply."""
+    response = await _begin_turn(session, request)
+    if response is not None:
+        return response
 
+    # Handle questions stage or general conversation
+    messages = _prepare_llm_messages(session, request.message)
+    async with llm_slot():
+        reply = await get_async_llm_provider().generate_response(
+            messages=messages,
+            temperature=0.7,
+            max_tokens=500
+        )
+    return await _finish_conversation_turn(session, request.session_id, reply)
+
+
+async def _begin_turn(
+    session: Dict[str, Any],
+    request: MessageRequest,
+    notify: Optional[Notify] = None
+) -> Optional[MessageResponse]:
+    """
+    Handle the parts of a turn that need no chat completion.
+
+    Returns the reply for exit and collection turns, or None when the
+    message should be answered by the LLM. notify, if given, receives
+    progress events while a collection turn runs.
+    """
     # Check for exit keywords
     if check_exit_keyword(request.message):
         exit_msg = get_exit_handler()
@@ -182,114 +677,194 @@ def send_message(request: MessageRequest):
     session["chat_history"].append(
         {"role": "user", "content": request.message})
 
-    stage = session["conversation_stage"]
-    llm_provider = get_llm_provider()
+    llm_provider = get_async_llm_provider()
 
     if not llm_provider.is_available():
         raise HTTPException(
             status_code=500, detail="LLM provider not available")
 
     # Handle collection stage
-    if stage == "collection":
-        missing_fields = _get_missing_fields(session)
-
-        if missing_fields:
-            # Try to extract and validate field from message
-            next_field = missing_fields[0]
-            validation_result = _validate_and_store_field(
-                session, next_field, request.message
-            )
+    if session["conversation_stage"] == "collection" and _get_missing_fields(session):
+        return await _collection_turn(session, request.message, notify)
+
+    return None
+
+
+async def _collection_turn(
+    session: Dict[str, Any],
+    message: str,
+    notify: Optional[Notify] = None
+) -> MessageResponse:
+    """Validate the message as the next missing field and ask for the one after."""
+    # Try to extract and validate field from message
+    next_field = _get_missing_fields(session)[0]
+    validation_result = _validate_and_store_field(session, next_field, message)
+
+    if not validation_result["valid"]:
+        error_msg = validation_result.get(
+            "error", "Invalid input. Please try again.")
+        next_question = _get_field_prompt(next_field)
+        response = f"{error_msg}\n\n{next_question}"
+        session["chat_history"].append(
+            {"role": "assistant", "content": response})
 
-            if validation_result["valid"]:
-                confirmation = validation_result.get(
-                    "confirmation", f"Got it! {request.message}")
-                session["chat_history"].append(
-                    {"role": "assistant", "content": confirmation})
-
-                # Check if all fields collected
-                if not _get_missing_fields(session):
-                    # Generate questions
-                    tech_stack = session["collected_fields"].get(
-                        "tech_stack", [])
-                    if isinstance(tech_stack, str):
-                        tech_stack = [tech_stack]
-
-                    questions = generate_questions(tech_stack)
-                    session["questions_generated"] = True
-                    session["conversation_stage"] = "questions"
-
-                    questions_text = "\n\n".join([
-                        f"{i+1}. [{q.get('difficulty_stars', '★')}] {q.get('text', '')}"
-                        for i, q in enumerate(questions)
-                    ])
-
-                    response = f"Great! I have all the information I need. Here are your tailored technical questions:\n\n{questions_text}\n\nPlease answer these questions to the best of your ability."
-                    session["chat_history"].append(
-                        {"role": "assistant", "content": response})
-
-                    return MessageResponse(
-                        response=response,
-                        conversation_stage="questions",
-                        fields_collected=session["collected_fields"],
-                        missing_fields=[],
-                        questions=questions
-                    )
-                else:
-                    # Ask for next field
-                    next_missing = _get_missing_fields(session)[0]
-                    next_question = _get_field_prompt(next_missing)
-                    session["chat_history"].append(
-                        {"role": "assistant", "content": next_question})
-
-                    return MessageResponse(
-                        response=next_question,
-                        conversation_stage="collection",
-                        fields_collected=session["collected_fields"],
-                        missing_fields=_get_missing_fields(session)
-                    )
-            else:
-                # Validation failed
-                error_msg = validation_result.get(
-                    "error", "Invalid input. Please try again.")
-                next_question = _get_field_prompt(next_field)
-                response = f"{error_msg}\n\n{next_question}"
-                session["chat_history"].append(
-                    {"role": "assistant", "content": response})
-
-                return MessageResponse(
-                    response=response,
-                    conversation_stage="collection",
-                    fields_collected=session["collected_fields"],
-                    missing_fields=_get_missing_fields(session)
-                )
+        return MessageResponse(
+            response=response,
+            conversation_stage="collection",
+            fields_collected=session["collected_fields"],
+            missing_fields=_get_missing_fields(session)
+        )
 
-    # Handle questions stage or general conversation
+    confirmation = validation_result.get(
+        "confirmation", f"Got it! {message}")
+    session["chat_history"].append(
+        {"role": "assistant", "content": confirmation})
+    if notify is not None:
+        await notify({"type": "confirmation", "field": next_field, "text": confirmation})
+    if next_field == "tech_stack":
+        _start_question_generation(session["session_id"], _get_tech_stack(session))
+
+    # Ask for next field until all are collected
+    missing_fields = _get_missing_fields(session)
+    if missing_fields:
+        next_question = _get_field_prompt(missing_fields[0])
+        session["chat_history"].append(
+            {"role": "assistant", "content": next_question})
+
+        return MessageResponse(
+            response=next_question,
+            conversation_stage="collection",
+            fields_collected=session["collected_fields"],
+            missing_fields=missing_fields
+        )
+
+    # Generate questions, pushing each one as soon as it is parsed
+    on_question: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    if notify is not None:
+        await notify({"type": "progress", "stage": "generating_questions"})
+
+        async def push_question(question: Dict[str, Any]) -> None:
+            await notify({"type": "question", "question": question})
+
+        on_question = push_question
+
+    questions = _cached_questions(session)
+    if questions is None:
+        questions = await _collect_questions(session["session_id"], _get_tech_stack(session), on_question)
+        _cache_questions(session, questions)
+    elif on_question is not None:
+        for question in questions:
+            await on_question(question)
+    session["conversation_stage"] = "questions"
+
+    questions_text = "\n\n".join([
+        f"{i+1}. [{q.get('difficulty_stars', '★')}] {q.get('text', '')}"
+        for i, q in enumerate(questions)
+    ])
+
+    response = f"Great! I have all the information I need. Here are your tailored technical questions:\n\n{questions_text}\n\nPlease answer these questions to the best of your ability."
+    session["chat_history"].append(
+        {"role": "assistant", "content": response})
+
+    return MessageResponse(
+        response=response,
+        conversation_stage="questions",
+        fields_collected=session["collected_fields"],
+        missing_fields=[],
+        questions=questions
+    )
+
+
+def _start_question_generation(session_id: str, tech_stack: List[str]) -> None:
+    """Start generating questions in the background as soon as the tech stack is known."""
+    previous = question_tasks.pop(session_id, None)
+    if previous is not None:
+        previous[1].cancel()
+    task = asyncio.create_task(_generate_questions(tech_stack, background=True))
+    question_tasks[session_id] = (tuple(tech_stack), task)
+
+    # Abandoned conversations must not pin tasks forever
+    while len(question_tasks) > config.SESSION_MAX_RESIDENT:
+        _, (_, stale) = question_tasks.popitem(last=False)
+        stale.cancel()
+
+
+async def _generate_questions(
+    tech_stack: List[str],
+    on_question: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    background: bool = False
+) -> List[Dict[str, Any]]:
+    """Generate questions, holding an LLM slot only while the provider is called."""
+    return await generate_questions_async(tech_stack, on_question, admission=lambda: llm_slot(background))
+
+
+async def _collect_questions(
+    session_id: str,
+    tech_stack: List[str],
+    on_question: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    background: bool = False
+) -> List[Dict[str, Any]]:
+    """Get the questions started in the background, or generate them now."""
+    entry = question_tasks.pop(session_id, None)
+    if entry is not None:
+        stack, task = entry
+        # Another worker may have handled the tech stack turn, or it changed since
+        if stack == tuple(tech_stack) and not task.cancelled():
+            try:
+                questions = await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # Only the task's own cancellation falls through; this
+                # request being cancelled still propagates
+                if not task.cancelled():
+                    task.cancel()
+                    raise
+                questions = None
+            except Exception as e:
+                logger.warning(f"Background question generation failed: {e}")
+                questions = None
+            if questions:
+                if on_question is not None:
+                    for question in questions:
+                        await on_question(question)
+                return questions
+        else:
+            task.cancel()
+
+    return await _generate_questions(tech_stack, on_question, background)
+
+
+def _prepare_llm_messages(session: Dict[str, Any], message: str) -> List[Dict[str, str]]:
+    """Add the user's message to the LLM conversation and return it."""
     session["llm_messages"].append(
-        {"role": "user", "content": request.message})
+        {"role": "user", "content": message})
 
     # Ensure system prompt is first
     if not session["llm_messages"] or session["llm_messages"][0].get("role") != "system":
         session["llm_messages"] = [
             {"role": "system", "content": get_system_prompt()}] + session["llm_messages"]
 
-    # Generate response
-    response = llm_provider.generate_response(
-        messages=session["llm_messages"],
-        temperature=0.7,
-        max_tokens=500
-    )
+    return session["llm_messages"]
+
 
+async def _finish_conversation_turn(
+    session: Dict[str, Any],
+    session_id: str,
+    response: Optional[str]
+) -> MessageResponse:
+    """Record the LLM's reply in the session and queue the candidate record save."""
     if response:
         session["chat_history"].append(
             {"role": "assistant", "content": response})
         session["llm_messages"].append(
             {"role": "assistant", "content": response})
 
-        # Save session if storage is enabled
+        # Queue a save if storage is enabled; the write happens off the request path
         if config.ENABLE_STORAGE and not _get_missing_fields(session):
+            # Writes synchronously when write-behind is off or its queue is full
             try:
-                save_session(
-                    session_id=request.session_id,
+                await run_in_threadpool(
+                    enqueue_save_session,
+                    session_id=session_id,
                     collected_fields=session["collected_fields"],
                     tech_stack=session["collected_fields"].get(
                         "tech_stack", []),
@@ -311,31 +886,251 @@ def send_message(request: MessageRequest):
     )
 
 
+def _cached_questions(session: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """Get the questions stored on a session, if they match its current tech stack."""
+    if session.get("questions") and session.get("questions_tech_stack") == _get_tech_stack(session):
+        return session["questions"]
+    return None
+
+
+def _cache_questions(session: Dict[str, Any], questions: List[Dict[str, Any]]) -> None:
+    """Store generated questions on a session."""
+    session["questions"] = questions
+    session["questions_tech_stack"] = list(_get_tech_stack(session))
+    session["questions_generated"] = True
+
+
 @app.post("/api/generate-questions")
-def generate_questions_endpoint(request: QuestionGenerationRequest):
-    """Generate questions for a session."""
-    session = get_or_create_session(request.session_id)
+async def generate_questions_endpoint(request: QuestionGenerationRequest, http_request: Request):
+    """Generate questions for a session, reusing ones already generated."""
+    check_rate_limit(http_request, request.session_id)
+    async with session_locks.lock(request.session_id):
+        session = await run_in_threadpool(get_existing_session, request.session_id)
 
-    tech_stack = session["collected_fields"].get("tech_stack", [])
-    if isinstance(tech_stack, str):
-        tech_stack = [tech_stack]
+        tech_stack = _get_tech_stack(session)
 
-    if not tech_stack:
-        raise HTTPException(status_code=400, detail="Tech stack not provided")
+        if not tech_stack:
+            raise HTTPException(status_code=400, detail="Tech stack not provided")
 
-    questions = generate_questions(tech_stack)
-    session["questions_generated"] = True
+        questions = _cached_questions(session)
+        if questions is None:
+            questions = await _collect_questions(request.session_id, tech_stack)
+            _cache_questions(session, questions)
+            await run_in_threadpool(save_session_state, request.session_id, session)
 
     return {"questions": questions}
 
 
+def _job_lost(job: Dict[str, Any]) -> bool:
+    """
+    Whether a pending job will never finish.
+
+    That is the case when this worker owns it but no longer runs it (e.g.
+    it was restarted), or when its owner has not renewed its lease for
+    QUESTION_JOB_LEASE_SECONDS.
+    """
+    if job["status"] not in ("queued", "running"):
+        return False
+    if job.get("owner") == WORKER_ID:
+        return job["job_id"] not in question_job_tasks
+    heartbeat = datetime.fromisoformat(job.get("heartbeat_at") or job["created_at"])
+    return (datetime.now() - heartbeat).total_seconds() > config.QUESTION_JOB_LEASE_SECONDS
+
+
+def _job_status(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a question generation job; lost jobs are reported as failed."""
+    if _job_lost(job):
+        return {
+            "job_id": job["job_id"],
+            "status": "failed",
+            "created_at": job["created_at"],
+            "finished_at": None,
+            "error": "Job was interrupted; start a new one"
+        }
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "created_at": job["created_at"],
+        "finished_at": job.get("finished_at"),
+        "error": job.get("error")
+    }
+
+
+def _get_question_job(session_id: str, job_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Get a session and its question job, raising 404 if either is unknown."""
+    session = get_existing_session(session_id)
+    job = session.get("question_job")
+    if not job or job["job_id"] != job_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return session, job
+
+
+def _update_question_job(
+    session_id: str,
+    job_id: str,
+    questions: Optional[List[Dict[str, Any]]] = None,
+    **changes: Any
+) -> None:
+    """
+    Record a job's progress on its session.
+
+    Retries when another worker saved the session in between, and does
+    nothing if the session is gone or has started a newer job.
+    """
+    for _ in range(3):
+        session = sessions.get(session_id)
+        job = session.get("question_job") if session is not None else None
+        if not job or job["job_id"] != job_id:
+            return
+        job.update(changes)
+        if questions is not None:
+            _cache_questions(session, questions)
+        try:
+            sessions.save(session_id, session)
+            return
+        except SessionConflictError:
+            continue
+    logger.warning(f"Could not record question job {job_id}: session kept changing")
+
+
+async def _renew_question_job(session_id: str, job_id: str) -> None:
+    """Renew a job's lease until cancelled, so other workers know it is alive."""
+    while True:
+        await asyncio.sleep(config.QUESTION_JOB_LEASE_SECONDS / 4)
+        async with session_locks.lock(session_id):
+            await run_in_threadpool(
+                _update_question_job, session_id, job_id, heartbeat_at=datetime.now().isoformat()
+            )
+
+
+async def _run_question_job(session_id: str, job_id: str, tech_stack: List[str]) -> None:
+    """Generate a job's questions and store them on the session."""
+    lease = asyncio.create_task(_renew_question_job(session_id, job_id))
+    try:
+        async with question_job_slots:
+            async with session_locks.lock(session_id):
+                now = datetime.now().isoformat()
+                await run_in_threadpool(
+                    _update_question_job, session_id, job_id,
+                    status="running", started_at=now, heartbeat_at=now
+                )
+            try:
+                questions = await _collect_questions(session_id, tech_stack, background=True)
+            except Exception as e:
+                logger.error(f"Question job {job_id} failed: {e}")
+                questions = []
+            finished_at = datetime.now().isoformat()
+            async with session_locks.lock(session_id):
+                if questions:
+                    await run_in_threadpool(
+                        _update_question_job, session_id, job_id, questions,
+                        status="succeeded", finished_at=finished_at
+                    )
+                else:
+                    await run_in_threadpool(
+                        _update_question_job, session_id, job_id,
+                        status="failed", finished_at=finished_at, error="Question generation failed"
+                    )
+    except asyncio.CancelledError:
+        # Shutting down: record the failure so callers can start a new job
+        async with session_locks.lock(session_id):
+            await run_in_threadpool(
+                _update_question_job, session_id, job_id,
+                status="failed", finished_at=datetime.now().isoformat(), error="Job was interrupted"
+            )
+        raise
+    finally:
+        lease.cancel()
+
+
+@app.post("/api/sessions/{session_id}/question-jobs", status_code=202)
+async def create_question_job(session_id: str, http_request: Request):
+    """
+    Start generating questions in the background and return a job to poll.
+
+    Returns the existing job while one is pending for the same tech stack,
+    and a completed job straight away when the session already has questions.
+    """
+    check_rate_limit(http_request, session_id)
+    async with session_locks.lock(session_id):
+        session = await run_in_threadpool(get_existing_session, session_id)
+        tech_stack = _get_tech_stack(session)
+        if not tech_stack:
+            raise HTTPException(status_code=400, detail="Tech stack not provided")
+
+        job = session.get("question_job")
+        if job and job.get("tech_stack") == tech_stack:
+            if job["status"] in ("queued", "running") and not _job_lost(job):
+                return JSONResponse(status_code=202, content=_job_status(job))
+            if job["status"] == "succeeded" and _cached_questions(session) is not None:
+                return JSONResponse(status_code=200, content=_job_status(job))
+
+        now = datetime.now().isoformat()
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "status": "queued",
+            "tech_stack": list(tech_stack),
+            "created_at": now,
+            "owner": WORKER_ID,
+            "heartbeat_at": now
+        }
+        if _cached_questions(session) is not None:
+            job.update(status="succeeded", finished_at=now)
+        session["question_job"] = job
+
+        if job["status"] == "succeeded":
+            await run_in_threadpool(save_session_state, session_id, session)
+            return JSONResponse(status_code=200, content=_job_status(job))
+
+        # Registered before the save so the job is never seen without its task;
+        # it waits for the session lock held here before doing anything
+        job_id = job["job_id"]
+        task = asyncio.create_task(_run_question_job(session_id, job_id, tech_stack))
+        question_job_tasks[job_id] = task
+        task.add_done_callback(lambda _: question_job_tasks.pop(job_id, None))
+        try:
+            await run_in_threadpool(save_session_state, session_id, session)
+        except HTTPException:
+            task.cancel()
+            raise
+        return JSONResponse(status_code=202, content=_job_status(job))
+
+
+@app.get("/api/sessions/{session_id}/question-jobs/{job_id}")
+def get_question_job(session_id: str, job_id: str):
+    """Get the status of a question generation job."""
+    _, job = _get_question_job(session_id, job_id)
+    return _job_status(job)
+
+
+@app.get("/api/sessions/{session_id}/question-jobs/{job_id}/result")
+def get_question_job_result(session_id: str, job_id: str):
+    """Get a finished job's questions; 202 with the status while it is pending."""
+    session, job = _get_question_job(session_id, job_id)
+    status = _job_status(job)
+    if status["status"] in ("queued", "running"):
+        return JSONResponse(status_code=202, content=status)
+    if status["status"] == "failed":
+        raise HTTPException(status_code=500, detail=status["error"] or "Question generation failed")
+    return {**status, "questions": session.get("questions", [])}
+
+
 # Helper functions
+# Tech stack is asked second so question generation overlaps the rest
 REQUIRED_FIELDS = [
-    "full_name", "email", "phone", "years_experience",
-    "desired_position", "current_location", "tech_stack"
+    "full_name", "tech_stack", "email", "phone", "years_experience",
+    "desired_position", "current_location"
 ]
 
 
+def _get_tech_stack(session: Dict[str, Any]) -> List[str]:
+    """Get the collected tech stack as a list."""
+    tech_stack = session["collected_fields"].get("tech_stack", [])
+    if isinstance(tech_stack, str):
+        tech_stack = [tech_stack]
+    return tech_stack
+
+
 def _get_missing_fields(session: Dict[str, Any]) -> List[str]:
     """Get missing required fields."""
     collected = session["collected_fields"]
@@ -0,0 +1,203 @@
+"""Admission control for LLM calls: a global concurrency limit and per-client rate limits."""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, AsyncIterator, Deque, Tuple
+
+# Recent queue waits kept for the latency percentiles
+WAIT_SAMPLES = 1000
+
+
+class AdmissionRejected(Exception):
+    """Raised when a call is turned away; retry_after is a hint in seconds."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class LLMAdmission:
+    """
+    Limits how many LLM calls run at once across the process.
+
+    Calls beyond max_concurrent wait in a FIFO queue. A foreground call is
+    rejected immediately when max_queue calls are already waiting, and
+    after max_wait seconds in the queue, so a burst gets fast refusals
+    instead of piling up behind the provider's rate limit. Background
+    calls (work nobody is waiting on) always queue and never time out.
+    """
+
+    def __init__(self, max_concurrent: int = 8, max_queue: int = 32, max_wait: float = 10.0):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_concurrent: LLM calls allowed to run at once
+            max_queue: Foreground calls allowed to wait for a slot
+            max_wait: Seconds a foreground call waits before it is rejected
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self._free = self.max_concurrent
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.in_flight = 0
+        self.queued = 0
+
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self._avg_hold = 1.0  # Moving average of seconds a slot is held
+
+    def _retry_after(self) -> float:
+        """Estimate when a slot will be free for a new caller."""
+        rounds = (self.queued + 1) / self.max_concurrent
+        return max(1.0, math.ceil(rounds * self._avg_hold))
+
+    async def _acquire(self, timeout: Optional[float]) -> None:
+        """Take a slot, waiting up to timeout seconds (None waits forever)."""
+        if self._free > 0 and not self._waiters:
+            self._free -= 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended; pass it on
+                self._release()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            self.queued -= 1
+
+    def _release(self) -> None:
+        """Hand a slot to the next waiter, or return it to the pool."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._free += 1
+
+    @asynccontextmanager
+    async def slot(self, background: bool = False) -> AsyncIterator[None]:
+        """
+        Hold an LLM slot for the duration of the block.
+
+        Args:
+            background: Queue without limits instead of being rejected
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait timed out
+        """
+        start = time.monotonic()
+        if not background:
+            if self._free == 0 and self.queued >= self.max_queue:
+                self.rejected_queue_full += 1
+                raise AdmissionRejected("queue_full", self._retry_after())
+        try:
+            await self._acquire(None if background else self.max_wait)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise AdmissionRejected("timeout", self._retry_after()) from None
+
+        acquired = time.monotonic()
+        self._waits.append(acquired - start)
+        self.admitted += 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._avg_hold = 0.9 * self._avg_hold + 0.1 * (time.monotonic() - acquired)
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get occupancy, rejection counters and queue wait percentiles."""
+        waits = sorted(self._waits)
+
+        def percentile(p: float) -> Optional[float]:
+            if not waits:
+                return None
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 1)
+
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "queue_wait_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99)}
+        }
+
+
+class TokenBucketLimiter:
+    """
+    Per-client token buckets: each client may make burst calls at once and
+    then rate_per_minute calls per minute.
+
+    Buckets are kept for at most max_clients clients, least recently seen
+    first out; a dropped bucket simply starts full again.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int, max_clients: int = 10000):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate_per_minute: Tokens added per client per minute
+            burst: Bucket capacity
+            max_clients: Buckets kept in memory
+        """
+        self.rate = rate_per_minute / 60.0
+        self.burst = max(1, burst)
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.rejected = 0
+
+    def acquire(self, key: str) -> float:
+        """
+        Take a token for a client.
+
+        Args:
+            key: Client identifier (IP address or session id)
+
+        Returns:
+            0 if the call is allowed, otherwise seconds until a token is available
+        """
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            self.rejected += 1
+            wait = (1 - tokens) / self.rate if self.rate > 0 else 60.0
+
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the limiter's settings and rejection count."""
+        return {
+            "rate_per_minute": self.rate * 60,
+            "burst": self.burst,
+            "clients": len(self._buckets),
+            "rejected": self.rejected
+        }
@@ -0,0 +1,178 @@
+"""Circuit breakers, retry budgets and backoff for calls to external services."""
+
+import random
+import threading
+import time
+from typing import Dict, Any
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Delay before a retry, with exponential growth and full jitter.
+
+    Args:
+        attempt: Number of retries already made (0 for the first retry)
+        base: Delay ceiling for the first retry, in seconds
+        cap: Maximum delay ceiling, in seconds
+
+    Returns:
+        Seconds to wait, uniformly drawn below the ceiling
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Stops calling a service that keeps failing, and lets traffic back once
+    it recovers.
+
+    Closed: calls flow; failure_threshold consecutive failures open it.
+    Open: calls are refused; after reset_timeout it becomes half-open.
+    Half-open: up to half_open_max_calls probe calls go through; a success
+    closes the breaker and a failure opens it again. Probe permits that are
+    never reported back expire after another reset_timeout.
+
+    Safe to share between threads.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        """
+        Initialize the breaker.
+
+        Args:
+            name: Service name, for logs and stats
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before probing
+            half_open_max_calls: Probe calls allowed while half-open
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._changed_at = time.monotonic()
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+        self.trips = 0
+
+    def _refresh(self) -> None:
+        """Apply time-based transitions; caller holds the lock."""
+        now = time.monotonic()
+        if self._state == self.OPEN and now - self._changed_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._changed_at = now
+            self._half_open_calls = 0
+        elif self._state == self.HALF_OPEN and now - self._changed_at >= self.reset_timeout:
+            # Probes that never reported back must not block recovery
+            self._changed_at = now
+            self._half_open_calls = 0
+
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half_open."""
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    @property
+    def available(self) -> bool:
+        """Whether calls may be attempted now, without taking a probe permit."""
+        return self.state != self.OPEN
+
+    def allow(self) -> bool:
+        """
+        Ask to make a call.
+
+        Returns:
+            True if the call may go ahead; while half-open this takes one
+            of the probe permits
+        """
+        with self._lock:
+            self._refresh()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Report a successful call; closes the breaker."""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        """Report a failed call; may open the breaker."""
+        with self._lock:
+            self._refresh()
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.trips += 1
+                self._state = self.OPEN
+                self._changed_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the breaker's state and counters."""
+        with self._lock:
+            self._refresh()
+            return {"state": self._state, "consecutive_failures": self._failures, "trips": self.trips}
+
+
+class RetryBudget:
+    """
+    Limits retries to a fraction of calls, so retries cannot multiply load
+    on a service that is already struggling.
+
+    Every call deposits ratio tokens and every retry spends one. The
+    balance is capped at reserve, which also allows a few retries when
+    traffic is light.
+    """
+
+    def __init__(self, ratio: float = 0.2, reserve: float = 10.0):
+        """
+        Initialize the budget.
+
+        Args:
+            ratio: Retries allowed per call, sustained
+            reserve: Maximum (and initial) retry balance
+        """
+        self.ratio = ratio
+        self.reserve = reserve
+        self._tokens = reserve
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.exhausted = 0
+
+    def deposit(self) -> None:
+        """Record a call."""
+        with self._lock:
+            self._tokens = min(self.reserve, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """
+        Ask to make a retry.
+
+        Returns:
+            True if the budget allows it
+        """
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.retries += 1
+                return True
+            self.exhausted += 1
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the remaining balance and counters."""
+        with self._lock:
+            return {"balance": round(self._tokens, 2), "retries": self.retries, "exhausted": self.exhausted}
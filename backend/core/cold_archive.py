@@ -0,0 +1,337 @@
+"""Compressed, append-only cold tier for old stored sessions."""
+
+import gzip
+import json
+import lzma
+import os
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+from core.fileio import atomic_write_json, file_lock
+from core.logging_utils import logger
+
+CODECS = {
+    "gzip": (".gz", gzip.compress, gzip.decompress),
+    "lzma": (".xz", lzma.compress, lzma.decompress),
+}
+
+
+class ColdArchive:
+    """
+    Compressed archive segments plus a small session index.
+
+    Sessions are written in blocks of block_records records, each block
+    compressed on its own with stdlib gzip or lzma and appended to a
+    segment file that is never modified afterwards. The index maps each
+    session_id to (segment, block offset, block length, timestamp), so a
+    point lookup decompresses a single block instead of the whole archive.
+    """
+
+    def __init__(self, directory: Path, codec: str = "gzip", block_records: int = 64):
+        """
+        Initialize the archive.
+
+        Args:
+            directory: Directory holding segments and the index
+            codec: 'gzip' or 'lzma'
+            block_records: Records compressed together in one block
+        """
+        if codec not in CODECS:
+            raise ValueError(f"Unknown archive codec: {codec}")
+        self.directory = directory
+        self.codec = codec
+        self.block_records = block_records
+        self.index_path = directory / "index.json"
+        self.lock_path = directory / "archive.lock"
+
+        self._lock = threading.RLock()
+        self._index: Optional[Dict[str, Any]] = None
+        self._version: Optional[tuple] = None
+        self._segment_counter = 0
+
+    # Index handling
+
+    @staticmethod
+    def _empty_index() -> Dict[str, Any]:
+        """Index of an empty archive."""
+        return {"segments": {}, "sessions": {}}
+
+    def _read_index(self) -> Dict[str, Any]:
+        """Return the index, reloading it if another process changed it."""
+        try:
+            stat = self.index_path.stat()
+            version = (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            self._index, self._version = self._empty_index(), None
+            return self._index
+
+        if self._index is None or version != self._version:
+            try:
+                with open(self.index_path, 'r') as f:
+                    self._index = json.load(f)
+                self._version = version
+            except (json.JSONDecodeError, OSError) as e:
+                logger.warning(f"Error loading archive index: {e}")
+                self._index, self._version = self._empty_index(), None
+        return self._index
+
+    def _write_index(self, index: Dict[str, Any]) -> None:
+        """Persist the index atomically."""
+        atomic_write_json(self.index_path, index)
+        stat = self.index_path.stat()
+        self._index, self._version = index, (stat.st_ino, stat.st_mtime_ns)
+
+    # Block I/O
+
+    def _read_block(self, segment: str, offset: int, length: int) -> List[Dict[str, Any]]:
+        """Read and decompress one block of records."""
+        _, _, decompress = CODECS[self._segment_codec(segment)]
+        with open(self.directory / segment, "rb") as f:
+            f.seek(offset)
+            payload = decompress(f.read(length))
+        return [json.loads(line) for line in payload.decode("utf-8").splitlines() if line]
+
+    @staticmethod
+    def _segment_codec(segment: str) -> str:
+        """Codec a segment was written with, from its extension."""
+        return "lzma" if segment.endswith(".xz") else "gzip"
+
+    def _new_segment_name(self) -> str:
+        """Unique name for a new segment file."""
+        self._segment_counter += 1
+        stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        extension = CODECS[self.codec][0]
+        return f"segment-{stamp}-{os.getpid()}-{self._segment_counter}.jsonl{extension}"
+
+    # Public API
+
+    def add(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Append records to a new segment and index them.
+
+        Args:
+            records: Session records to archive
+
+        Returns:
+            Compressed bytes written
+        """
+        if not records:
+            return 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock, file_lock(self.lock_path):
+            return self._add_locked(records)
+
+    def _add_locked(self, records: List[Dict[str, Any]]) -> int:
+        """Write a segment and update the index; the caller holds both locks."""
+        _, compress, _ = CODECS[self.codec]
+        segment = self._new_segment_name()
+        entries: List[Tuple[str, List[Any]]] = []
+        with open(self.directory / segment, "wb") as f:
+            for start in range(0, len(records), self.block_records):
+                block = records[start:start + self.block_records]
+                payload = compress("\n".join(json.dumps(r) for r in block).encode("utf-8"))
+                offset = f.tell()
+                f.write(payload)
+                for record in block:
+                    entries.append((
+                        record["session_id"],
+                        [segment, offset, len(payload), record.get("timestamp", "")]
+                    ))
+            f.flush()
+            os.fsync(f.fileno())
+            written = f.tell()
+
+        # The index is only updated once the segment is durable
+        index = self._read_index()
+        index["segments"][segment] = len(records)
+        index["sessions"].update(entries)
+        self._write_index(index)
+        return written
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read one archived session.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Session record or None if it is not archived
+        """
+        for attempt in range(2):
+            with self._lock:
+                entry = self._read_index()["sessions"].get(session_id)
+            if entry is None:
+                return None
+
+            segment, offset, length, _ = entry
+            try:
+                block = self._read_block(segment, offset, length)
+            except FileNotFoundError:
+                # Segment compacted away after we read the index; look again
+                continue
+            for record in block:
+                if record.get("session_id") == session_id:
+                    return record
+            return None
+        return None
+
+    def delete(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Remove a session from the archive index.
+
+        The compressed bytes stay in their segment until compact() runs.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            The removed record, or None if it was not archived
+        """
+        record = self.get(session_id)
+        if record is None:
+            return None
+        with self._lock, file_lock(self.lock_path):
+            index = self._read_index()
+            if index["sessions"].pop(session_id, None) is not None:
+                self._write_index(index)
+        return record
+
+    def delete_many(self, timestamps: Dict[str, str]) -> List[Dict[str, Any]]:
+        """
+        Remove a batch of sessions from the archive index with one index write.
+
+        Args:
+            timestamps: session_id -> timestamp the record had when selected;
+                        sessions archived with a different timestamp are kept
+
+        Returns:
+            The removed records
+        """
+        removed = []
+        with self._lock, file_lock(self.lock_path):
+            index = self._read_index()
+            sessions = index["sessions"]
+            blocks: Dict[Tuple[str, int, int], Dict[str, Dict[str, Any]]] = {}
+            for session_id, timestamp in timestamps.items():
+                entry = sessions.get(session_id)
+                if entry is None or entry[3] != timestamp:
+                    continue
+                block = tuple(entry[:3])
+                if block not in blocks:
+                    blocks[block] = {r["session_id"]: r for r in self._read_block(*block)}
+                if session_id in blocks[block]:
+                    removed.append(blocks[block][session_id])
+                del sessions[session_id]
+            if blocks:
+                self._write_index(index)
+        return removed
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._read_index()["sessions"]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._read_index()["sessions"])
+
+    def iter_records(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream archived sessions, decompressing each block once.
+
+        Args:
+            since: Only yield records with timestamp >= since (ISO format)
+            until: Only yield records with timestamp < until (ISO format)
+
+        Yields:
+            Session records
+        """
+        with self._lock:
+            sessions = dict(self._read_index()["sessions"])
+
+        # Group live sessions by block, skipping blocks outside the time range
+        blocks: Dict[Tuple[str, int, int], set] = {}
+        for session_id, (segment, offset, length, timestamp) in sessions.items():
+            if since is not None and timestamp < since:
+                continue
+            if until is not None and timestamp >= until:
+                continue
+            blocks.setdefault((segment, offset, length), set()).add(session_id)
+
+        for (segment, offset, length), wanted in sorted(blocks.items()):
+            try:
+                block = self._read_block(segment, offset, length)
+            except FileNotFoundError:
+                continue  # Segment compacted away since the index snapshot
+            for record in block:
+                if record.get("session_id") in wanted:
+                    yield record
+
+    def size_bytes(self) -> int:
+        """Get the total size of all segment files."""
+        if not self.directory.exists():
+            return 0
+        return sum(p.stat().st_size for p in self.directory.glob("segment-*"))
+
+    def compact(self) -> int:
+        """
+        Rewrite segments that contain deleted or superseded records.
+
+        Returns:
+            Bytes reclaimed
+        """
+        before = self.size_bytes()
+        with self._lock, file_lock(self.lock_path):
+            index = self._read_index()
+            live: Dict[str, int] = {}
+            for segment, _, _, _ in index["sessions"].values():
+                live[segment] = live.get(segment, 0) + 1
+            stale = {
+                segment for segment, total in index["segments"].items()
+                if live.get(segment, 0) < total
+            }
+            if not stale:
+                return 0
+
+            records = [
+                record for record in self.iter_records()
+                if index["sessions"][record["session_id"]][0] in stale
+            ]
+            if records:
+                self._add_locked(records)
+
+            index = self._read_index()
+            for segment in stale:
+                index["segments"].pop(segment, None)
+            self._write_index(index)
+            for segment in stale:
+                (self.directory / segment).unlink(missing_ok=True)
+
+        reclaimed = max(0, before - self.size_bytes())
+        logger.info(f"Compacted {len(stale)} archive segment(s), reclaimed {reclaimed} bytes")
+        return reclaimed
+
+    def clear(self) -> None:
+        """Delete every segment and the index."""
+        with self._lock:
+            if self.directory.exists():
+                shutil.rmtree(self.directory)
+            self._index, self._version = None, None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get archived session, segment and byte counts."""
+        with self._lock:
+            index = self._read_index()
+            return {
+                "sessions": len(index["sessions"]),
+                "segments": len(index["segments"]),
+                "bytes": self.size_bytes(),
+                "codec": self.codec
+            }
@@ -8,6 +8,9 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+# File suffixes that select the SQLite storage backend
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
 
 class Config:
     """Application configuration loaded from environment variables."""
@@ -20,10 +23,94 @@ class Config:
     HF_TOKEN: Optional[str] = os.getenv("HF_TOKEN", None)
     HF_MODEL: str = os.getenv("HF_MODEL", "microsoft/DialoGPT-medium")
     
+    # Pooled keep-alive HTTP connections to the LLM providers
+    LLM_POOL_SIZE: int = int(os.getenv("LLM_POOL_SIZE", "20"))
+    LLM_KEEPALIVE_SECONDS: float = float(os.getenv("LLM_KEEPALIVE_SECONDS", "60"))
+    LLM_CONNECT_TIMEOUT: float = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+    LLM_READ_TIMEOUT: float = float(os.getenv("LLM_READ_TIMEOUT", "60"))
+    LLM_WARMUP: bool = os.getenv("LLM_WARMUP", "false").lower() == "true"
+    
+    # Retries of transient LLM errors, with jittered exponential backoff
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    LLM_RETRY_BASE_DELAY: float = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+    LLM_RETRY_MAX_DELAY: float = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+    LLM_RETRY_BUDGET_RATIO: float = float(os.getenv("LLM_RETRY_BUDGET_RATIO", "0.2"))
+    # Per-provider circuit breakers and the background health check (0 disables it)
+    LLM_BREAKER_FAILURES: int = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+    LLM_BREAKER_RESET_SECONDS: float = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+    LLM_HEALTH_CHECK_INTERVAL: float = float(os.getenv("LLM_HEALTH_CHECK_INTERVAL", "30"))
+    
+    # Cache of LLM responses for callers that opt in (e.g. question generation)
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+    LLM_CACHE_TTL_SECONDS: float = float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+    LLM_CACHE_DISK: bool = os.getenv("LLM_CACHE_DISK", "false").lower() == "true"
+    LLM_CACHE_DISK_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_DISK_MAX_ENTRIES", "10000"))
+    
+    # Identical concurrent LLM requests and question generations share one call
+    LLM_SINGLE_FLIGHT: bool = os.getenv("LLM_SINGLE_FLIGHT", "true").lower() == "true"
+    
+    # Pool of generated question sets per canonical tech stack (0 variants disables it)
+    QUESTION_POOL_VARIANTS: int = int(os.getenv("QUESTION_POOL_VARIANTS", "5"))
+    QUESTION_POOL_MAX_STACKS: int = int(os.getenv("QUESTION_POOL_MAX_STACKS", "500"))
+    QUESTION_POOL_PERSIST: bool = os.getenv("QUESTION_POOL_PERSIST", "false").lower() == "true"
+    
     # Application Configuration
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     ENABLE_STORAGE: bool = os.getenv("ENABLE_STORAGE", "true").lower() == "true"
     STORAGE_PATH: Path = Path(os.getenv("STORAGE_PATH", "./data/sessions.json"))
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "").lower()  # "json", "jsonl", "sqlite" or "sharded"
+    STORAGE_SHARDS: int = int(os.getenv("STORAGE_SHARDS", "16"))
+    STORAGE_COMPACTION_RATIO: float = float(os.getenv("STORAGE_COMPACTION_RATIO", "0.5"))
+    STORAGE_COMPACTION_MIN_RECORDS: int = int(os.getenv("STORAGE_COMPACTION_MIN_RECORDS", "1000"))
+    STORAGE_INDEX_FLUSH_RECORDS: int = int(os.getenv("STORAGE_INDEX_FLUSH_RECORDS", "1000"))
+    STORAGE_READ_CACHE_SIZE: int = int(os.getenv("STORAGE_READ_CACHE_SIZE", "1024"))
+    STORAGE_WRITE_BEHIND: bool = os.getenv("STORAGE_WRITE_BEHIND", "true").lower() == "true"
+    STORAGE_FLUSH_INTERVAL: float = float(os.getenv("STORAGE_FLUSH_INTERVAL", "0.5"))
+    STORAGE_QUEUE_SIZE: int = int(os.getenv("STORAGE_QUEUE_SIZE", "1000"))
+    
+    # Retention policy for stored sessions (0 disables a limit)
+    RETENTION_MAX_AGE_DAYS: int = int(os.getenv("RETENTION_MAX_AGE_DAYS", "0"))
+    RETENTION_MAX_COUNT: int = int(os.getenv("RETENTION_MAX_COUNT", "0"))
+    RETENTION_INTERVAL_HOURS: float = float(os.getenv("RETENTION_INTERVAL_HOURS", "24"))
+    RETENTION_BATCH_SIZE: int = int(os.getenv("RETENTION_BATCH_SIZE", "500"))
+    RETENTION_ARCHIVE_PATH: str = os.getenv("RETENTION_ARCHIVE_PATH", "")
+    
+    # Cold archive: move sessions older than N days into compressed segments (0 disables)
+    COLD_ARCHIVE_AFTER_DAYS: int = int(os.getenv("COLD_ARCHIVE_AFTER_DAYS", "0"))
+    COLD_ARCHIVE_CODEC: str = os.getenv("COLD_ARCHIVE_CODEC", "gzip").lower()  # "gzip" or "lzma"
+    COLD_ARCHIVE_BLOCK_RECORDS: int = int(os.getenv("COLD_ARCHIVE_BLOCK_RECORDS", "64"))
+    
+    # Live API sessions: memory cap, idle timeout and spill-to-disk hibernation
+    SESSION_MAX_RESIDENT: int = int(os.getenv("SESSION_MAX_RESIDENT", "1000"))
+    SESSION_IDLE_TTL_SECONDS: float = float(os.getenv("SESSION_IDLE_TTL_SECONDS", "1800"))
+    SESSION_HIBERNATE: bool = os.getenv("SESSION_HIBERNATE", "true").lower() == "true"
+    SESSION_HIBERNATE_TTL_HOURS: float = float(os.getenv("SESSION_HIBERNATE_TTL_HOURS", "72"))
+    SESSION_STATE_BACKEND: str = os.getenv("SESSION_STATE_BACKEND", "file").lower()  # "file" or "sqlite"
+    SESSION_SHARED: bool = os.getenv("SESSION_SHARED", "false").lower() == "true"
+    
+    # Question generation jobs run at most this many at a time per worker
+    QUESTION_JOB_WORKERS: int = int(os.getenv("QUESTION_JOB_WORKERS", "4"))
+    # Seconds a pending job's owner may go without renewing it before it counts as lost
+    QUESTION_JOB_LEASE_SECONDS: float = float(os.getenv("QUESTION_JOB_LEASE_SECONDS", "120"))
+    
+    # Responses kept per session for replaying requests with an Idempotency-Key
+    IDEMPOTENCY_KEYS_PER_SESSION: int = int(os.getenv("IDEMPOTENCY_KEYS_PER_SESSION", "20"))
+    IDEMPOTENCY_TTL_SECONDS: float = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    
+    # Admission control: concurrent LLM calls per worker, and how many may wait
+    LLM_MAX_CONCURRENT: int = int(os.getenv("LLM_MAX_CONCURRENT", "8"))
+    LLM_MAX_QUEUE: int = int(os.getenv("LLM_MAX_QUEUE", "32"))
+    LLM_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "10"))
+    # Per-client rate limit on LLM-backed endpoints (0 disables)
+    RATE_LIMIT_PER_MINUTE: float = float(os.getenv("RATE_LIMIT_PER_MINUTE", "30"))
+    RATE_LIMIT_BURST: int = int(os.getenv("RATE_LIMIT_BURST", "10"))
+    RATE_LIMIT_KEY: str = os.getenv("RATE_LIMIT_KEY", "session").lower()  # "session" or "ip"
+    # Header carrying the client address, set by a trusted reverse proxy (ip keying only)
+    RATE_LIMIT_CLIENT_HEADER: str = os.getenv("RATE_LIMIT_CLIENT_HEADER", "")
+    
+    # Admin endpoints (export, stats); they answer 403 while this is empty
+    ADMIN_API_KEY: str = os.getenv("ADMIN_API_KEY", "")
     
     # Optional Features
     ENABLE_SENTIMENT: bool = os.getenv("ENABLE_SENTIMENT", "false").lower() == "true"
@@ -44,6 +131,72 @@ class Config:
         """Ensure the storage directory exists."""
         if cls.ENABLE_STORAGE:
             cls.STORAGE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    
+    @classmethod
+    def get_storage_backend_name(cls) -> str:
+        """Get the storage backend, inferred from STORAGE_PATH if not set."""
+        if cls.STORAGE_BACKEND:
+            return cls.STORAGE_BACKEND
+        suffix = cls.STORAGE_PATH.suffix.lower()
+        if suffix in SQLITE_SUFFIXES:
+            return "sqlite"
+        if suffix == ".jsonl":
+            return "jsonl"
+        if suffix == "":
+            return "sharded"
+        return "json"
+    
+    @classmethod
+    def session_log_path(cls) -> Path:
+        """Path of the append-only JSONL session log."""
+        return cls.STORAGE_PATH.with_suffix(".jsonl")
+    
+    @classmethod
+    def shard_dir(cls) -> Path:
+        """Directory holding the sharded session files."""
+        return cls.STORAGE_PATH.with_suffix("")
+    
+    @classmethod
+    def storage_meta_path(cls) -> Path:
+        """Path of the storage metadata sidecar."""
+        return cls.STORAGE_PATH.with_suffix(".meta.json")
+    
+    @classmethod
+    def tech_index_path(cls) -> Path:
+        """Path of the per-technology session counters sidecar."""
+        return cls.STORAGE_PATH.with_suffix(".tech.db")
+    
+    @classmethod
+    def cold_archive_dir(cls) -> Path:
+        """Directory holding compressed cold-archive segments."""
+        return cls.STORAGE_PATH.with_suffix(".archive")
+    
+    @classmethod
+    def session_hibernate_dir(cls) -> Path:
+        """Directory holding hibernated live API sessions."""
+        return cls.STORAGE_PATH.parent / "hibernated"
+    
+    @classmethod
+    def session_state_db_path(cls) -> Path:
+        """Path of the SQLite database holding live API sessions."""
+        return cls.STORAGE_PATH.parent / "session_state.db"
+    
+    @classmethod
+    def llm_cache_path(cls) -> Path:
+        """Path of the SQLite database holding the LLM response cache's disk tier."""
+        return cls.STORAGE_PATH.parent / "llm_cache.db"
+    
+    @classmethod
+    def question_pool_path(cls) -> Path:
+        """Path of the JSON file holding the pooled question sets."""
+        return cls.STORAGE_PATH.parent / "question_pool.json"
+    
+    @classmethod
+    def sqlite_path(cls) -> Path:
+        """Path of the SQLite session database."""
+        if cls.STORAGE_PATH.suffix.lower() in SQLITE_SUFFIXES:
+            return cls.STORAGE_PATH
+        return cls.STORAGE_PATH.with_suffix(".db")
 
 
 # Global config instance
@@ -0,0 +1,86 @@
+"""File helpers shared by the storage modules."""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+# Advisory file locking is platform specific
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+def atomic_write_json(path: Path, data: Any, indent: int | None = None) -> None:
+    """
+    Write JSON to a file so readers never observe a partial write.
+
+    The data is written to a temporary file in the same directory, flushed
+    to disk and then renamed over the target.
+
+    Args:
+        path: Destination file
+        data: JSON-serializable data
+        indent: Optional indentation passed to json.dump
+    """
+    atomic_write_text(path, json.dumps(data, indent=indent))
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """
+    Write text to a file so readers never observe a partial write.
+
+    Args:
+        path: Destination file
+        text: File contents
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+@contextmanager
+def file_lock(path: Path, shared: bool = False) -> Iterator[None]:
+    """
+    Hold an advisory lock on path for the duration of the block.
+
+    Uses flock on POSIX and msvcrt on Windows. The lock coordinates
+    cooperating processes only; it does not stop other programs from
+    writing the file.
+
+    Args:
+        path: Lock file (created if missing)
+        shared: Take a shared (reader) lock instead of an exclusive one
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,79 @@
+"""Replay of responses to retried requests carrying an Idempotency-Key."""
+
+import hashlib
+import time
+from typing import Optional, Dict, Any
+from core.config import config
+
+
+class IdempotencyKeyReusedError(Exception):
+    """Raised when an idempotency key is sent again with a different request."""
+
+
+def request_fingerprint(*parts: str) -> str:
+    """
+    Hash the parts of a request that must match for a replay.
+
+    Args:
+        *parts: Request fields, e.g. the endpoint and message text
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _prune(entries: Dict[str, Dict[str, Any]], now: float) -> None:
+    """Drop expired entries, then the oldest ones over the per-session cap."""
+    cutoff = now - config.IDEMPOTENCY_TTL_SECONDS
+    for key in [k for k, entry in entries.items() if entry["stored_at"] < cutoff]:
+        del entries[key]
+    while len(entries) > config.IDEMPOTENCY_KEYS_PER_SESSION:
+        del entries[next(iter(entries))]
+
+
+def lookup_response(session: Dict[str, Any], key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the response stored for an idempotency key.
+
+    Entries live on the session itself, so they are saved and shared with
+    the rest of its state.
+
+    Args:
+        session: Session dict
+        key: Idempotency-Key header value
+        fingerprint: request_fingerprint() of the current request
+
+    Returns:
+        Stored response or None if the key is new or expired
+
+    Raises:
+        IdempotencyKeyReusedError: If the key was used for a different request
+    """
+    entry = session.get("idempotency", {}).get(key)
+    if entry is None or entry["stored_at"] < time.time() - config.IDEMPOTENCY_TTL_SECONDS:
+        return None
+    if entry["fingerprint"] != fingerprint:
+        raise IdempotencyKeyReusedError(key)
+    return entry["response"]
+
+
+def store_response(session: Dict[str, Any], key: str, fingerprint: str, response: Dict[str, Any]) -> None:
+    """
+    Remember the response to a request so a retry can replay it.
+
+    Args:
+        session: Session dict (saved by the caller)
+        key: Idempotency-Key header value
+        fingerprint: request_fingerprint() of the request
+        response: JSON-serializable response
+    """
+    now = time.time()
+    entries = session.setdefault("idempotency", {})
+    entries.pop(key, None)
+    entries[key] = {"fingerprint": fingerprint, "response": response, "stored_at": now}
+    _prune(entries, now)
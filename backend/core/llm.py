@@ -1,42 +1,396 @@
 """LLM provider abstraction for TalentScout."""
 
-from typing import Optional, List, Dict, Any
-from openai import OpenAI
+from typing import Optional, List, Dict, Any, AsyncIterator, Awaitable, Callable, Iterator, Tuple, TypeVar
+from openai import AsyncOpenAI, OpenAI
+import asyncio
+import httpx
+import openai
 import requests
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from core.circuit_breaker import CircuitBreaker, RetryBudget, backoff_delay
 from core.config import config
+from core.llm_cache import cache_key, get_llm_cache
 from core.logging_utils import logger
 from core.prompts import get_system_prompt
+from core.single_flight import AsyncSingleFlight, SingleFlight
 
 
-class LLMProvider:
-    """Provider-agnostic LLM wrapper."""
+def _with_system_prompt(messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Prepend the system prompt unless the conversation already has one."""
+    if not any(msg.get("role") == "system" for msg in messages):
+        return [{"role": "system", "content": get_system_prompt()}] + messages
+    return messages
+
+
+# Host the HuggingFace Inference API is served from
+HF_API_BASE = "https://api-inference.huggingface.co"
+
+T = TypeVar("T")
+
+
+class LLMStreamError(Exception):
+    """Raised when a streamed response breaks off after part of it was yielded."""
+
+
+def _httpx_timeout() -> httpx.Timeout:
+    """Connect/read timeouts for the httpx clients."""
+    return httpx.Timeout(
+        config.LLM_READ_TIMEOUT,
+        connect=config.LLM_CONNECT_TIMEOUT,
+        pool=config.LLM_CONNECT_TIMEOUT
+    )
+
+
+def _httpx_limits() -> httpx.Limits:
+    """Connection pool limits for the httpx clients."""
+    return httpx.Limits(
+        max_connections=config.LLM_POOL_SIZE,
+        max_keepalive_connections=config.LLM_POOL_SIZE,
+        keepalive_expiry=config.LLM_KEEPALIVE_SECONDS
+    )
+
+
+def _requests_session() -> requests.Session:
+    """A requests session whose connections are pooled and kept alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.LLM_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _configured_providers(openai_client: Any) -> List[str]:
+    """Providers with credentials, in order of preference."""
+    names = []
+    if openai_client is not None:
+        names.append("openai")
+    if config.HF_TOKEN:
+        names.append("huggingface")
+    return names
+
+
+def _response_cache_key(
+    openai_client: Any,
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int
+) -> str:
+    """Cache key for a completion request, on the model that normally serves it."""
+    model = f"openai:{config.OPENAI_MODEL}" if openai_client is not None else f"huggingface:{config.HF_MODEL}"
+    return cache_key(_with_system_prompt(messages), model, temperature, max_tokens)
+
+
+def _huggingface_request(
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int
+) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """Build the URL, headers and payload for a HuggingFace Inference API call."""
+    api_url = f"{HF_API_BASE}/models/{config.HF_MODEL}"
+    headers = {
+        "Authorization": f"Bearer {config.HF_TOKEN}",
+        "Content-Type": "application/json"
+    }
+    payload = {
+        "inputs": LLMProvider._messages_to_prompt(messages),
+        "parameters": {
+            "temperature": temperature,
+            "max_new_tokens": max_tokens,
+            "return_full_text": False
+        }
+    }
+    return api_url, headers, payload
+
+
+def _parse_huggingface_result(result: Any) -> str:
+    """Extract the generated text from a HuggingFace Inference API response."""
+    # Handle different response formats
+    if isinstance(result, list) and len(result) > 0:
+        if "generated_text" in result[0]:
+            return result[0]["generated_text"]
+        elif "text" in result[0]:
+            return result[0]["text"]
+    
+    # Fallback: return string representation
+    return str(result)
+
+
+def _stream_chunk_text(chunk: Any) -> str:
+    """Extract the text delta from an OpenAI streaming chunk."""
+    if not chunk.choices:
+        return ""
+    return chunk.choices[0].delta.content or ""
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether an error is worth retrying: timeouts, connection failures, 429 and 5xx."""
+    if isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)):
+        return True
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, httpx.TransportError)):
+        return True
+    status = None
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+    elif isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+    return status is not None and (status == 429 or status >= 500)
+
+
+class _ProviderHealth:
+    """
+    Circuit breakers for the configured providers, in order of preference,
+    and a shared retry budget. Holds every failover, retry and health check
+    decision, so the sync and async providers only differ in their I/O.
+    """
+    
+    def __init__(self, names: List[str]):
+        """
+        Initialize breakers.
+        
+        Args:
+            names: Configured providers, preferred first
+        """
+        self.breakers: Dict[str, CircuitBreaker] = {
+            name: CircuitBreaker(
+                name,
+                failure_threshold=config.LLM_BREAKER_FAILURES,
+                reset_timeout=config.LLM_BREAKER_RESET_SECONDS
+            )
+            for name in names
+        }
+        self.retry_budget = RetryBudget(ratio=config.LLM_RETRY_BUDGET_RATIO)
+    
+    def candidates(self) -> Iterator[str]:
+        """Providers to try for one call, asking each breaker only when it is reached."""
+        for name, breaker in self.breakers.items():
+            if breaker.allow():
+                yield name
+    
+    def preferred(self) -> Optional[str]:
+        """First provider whose breaker is not open."""
+        return next((name for name, breaker in self.breakers.items() if breaker.available), None)
+    
+    def record_failure(self, name: str, error: Exception) -> None:
+        """
+        Count a failed call against a provider's breaker if the provider is at
+        fault: transport errors, timeouts, 429 and 5xx. A request the provider
+        rejected (e.g. 400 for an over-long prompt, or 401) says nothing about
+        its health, so one bad request cannot open the circuit for everyone.
+        """
+        if _is_retryable(error):
+            self.breakers[name].record_failure()
+    
+    def should_ping(self, name: str) -> bool:
+        """
+        Whether the health check should ping a provider now.
+        
+        Open breakers are left alone until their reset timeout; a half-open
+        one hands the ping one of its probe permits, so the ping is the probe.
+        """
+        breaker = self.breakers[name]
+        state = breaker.state
+        if state == CircuitBreaker.CLOSED:
+            return True
+        return state == CircuitBreaker.HALF_OPEN and breaker.allow()
+    
+    def ping_targets(self) -> Iterator[str]:
+        """Providers the health check should ping, asking each breaker only when it is reached."""
+        for name in self.breakers:
+            if self.should_ping(name):
+                yield name
+    
+    def record_ping(self, name: str, error: Optional[Exception]) -> None:
+        """
+        Record a health check ping.
+        
+        A successful ping only closes a half-open breaker: it shows the
+        provider is reachable, not that completions work, so it must not
+        reset failures counted by real calls.
+        """
+        breaker = self.breakers[name]
+        if error is not None:
+            logger.warning(f"{name} health check failed: {error}")
+            self.record_failure(name, error)
+        elif breaker.state == CircuitBreaker.HALF_OPEN:
+            breaker.record_success()
+    
+    def should_retry(self, name: str, error: Exception, attempt: int) -> bool:
+        """Whether a failed call may be retried on the same provider."""
+        return (
+            attempt < config.LLM_MAX_RETRIES
+            and _is_retryable(error)
+            and self.breakers[name].available
+            and self.retry_budget.withdraw()
+        )
+    
+    def start_call(self) -> None:
+        """Record a first attempt, which earns the retry budget its share of retries."""
+        self.retry_budget.deposit()
+    
+    def record_success(self, name: str) -> None:
+        """Record a call a provider answered."""
+        self.breakers[name].record_success()
+    
+    def retry_delay(self, name: str, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Record a failed attempt and decide whether to retry it.
+        
+        Returns:
+            Seconds to wait before the next attempt, or None to give up
+        """
+        self.record_failure(name, error)
+        if not self.should_retry(name, error, attempt):
+            return None
+        delay = backoff_delay(attempt, config.LLM_RETRY_BASE_DELAY, config.LLM_RETRY_MAX_DELAY)
+        logger.warning(f"{name} call failed ({error}); retrying in {delay:.2f}s")
+        return delay
+    
+    def record_stream_failure(self, name: str, error: Exception, opened: bool, started: bool) -> None:
+        """
+        Record a streamed call that failed.
+        
+        Failures while opening the stream were already counted by the retry
+        loop; only ones while reading it are counted here. Once text has
+        reached the caller there is no falling back to another provider.
+        
+        Raises:
+            LLMStreamError: If text was already yielded
+        """
+        logger.error(f"{name} API error: {error}")
+        if opened:
+            self.record_failure(name, error)
+        if started:
+            raise LLMStreamError(f"{name} stream interrupted: {error}") from error
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get breaker states and retry budget counters."""
+        return {
+            "provider": self.preferred(),
+            "breakers": {name: breaker.stats() for name, breaker in self.breakers.items()},
+            "retry_budget": self.retry_budget.stats()
+        }
+
+
+class _ProviderBase:
+    """
+    Provider selection and bookkeeping shared by LLMProvider and
+    AsyncLLMProvider, which differ only in how they do I/O.
+    """
+    
+    openai_client: Any
+    health: _ProviderHealth
+    flights: Any
+    
+    def _init_health(self, flights: Any) -> None:
+        """Report which providers are configured and set up their breakers."""
+        if not self.openai_client and config.HF_TOKEN:
+            logger.info(f"Using HuggingFace as LLM provider ({type(self).__name__})")
+        elif not self.openai_client:
+            logger.error("No LLM provider available. Please set OPENAI_API_KEY or HF_TOKEN")
+        self.health = _ProviderHealth(_configured_providers(self.openai_client))
+        self.flights = flights
+    
+    @property
+    def provider(self) -> Optional[str]:
+        """Provider calls currently go to first."""
+        return self.health.preferred()
+    
+    def _cache_key(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+        """Response cache key for a request."""
+        return _response_cache_key(self.openai_client, messages, temperature, max_tokens)
+    
+    @staticmethod
+    def _openai_stream_request(
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> Dict[str, Any]:
+        """Arguments for a streamed OpenAI chat completion."""
+        return {
+            "model": config.OPENAI_MODEL,
+            "messages": _with_system_prompt(messages),
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
+    
+    @staticmethod
+    def _messages_to_prompt(messages: List[Dict[str, str]]) -> str:
+        """
+        Convert message list to a single prompt string.
+        
+        Args:
+            messages: List of message dictionaries
+        
+        Returns:
+            Formatted prompt string
+        """
+        prompt_parts = []
+        for msg in messages:
+            role = msg.get("role", "user")
+            content = msg.get("content", "")
+            
+            if role == "system":
+                prompt_parts.append(f"System: {content}\n")
+            elif role == "user":
+                prompt_parts.append(f"User: {content}\n")
+            elif role == "assistant":
+                prompt_parts.append(f"Assistant: {content}\n")
+        
+        prompt_parts.append("Assistant: ")
+        return "\n".join(prompt_parts)
+    
+    def is_available(self) -> bool:
+        """Check if any LLM provider can take calls, from breaker state alone."""
+        return any(breaker.available for breaker in self.health.breakers.values())
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get breaker states, retry counters and coalesced calls."""
+        return {**self.health.stats(), "single_flight": self.flights.stats()}
+
+
+class LLMProvider(_ProviderBase):
+    """
+    Provider-agnostic LLM wrapper.
+    
+    Calls go to OpenAI first and fall back to HuggingFace. Each provider has
+    a circuit breaker, so one that keeps failing is skipped until a probe
+    shows it has recovered, and transient errors are retried with jittered
+    exponential backoff within a shared retry budget. Identical cacheable
+    requests made concurrently share one call.
+    """
     
     def __init__(self):
         """Initialize LLM provider."""
         self.openai_client: Optional[OpenAI] = None
-        self.provider = "openai"  # Default provider
+        # Pooled keep-alive connections, reused across calls
+        self.http_session = _requests_session()
+        self._probe_stop = threading.Event()
+        self._probe_thread: Optional[threading.Thread] = None
         
-        # Try to initialize OpenAI
+        # Try to initialize OpenAI; retries are handled here, not by the client
         if config.OPENAI_API_KEY:
             try:
-                self.openai_client = OpenAI(api_key=config.OPENAI_API_KEY)
+                self.openai_client = OpenAI(
+                    api_key=config.OPENAI_API_KEY,
+                    max_retries=0,
+                    http_client=httpx.Client(limits=_httpx_limits(), timeout=_httpx_timeout())
+                )
                 logger.info("OpenAI client initialized successfully")
             except Exception as e:
                 logger.warning(f"Failed to initialize OpenAI client: {e}")
                 self.openai_client = None
         
-        # If OpenAI fails, try HuggingFace
-        if not self.openai_client and config.HF_TOKEN:
-            self.provider = "huggingface"
-            logger.info("Using HuggingFace as LLM provider")
-        elif not self.openai_client:
-            logger.error("No LLM provider available. Please set OPENAI_API_KEY or HF_TOKEN")
+        self._init_health(SingleFlight(enabled=config.LLM_SINGLE_FLIGHT))
     
     def generate_response(
         self,
         messages: List[Dict[str, str]],
         temperature: float = 0.7,
-        max_tokens: int = 500
+        max_tokens: int = 500,
+        use_cache: bool = False
     ) -> Optional[str]:
         """
         Generate a response from the LLM.
@@ -45,17 +399,61 @@ class LLMProvider:
             messages: List of message dictionaries with 'role' and 'content'
             temperature: Sampling temperature (0.0 to 2.0)
             max_tokens: Maximum tokens in response
+            use_cache: Answer identical requests from the LLM response cache,
+                and let identical concurrent requests share one call
         
         Returns:
             Generated response text or None if error
         """
-        if self.provider == "openai" and self.openai_client:
+        if not use_cache:
+            return self._generate_with_failover(messages, temperature, max_tokens)
+        
+        key = self._cache_key(messages, temperature, max_tokens)
+        cache = get_llm_cache()
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        
+        def generate() -> Optional[str]:
+            started = time.monotonic()
+            response = self._generate_with_failover(messages, temperature, max_tokens)
+            if cache is not None and response:
+                cache.set(key, response, time.monotonic() - started)
+            return response
+        
+        # Identical requests already in progress share that call
+        response, _ = self.flights.do(key, generate)
+        return response
+    
+    def _generate_with_failover(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> Optional[str]:
+        """Try each provider whose breaker allows it until one answers."""
+        for name in self.health.candidates():
+            try:
+                return self._call_with_retries(
+                    name, lambda: self._generate(name, messages, temperature, max_tokens)
+                )
+            except Exception as e:
+                logger.error(f"{name} API error: {e}")
+        logger.error("No LLM provider available")
+        return None
+    
+    def _generate(
+        self,
+        name: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> Optional[str]:
+        """Make one call to the named provider."""
+        if name == "openai":
             return self._generate_openai(messages, temperature, max_tokens)
-        elif self.provider == "huggingface":
-            return self._generate_huggingface(messages, temperature, max_tokens)
-        else:
-            logger.error("No LLM provider available")
-            return None
+        return self._generate_huggingface(messages, temperature, max_tokens)
     
     def _generate_openai(
         self,
@@ -64,28 +462,17 @@ class LLMProvider:
         max_tokens: int
     ) -> Optional[str]:
         """Generate response using OpenAI API."""
-        try:
-            # Ensure system prompt is included
-            if not any(msg.get("role") == "system" for msg in messages):
-                messages = [{"role": "system", "content": get_system_prompt()}] + messages
-            
-            response = self.openai_client.chat.completions.create(
-                model=config.OPENAI_MODEL,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
-            
-            return response.choices[0].message.content
-        
-        except Exception as e:
-            logger.error(f"OpenAI API error: {e}")
-            # Try fallback to HuggingFace if available
-            if config.HF_TOKEN and self.provider != "huggingface":
-                logger.info("Falling back to HuggingFace")
-                self.provider = "huggingface"
-                return self._generate_huggingface(messages, temperature, max_tokens)
-            return None
+        # Ensure system prompt is included
+        messages = _with_system_prompt(messages)
+        
+        response = self.openai_client.chat.completions.create(
+            model=config.OPENAI_MODEL,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        
+        return response.choices[0].message.content
     
     def _generate_huggingface(
         self,
@@ -94,82 +481,479 @@ class LLMProvider:
         max_tokens: int
     ) -> Optional[str]:
         """Generate response using HuggingFace Inference API."""
-        try:
-            # Convert messages to prompt format
-            prompt = self._messages_to_prompt(messages)
-            
-            api_url = f"https://api-inference.huggingface.co/models/{config.HF_MODEL}"
-            headers = {
-                "Authorization": f"Bearer {config.HF_TOKEN}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "inputs": prompt,
-                "parameters": {
-                    "temperature": temperature,
-                    "max_new_tokens": max_tokens,
-                    "return_full_text": False
-                }
-            }
-            
-            response = requests.post(api_url, headers=headers, json=payload, timeout=30)
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            # Handle different response formats
-            if isinstance(result, list) and len(result) > 0:
-                if "generated_text" in result[0]:
-                    return result[0]["generated_text"]
-                elif "text" in result[0]:
-                    return result[0]["text"]
+        api_url, headers, payload = _huggingface_request(messages, temperature, max_tokens)
+        
+        response = self.http_session.post(
+            api_url, headers=headers, json=payload,
+            timeout=(config.LLM_CONNECT_TIMEOUT, config.LLM_READ_TIMEOUT)
+        )
+        response.raise_for_status()
+        
+        return _parse_huggingface_result(response.json())
+    
+    def _call_with_retries(self, name: str, call: Callable[[], T]) -> T:
+        """Run call() against a provider, retrying transient errors and updating its breaker."""
+        self.health.start_call()
+        attempt = 0
+        while True:
+            try:
+                result = call()
+            except Exception as e:
+                delay = self.health.retry_delay(name, e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+            else:
+                self.health.record_success(name)
+                return result
+    
+    def stream_response(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        use_cache: bool = False
+    ) -> Iterator[str]:
+        """
+        Generate a response from the LLM, yielding text as it is produced.
+        
+        OpenAI responses are streamed token by token. HuggingFace's Inference
+        API is not streamed, so its whole response arrives as one chunk, as
+        does a cached response. Nothing is yielded if generation fails.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            temperature: Sampling temperature (0.0 to 2.0)
+            max_tokens: Maximum tokens in response
+            use_cache: Answer identical requests from the LLM response cache
+        
+        Yields:
+            Chunks of generated text
+        
+        Raises:
+            LLMStreamError: If the stream breaks off after text was yielded
+        """
+        cache = get_llm_cache() if use_cache else None
+        if cache is not None:
+            key = self._cache_key(messages, temperature, max_tokens)
+            cached = cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+        
+        started = time.monotonic()
+        chunks: List[str] = []
+        completed: List[bool] = []
+        for chunk in self._stream_with_failover(messages, temperature, max_tokens, completed):
+            chunks.append(chunk)
+            yield chunk
+        # Streams cut short by an error are not cached
+        if cache is not None and chunks and completed:
+            cache.set(key, "".join(chunks), time.monotonic() - started)
+    
+    def _stream_with_failover(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        completed: List[bool]
+    ) -> Iterator[str]:
+        """Stream from the first provider that answers; appends to completed on a full response."""
+        for name in self.health.candidates():
+            if name != "openai":
+                try:
+                    response = self._call_with_retries(
+                        name, lambda: self._generate(name, messages, temperature, max_tokens)
+                    )
+                except Exception as e:
+                    logger.error(f"{name} API error: {e}")
+                    continue
+                if response:
+                    completed.append(True)
+                    yield response
+                return
             
-            # Fallback: return string representation
-            return str(result)
+            request = self._openai_stream_request(messages, temperature, max_tokens)
+            stream = None
+            started = False
+            try:
+                stream = self._call_with_retries(name, lambda: self.openai_client.chat.completions.create(**request))
+                for chunk in stream:
+                    text = _stream_chunk_text(chunk)
+                    if text:
+                        started = True
+                        yield text
+                completed.append(True)
+                return
+            except Exception as e:
+                # Falls back to the next provider unless text was already sent
+                self.health.record_stream_failure(name, e, stream is not None, started)
+        logger.error("No LLM provider available")
+    
+    def _ping(self, name: str) -> None:
+        """Make a cheap request to a provider, raising if it is unreachable."""
+        if name == "openai":
+            self.openai_client.with_options(timeout=config.LLM_CONNECT_TIMEOUT * 2).models.list()
+        else:
+            response = self.http_session.head(HF_API_BASE, timeout=config.LLM_CONNECT_TIMEOUT)
+            if response.status_code >= 500:
+                response.raise_for_status()
+    
+    def check_health(self) -> None:
+        """Ping providers; a success closes a half-open breaker, a failure counts against it."""
+        for name in self.health.ping_targets():
+            try:
+                self._ping(name)
+            except Exception as e:
+                self.health.record_ping(name, e)
+            else:
+                self.health.record_ping(name, None)
+    
+    def warm_up(self) -> None:
+        """Open pooled connections to the providers ahead of the first call, via a health check."""
+        self.check_health()
+    
+    def start_health_probe(self, interval: float) -> None:
+        """
+        Check provider health in a background thread.
         
-        except Exception as e:
-            logger.error(f"HuggingFace API error: {e}")
-            return None
+        Args:
+            interval: Seconds between checks (0 disables the probe)
+        """
+        if interval <= 0 or self._probe_thread is not None or not self.health.breakers:
+            return
+        
+        def run() -> None:
+            while not self._probe_stop.wait(interval):
+                self.check_health()
+        
+        self._probe_thread = threading.Thread(target=run, name="llm-health-probe", daemon=True)
+        self._probe_thread.start()
+    
+    def close(self) -> None:
+        """Stop the health probe and close the underlying HTTP connections."""
+        self._probe_stop.set()
+        if self.openai_client is not None:
+            self.openai_client.close()
+        self.http_session.close()
+
+
+class AsyncLLMProvider(_ProviderBase):
+    """
+    Asyncio counterpart of LLMProvider for the API.
     
-    def _messages_to_prompt(self, messages: List[Dict[str, str]]) -> str:
+    Uses AsyncOpenAI and an httpx.AsyncClient, so a request waiting on the
+    LLM holds no thread and concurrency is limited by the provider rather
+    than by the server's threadpool. Both keep their connections alive in
+    pools of LLM_POOL_SIZE. Breakers, retries, health checks and shared
+    calls work as in LLMProvider.
+    """
+    
+    def __init__(self):
+        """Initialize async LLM provider."""
+        self.openai_client: Optional[AsyncOpenAI] = None
+        self.http_client = httpx.AsyncClient(limits=_httpx_limits(), timeout=_httpx_timeout())
+        self._probe_task: Optional[asyncio.Task] = None
+        
+        if config.OPENAI_API_KEY:
+            try:
+                self.openai_client = AsyncOpenAI(
+                    api_key=config.OPENAI_API_KEY,
+                    max_retries=0,
+                    http_client=httpx.AsyncClient(limits=_httpx_limits(), timeout=_httpx_timeout())
+                )
+                logger.info("Async OpenAI client initialized successfully")
+            except Exception as e:
+                logger.warning(f"Failed to initialize async OpenAI client: {e}")
+                self.openai_client = None
+        
+        self._init_health(AsyncSingleFlight(enabled=config.LLM_SINGLE_FLIGHT))
+    
+    async def generate_response(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        use_cache: bool = False
+    ) -> Optional[str]:
         """
-        Convert message list to a single prompt string.
+        Generate a response from the LLM without blocking the event loop.
         
         Args:
-            messages: List of message dictionaries
+            messages: List of message dictionaries with 'role' and 'content'
+            temperature: Sampling temperature (0.0 to 2.0)
+            max_tokens: Maximum tokens in response
+            use_cache: Answer identical requests from the LLM response cache,
+                and let identical concurrent requests share one call
         
         Returns:
-            Formatted prompt string
+            Generated response text or None if error
         """
-        prompt_parts = []
-        for msg in messages:
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
+        if not use_cache:
+            return await self._generate_with_failover(messages, temperature, max_tokens)
+        
+        key = self._cache_key(messages, temperature, max_tokens)
+        cache = get_llm_cache()
+        if cache is not None:
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                return cached
+        
+        async def generate() -> Optional[str]:
+            started = time.monotonic()
+            response = await self._generate_with_failover(messages, temperature, max_tokens)
+            if cache is not None and response:
+                await asyncio.to_thread(cache.set, key, response, time.monotonic() - started)
+            return response
+        
+        # Identical requests already in progress share that call
+        response, _ = await self.flights.do(key, generate)
+        return response
+    
+    async def _generate_with_failover(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> Optional[str]:
+        """Try each provider whose breaker allows it until one answers."""
+        for name in self.health.candidates():
+            try:
+                return await self._call_with_retries(
+                    name, lambda: self._generate(name, messages, temperature, max_tokens)
+                )
+            except Exception as e:
+                logger.error(f"{name} API error: {e}")
+        logger.error("No LLM provider available")
+        return None
+    
+    async def _generate(
+        self,
+        name: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> Optional[str]:
+        """Make one call to the named provider."""
+        if name == "openai":
+            return await self._generate_openai(messages, temperature, max_tokens)
+        return await self._generate_huggingface(messages, temperature, max_tokens)
+    
+    async def _generate_openai(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> Optional[str]:
+        """Generate response using the OpenAI API."""
+        messages = _with_system_prompt(messages)
+        
+        response = await self.openai_client.chat.completions.create(
+            model=config.OPENAI_MODEL,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        
+        return response.choices[0].message.content
+    
+    async def _generate_huggingface(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> Optional[str]:
+        """Generate response using the HuggingFace Inference API."""
+        api_url, headers, payload = _huggingface_request(messages, temperature, max_tokens)
+        
+        response = await self.http_client.post(api_url, headers=headers, json=payload)
+        response.raise_for_status()
+        
+        return _parse_huggingface_result(response.json())
+    
+    async def _call_with_retries(self, name: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Await call() against a provider, retrying transient errors and updating its breaker."""
+        self.health.start_call()
+        attempt = 0
+        while True:
+            try:
+                result = await call()
+            except Exception as e:
+                delay = self.health.retry_delay(name, e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+            else:
+                self.health.record_success(name)
+                return result
+    
+    async def stream_response(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        use_cache: bool = False
+    ) -> AsyncIterator[str]:
+        """
+        Generate a response from the LLM, yielding text as it is produced.
+        
+        OpenAI responses are streamed token by token. HuggingFace's Inference
+        API is not streamed, so its whole response arrives as one chunk, as
+        does a cached response. Nothing is yielded if generation fails.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            temperature: Sampling temperature (0.0 to 2.0)
+            max_tokens: Maximum tokens in response
+            use_cache: Answer identical requests from the LLM response cache
+        
+        Yields:
+            Chunks of generated text
+        
+        Raises:
+            LLMStreamError: If the stream breaks off after text was yielded
+        """
+        cache = get_llm_cache() if use_cache else None
+        if cache is not None:
+            key = self._cache_key(messages, temperature, max_tokens)
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                yield cached
+                return
+        
+        started = time.monotonic()
+        chunks: List[str] = []
+        completed: List[bool] = []
+        async for chunk in self._stream_with_failover(messages, temperature, max_tokens, completed):
+            chunks.append(chunk)
+            yield chunk
+        # Streams cut short by an error are not cached
+        if cache is not None and chunks and completed:
+            await asyncio.to_thread(cache.set, key, "".join(chunks), time.monotonic() - started)
+    
+    async def _stream_with_failover(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        completed: List[bool]
+    ) -> AsyncIterator[str]:
+        """Stream from the first provider that answers; appends to completed on a full response."""
+        for name in self.health.candidates():
+            if name != "openai":
+                try:
+                    response = await self._call_with_retries(
+                        name, lambda: self._generate(name, messages, temperature, max_tokens)
+                    )
+                except Exception as e:
+                    logger.error(f"{name} API error: {e}")
+                    continue
+                if response:
+                    completed.append(True)
+                    yield response
+                return
             
-            if role == "system":
-                prompt_parts.append(f"System: {content}\n")
-            elif role == "user":
-                prompt_parts.append(f"User: {content}\n")
-            elif role == "assistant":
-                prompt_parts.append(f"Assistant: {content}\n")
+            request = self._openai_stream_request(messages, temperature, max_tokens)
+            stream = None
+            started = False
+            try:
+                stream = await self._call_with_retries(
+                    name, lambda: self.openai_client.chat.completions.create(**request)
+                )
+                async for chunk in stream:
+                    text = _stream_chunk_text(chunk)
+                    if text:
+                        started = True
+                        yield text
+                completed.append(True)
+                return
+            except Exception as e:
+                # Falls back to the next provider unless text was already sent
+                self.health.record_stream_failure(name, e, stream is not None, started)
+        logger.error("No LLM provider available")
+    
+    async def _ping(self, name: str) -> None:
+        """Make a cheap request to a provider, raising if it is unreachable."""
+        if name == "openai":
+            await self.openai_client.with_options(timeout=config.LLM_CONNECT_TIMEOUT * 2).models.list()
+        else:
+            response = await self.http_client.head(HF_API_BASE, timeout=config.LLM_CONNECT_TIMEOUT)
+            if response.status_code >= 500:
+                response.raise_for_status()
+    
+    async def check_health(self) -> None:
+        """Ping providers; a success closes a half-open breaker, a failure counts against it."""
+        for name in self.health.ping_targets():
+            try:
+                await self._ping(name)
+            except Exception as e:
+                self.health.record_ping(name, e)
+            else:
+                self.health.record_ping(name, None)
+    
+    async def warm_up(self) -> None:
+        """Open pooled connections to the providers ahead of the first call, via a health check."""
+        await self.check_health()
+    
+    def start_health_probe(self, interval: float) -> None:
+        """
+        Check provider health in a background task on the running event loop.
         
-        prompt_parts.append("Assistant: ")
-        return "\n".join(prompt_parts)
+        Args:
+            interval: Seconds between checks (0 disables the probe)
+        """
+        if interval <= 0 or self._probe_task is not None or not self.health.breakers:
+            return
+        
+        async def run() -> None:
+            while True:
+                await asyncio.sleep(interval)
+                await self.check_health()
+        
+        self._probe_task = asyncio.create_task(run())
     
-    def is_available(self) -> bool:
-        """Check if LLM provider is available."""
-        return (self.openai_client is not None) or (config.HF_TOKEN is not None)
+    async def aclose(self) -> None:
+        """Stop the health probe and close the underlying HTTP connections."""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+        if self.openai_client is not None:
+            await self.openai_client.close()
+        await self.http_client.aclose()
 
 
 # Global LLM provider instance
 _llm_provider: Optional[LLMProvider] = None
 
+# Global async LLM provider instance
+_async_llm_provider: Optional[AsyncLLMProvider] = None
+
 
 def get_llm_provider() -> LLMProvider:
     """Get or create the global LLM provider instance."""
     global _llm_provider
     if _llm_provider is None:
         _llm_provider = LLMProvider()
+        if config.LLM_WARMUP:
+            _llm_provider.warm_up()
+        _llm_provider.start_health_probe(config.LLM_HEALTH_CHECK_INTERVAL)
     return _llm_provider
 
+
+def get_async_llm_provider() -> AsyncLLMProvider:
+    """Get or create the global async LLM provider instance."""
+    global _async_llm_provider
+    if _async_llm_provider is None:
+        _async_llm_provider = AsyncLLMProvider()
+    return _async_llm_provider
+
+
+async def close_async_llm_provider() -> None:
+    """Close the global async LLM provider's connections, if it was created."""
+    global _async_llm_provider
+    if _async_llm_provider is not None:
+        await _async_llm_provider.aclose()
+        _async_llm_provider = None
+
@@ -0,0 +1,252 @@
+"""Content-addressed cache of LLM responses, in memory with an optional SQLite tier."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Tuple
+from core.config import config
+from core.logging_utils import logger
+
+# Disk writes between sweeps of expired and surplus entries
+SWEEP_EVERY = 100
+
+
+def cache_key(messages: List[Dict[str, str]], model: str, temperature: float, max_tokens: int) -> str:
+    """
+    Hash a completion request.
+
+    Whitespace in message contents is normalized, so prompts that differ
+    only in spacing or indentation share an entry.
+
+    Args:
+        messages: Messages as sent to the provider
+        model: Model identifier
+        temperature: Sampling temperature
+        max_tokens: Maximum tokens in the response
+
+    Returns:
+        Hex digest identifying the request
+    """
+    normalized = [
+        [str(msg.get("role", "user")).lower(), " ".join(str(msg.get("content", "")).split())]
+        for msg in messages
+    ]
+    payload = json.dumps([normalized, model, round(float(temperature), 3), int(max_tokens)])
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=20).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    LRU cache of LLM responses with a time-to-live.
+
+    The memory tier holds up to max_entries responses. When disk_path is
+    set, responses are also written to a SQLite table, which survives
+    restarts, can be shared by worker processes and is read when the
+    memory tier misses. Each entry remembers how long the original call
+    took, so hits can report the latency they saved.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            latency REAL NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache (expires_at);
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 3600.0,
+                 disk_path: Optional[Path] = None, disk_max_entries: int = 10000):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Responses kept in memory
+            ttl: Seconds a response stays valid
+            disk_path: SQLite file for the disk tier, or None for memory only
+            disk_max_entries: Responses kept on disk
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_path = disk_path
+        self.disk_max_entries = disk_max_entries
+
+        # key -> (expires_at, response, latency), least recently used first
+        self._memory: "OrderedDict[str, Tuple[float, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._writes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.latency_saved = 0.0
+
+        if disk_path is not None:
+            with self._connect() as conn:
+                conn.executescript(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's disk tier connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.disk_path.parent.mkdir(parents=True, exist_ok=True)
+            # Used only by this thread, but closed by whichever thread calls close()
+            conn = sqlite3.connect(self.disk_path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _remember(self, key: str, entry: Tuple[float, str, float]) -> None:
+        """Put an entry in the memory tier; caller holds the lock."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[float, str, float]]:
+        """Look an entry up in the disk tier."""
+        try:
+            row = self._connect().execute(
+                "SELECT expires_at, response, latency FROM llm_cache WHERE key = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+        return (row[0], row[1], row[2]) if row else None
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get a cached response.
+
+        Args:
+            key: cache_key() of the request
+
+        Returns:
+            Response text, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._memory[key]
+                entry = None
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                self.latency_saved += entry[2]
+                return entry[1]
+
+        entry = self._read_disk(key, now) if self.disk_path is not None else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self._remember(key, entry)
+            self.disk_hits += 1
+            self.latency_saved += entry[2]
+            return entry[1]
+
+    def set(self, key: str, response: str, latency: float) -> None:
+        """
+        Store a response.
+
+        Args:
+            key: cache_key() of the request
+            response: Response text
+            latency: Seconds the call that produced it took
+        """
+        entry = (time.time() + self.ttl, response, latency)
+        with self._lock:
+            self._remember(key, entry)
+            self.stores += 1
+        if self.disk_path is None:
+            return
+
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, response, latency, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, response, latency, entry[0])
+                )
+            self._writes += 1
+            if self._writes % SWEEP_EVERY == 0:
+                self._sweep_disk()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def _sweep_disk(self) -> None:
+        """Delete expired entries, then the soonest to expire beyond disk_max_entries."""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache "
+                "ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.disk_max_entries,)
+            )
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        if self.disk_path is not None:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM llm_cache")
+
+    def close(self) -> None:
+        """Close disk tier connections."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the latency hits have saved."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "disk": self.disk_path is not None,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else None,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "latency_saved_seconds": round(self.latency_saved, 3)
+            }
+
+
+# Global response cache instance
+_llm_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Get or create the global LLM response cache, or None if LLM_CACHE_ENABLED is off."""
+    global _llm_cache
+    if _llm_cache is None and config.LLM_CACHE_ENABLED:
+        _llm_cache = LLMResponseCache(
+            max_entries=config.LLM_CACHE_MAX_ENTRIES,
+            ttl=config.LLM_CACHE_TTL_SECONDS,
+            disk_path=config.llm_cache_path() if config.LLM_CACHE_DISK else None,
+            disk_max_entries=config.LLM_CACHE_DISK_MAX_ENTRIES
+        )
+    return _llm_cache
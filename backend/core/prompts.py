@@ -31,12 +31,12 @@ GREETING_MESSAGE = """Hello! I'm TalentScout, your AI hiring assistant. I'm here
 
 I'll need to collect some information from you:
 • Full Name
+• Tech Stack (languages, frameworks, databases, tools)
 • Email
 • Phone Number
 • Years of Experience
 • Desired Position(s)
 • Current Location
-• Tech Stack (languages, frameworks, databases, tools)
 
 After collecting this information, I'll generate some tailored technical questions based on your tech stack.
 
@@ -1,10 +1,15 @@
 """Question generation logic for TalentScout."""
 
+import asyncio
 import re
-from typing import List, Dict, Tuple
-from core.llm import get_llm_provider
+from contextlib import nullcontext
+from typing import Any, AsyncContextManager, Awaitable, Callable, List, Dict, Optional, Tuple
+from core.config import config
+from core.llm import get_async_llm_provider, get_llm_provider
 from core.prompts import get_question_gen_prompt
+from core.question_pool import QuestionPool, get_question_pool, tech_stack_fingerprint
 from core.logging_utils import logger
+from core.single_flight import AsyncSingleFlight, SingleFlight
 
 
 # Tech stack categories for question sampling
@@ -15,6 +20,10 @@ TECH_CATEGORIES = {
     "tools": ["docker", "kubernetes", "git", "jenkins", "aws", "gcp", "azure", "terraform", "ansible"]
 }
 
+# Concurrent generations for the same tech stack fingerprint share one call
+question_flights = SingleFlight(enabled=config.LLM_SINGLE_FLIGHT)
+async_question_flights = AsyncSingleFlight(enabled=config.LLM_SINGLE_FLIGHT)
+
 
 def categorize_tech_stack(tech_stack: List[str]) -> Dict[str, List[str]]:
     """
@@ -110,6 +119,11 @@ def generate_questions(tech_stack: List[str]) -> List[Dict[str, str]]:
     """
     Generate 3-5 technical questions based on tech stack.
     
+    Stacks with the same fingerprint share a pool of generated question
+    sets; once the pool is full, sets are drawn from it instead of calling
+    the LLM. Otherwise concurrent calls for the same fingerprint share one
+    generation.
+    
     Args:
         tech_stack: List of technologies
     
@@ -120,6 +134,25 @@ def generate_questions(tech_stack: List[str]) -> List[Dict[str, str]]:
         logger.warning("Empty tech stack provided for question generation")
         return []
     
+    pool = get_question_pool()
+    fingerprint = tech_stack_fingerprint(tech_stack)
+    if pool is not None:
+        questions = pool.draw(fingerprint)
+        if questions is not None:
+            return questions
+    
+    questions, _ = question_flights.do(
+        fingerprint, lambda: _generate_new_questions(tech_stack, pool, fingerprint)
+    )
+    return [dict(question) for question in questions]
+
+
+def _generate_new_questions(
+    tech_stack: List[str],
+    pool: Optional[QuestionPool],
+    fingerprint: str
+) -> List[Dict[str, str]]:
+    """Generate questions with the LLM, adding complete sets to the pool."""
     try:
         llm_provider = get_llm_provider()
         
@@ -127,50 +160,236 @@ def generate_questions(tech_stack: List[str]) -> List[Dict[str, str]]:
             logger.error("LLM provider not available for question generation")
             return _get_fallback_questions(tech_stack)
         
-        # Get question generation prompt
-        prompt = get_question_gen_prompt(tech_stack)
-        
-        # Prepare messages for LLM
-        messages = [
-            {"role": "user", "content": prompt}
-        ]
-        
-        # Generate response
+        # Generate response; the pool needs fresh variants, not cached ones
         response = llm_provider.generate_response(
-            messages=messages,
+            messages=_question_gen_messages(tech_stack),
             temperature=0.8,
-            max_tokens=800
+            max_tokens=800,
+            use_cache=pool is None
         )
         
-        if not response:
-            logger.warning("Empty response from LLM, using fallback questions")
-            return _get_fallback_questions(tech_stack)
-        
-        # Parse questions from response
-        questions = parse_questions_from_response(response)
-        
-        # Ensure we have 3-5 questions
-        if len(questions) < 3:
-            logger.warning(f"Only {len(questions)} questions generated, supplementing with fallback")
-            fallback = _get_fallback_questions(tech_stack)
-            questions.extend(fallback[:5 - len(questions)])
-        elif len(questions) > 5:
-            questions = questions[:5]
-        
-        # Validate questions
-        questions = [q for q in questions if q.get("text") and len(q["text"].strip()) > 10]
-        
-        if len(questions) < 3:
+        if pool is not None:
+            variant = _llm_question_set(response)
+            if variant is not None:
+                pool.add(fingerprint, variant)
+        return _questions_from_response(response, tech_stack)
+    
+    except Exception as e:
+        logger.error(f"Error generating questions: {e}")
+        return _get_fallback_questions(tech_stack)
+
+
+async def generate_questions_async(
+    tech_stack: List[str],
+    on_question: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    admission: Optional[Callable[[], AsyncContextManager[None]]] = None
+) -> List[Dict[str, str]]:
+    """
+    Generate 3-5 technical questions without blocking the event loop.
+    
+    Same behaviour as generate_questions(), using the async LLM provider.
+    When on_question is given the completion is streamed and each question
+    is passed to it as soon as it has been generated. Those are provisional:
+    the returned list is validated and may be supplemented with fallback
+    questions.
+    
+    Args:
+        tech_stack: List of technologies
+        on_question: Optional coroutine called with each parsed question
+        admission: Optional factory for a context held around the LLM call.
+            Pool draws and callers joining a shared generation never enter
+            it; errors raised on entering it propagate to every caller
+            sharing the generation.
+    
+    Returns:
+        List of question dictionaries with 'text', 'difficulty', and 'difficulty_stars'
+    """
+    if not tech_stack:
+        logger.warning("Empty tech stack provided for question generation")
+        return []
+    
+    pool = get_question_pool()
+    fingerprint = tech_stack_fingerprint(tech_stack)
+    if pool is not None:
+        questions = pool.draw(fingerprint)
+        if questions is not None:
+            if on_question is not None:
+                for question in questions:
+                    await on_question(question)
+            return questions
+    
+    # Only the caller that starts a shared generation gets questions as they
+    # stream. The shared task only queues them; this caller reports them from
+    # its own task, so a slow on_question never holds up the other waiters
+    streamed: asyncio.Queue = asyncio.Queue()
+    
+    async def queue_question(question: Dict[str, Any]) -> None:
+        streamed.put_nowait(question)
+    
+    flight = asyncio.ensure_future(async_question_flights.do(
+        fingerprint,
+        lambda: _generate_new_questions_async(
+            tech_stack, queue_question if on_question is not None else None, pool, fingerprint, admission
+        )
+    ))
+    try:
+        await _relay_questions(flight, streamed, on_question)
+    finally:
+        flight.cancel()
+    questions, shared = flight.result()
+    
+    if shared and on_question is not None:
+        for question in questions:
+            await on_question(question)
+    return [dict(question) for question in questions]
+
+
+async def _relay_questions(
+    flight: asyncio.Future,
+    streamed: asyncio.Queue,
+    on_question: Optional[Callable[[Dict[str, Any]], Awaitable[None]]]
+) -> None:
+    """Pass queued questions to on_question until the flight has finished and the queue is empty."""
+    reporting = on_question is not None
+    while not flight.done() or not streamed.empty():
+        getter = asyncio.ensure_future(streamed.get())
+        try:
+            await asyncio.wait({getter, flight}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not getter.done():
+                getter.cancel()
+        if getter.cancelled() or not reporting:
+            continue
+        try:
+            await on_question(getter.result())
+        except Exception as e:
+            logger.warning(f"Error reporting generated question: {e}")
+            reporting = False
+
+
+async def _generate_new_questions_async(
+    tech_stack: List[str],
+    on_question: Optional[Callable[[Dict[str, Any]], Awaitable[None]]],
+    pool: Optional[QuestionPool],
+    fingerprint: str,
+    admission: Optional[Callable[[], AsyncContextManager[None]]] = None
+) -> List[Dict[str, str]]:
+    """Generate questions with the async LLM provider, adding complete sets to the pool."""
+    try:
+        llm_provider = get_async_llm_provider()
+        available = llm_provider.is_available()
+    except Exception as e:
+        logger.error(f"Error generating questions: {e}")
+        return _get_fallback_questions(tech_stack)
+    
+    if not available:
+        logger.error("LLM provider not available for question generation")
+        return _get_fallback_questions(tech_stack)
+    
+    # Errors entering the admission context (e.g. no free slot) propagate
+    async with admission() if admission is not None else nullcontext():
+        try:
+            if on_question is None:
+                response = await llm_provider.generate_response(
+                    messages=_question_gen_messages(tech_stack),
+                    temperature=0.8,
+                    max_tokens=800,
+                    use_cache=pool is None
+                )
+            else:
+                response = await _stream_questions(llm_provider, tech_stack, on_question, use_cache=pool is None)
+        except Exception as e:
+            logger.error(f"Error generating questions: {e}")
             return _get_fallback_questions(tech_stack)
-        
-        logger.info(f"Generated {len(questions)} questions for tech stack: {tech_stack}")
-        return questions[:5]
+    
+    try:
+        if pool is not None:
+            variant = _llm_question_set(response)
+            if variant is not None:
+                # Adding may persist the pool to disk
+                await asyncio.to_thread(pool.add, fingerprint, variant)
+        return _questions_from_response(response, tech_stack)
     
     except Exception as e:
         logger.error(f"Error generating questions: {e}")
         return _get_fallback_questions(tech_stack)
 
 
+async def _stream_questions(
+    llm_provider: Any,
+    tech_stack: List[str],
+    on_question: Callable[[Dict[str, Any]], Awaitable[None]],
+    use_cache: bool = True
+) -> str:
+    """Stream a question-generation completion, reporting questions as they complete."""
+    response = ""
+    reported = 0
+    async for chunk in llm_provider.stream_response(
+        messages=_question_gen_messages(tech_stack),
+        temperature=0.8,
+        max_tokens=800,
+        use_cache=use_cache
+    ):
+        response += chunk
+        if "\n" not in chunk:
+            continue
+        # The last parsed question may still be growing; report the ones before it
+        questions = parse_questions_from_response(response)
+        for question in questions[reported:len(questions) - 1]:
+            await on_question(question)
+        reported = max(reported, len(questions) - 1)
+    
+    for question in parse_questions_from_response(response)[reported:]:
+        await on_question(question)
+    return response
+
+
+def _question_gen_messages(tech_stack: List[str]) -> List[Dict[str, str]]:
+    """Build the LLM messages asking for questions about a tech stack."""
+    # Get question generation prompt
+    prompt = get_question_gen_prompt(tech_stack)
+    
+    return [
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _questions_from_response(response: Optional[str], tech_stack: List[str]) -> List[Dict[str, str]]:
+    """Parse and validate questions from an LLM response, falling back as needed."""
+    if not response:
+        logger.warning("Empty response from LLM, using fallback questions")
+        return _get_fallback_questions(tech_stack)
+    
+    # Parse questions from response
+    questions = parse_questions_from_response(response)
+    
+    # Ensure we have 3-5 questions
+    if len(questions) < 3:
+        logger.warning(f"Only {len(questions)} questions generated, supplementing with fallback")
+        fallback = _get_fallback_questions(tech_stack)
+        questions.extend(fallback[:5 - len(questions)])
+    elif len(questions) > 5:
+        questions = questions[:5]
+    
+    # Validate questions
+    questions = [q for q in questions if q.get("text") and len(q["text"].strip()) > 10]
+    
+    if len(questions) < 3:
+        return _get_fallback_questions(tech_stack)
+    
+    logger.info(f"Generated {len(questions)} questions for tech stack: {tech_stack}")
+    return questions[:5]
+
+
+def _llm_question_set(response: Optional[str]) -> Optional[List[Dict[str, str]]]:
+    """Questions from an LLM response if it holds a complete set, without fallback ones."""
+    if not response:
+        return None
+    questions = [q for q in parse_questions_from_response(response)[:5]
+                 if q.get("text") and len(q["text"].strip()) > 10]
+    return questions if len(questions) >= 3 else None
+
+
 def _get_fallback_questions(tech_stack: List[str]) -> List[Dict[str, str]]:
     """
     Get fallback questions if LLM generation fails.
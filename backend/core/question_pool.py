@@ -0,0 +1,211 @@
+"""Pools of generated question sets, shared by candidates with equivalent tech stacks."""
+
+import hashlib
+import json
+import random
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+from core.config import config
+from core.fileio import atomic_write_json
+from core.logging_utils import logger
+from core.prompts import QUESTION_GEN_PROMPT
+
+# Alternative spellings mapped to one canonical (lowercase) name
+TECH_ALIASES = {
+    "py": "python", "python3": "python", "python 3": "python",
+    "js": "javascript", "ecmascript": "javascript",
+    "ts": "typescript",
+    "golang": "go",
+    "node": "node.js", "nodejs": "node.js", "node js": "node.js",
+    "reactjs": "react", "react.js": "react",
+    "vuejs": "vue", "vue.js": "vue",
+    "angularjs": "angular",
+    "expressjs": "express", "express.js": "express",
+    "nextjs": "next.js", "next": "next.js",
+    "postgres": "postgresql", "psql": "postgresql", "pg": "postgresql",
+    "mongo": "mongodb",
+    "mssql": "sql server", "ms sql": "sql server",
+    "k8s": "kubernetes",
+    "amazon web services": "aws",
+    "google cloud": "gcp", "google cloud platform": "gcp",
+    "microsoft azure": "azure",
+    "c sharp": "c#", "csharp": "c#",
+    "cpp": "c++",
+    "ror": "rails", "ruby on rails": "rails",
+    "springboot": "spring boot",
+    "tf": "terraform",
+    "elastic": "elasticsearch",
+}
+
+# Changes whenever the question prompt does, so old sets are not reused
+TEMPLATE_VERSION = hashlib.blake2b(QUESTION_GEN_PROMPT.encode("utf-8"), digest_size=4).hexdigest()
+
+
+def canonical_tech(name: str) -> str:
+    """
+    Canonical form of a technology name: lowercased, whitespace collapsed
+    and aliases resolved.
+
+    Args:
+        name: Technology as entered
+
+    Returns:
+        Canonical name
+    """
+    key = " ".join(str(name).lower().split())
+    return TECH_ALIASES.get(key, key)
+
+
+def tech_stack_fingerprint(tech_stack: List[str]) -> str:
+    """
+    Key shared by tech stacks that should get the same questions.
+
+    Args:
+        tech_stack: Technologies as entered
+
+    Returns:
+        Prompt template version followed by the sorted, de-duplicated
+        canonical names, e.g. 'v1a2b3c4d:django,postgresql,python'
+    """
+    names = sorted({canonical_tech(tech) for tech in tech_stack if str(tech).strip()})
+    return f"v{TEMPLATE_VERSION}:{','.join(names)}"
+
+
+class QuestionPool:
+    """
+    Up to `variants` generated question sets per tech stack fingerprint.
+
+    While a fingerprint's pool is not full, draw() returns None so the
+    caller generates a new set and add()s it. Once full, draw() hands out
+    the sets in a shuffled order, without repeats until every set has been
+    used, so candidates with the same stack still see some variety while
+    the LLM is skipped. At most max_keys fingerprints are kept, least
+    recently used first out; with a path the pool is saved to a JSON file
+    on every addition and reloaded on start.
+    """
+
+    def __init__(self, variants: int = 5, max_keys: int = 500, path: Optional[Path] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            variants: Question sets kept per fingerprint
+            max_keys: Fingerprints kept
+            path: JSON file to persist the pool to, or None for memory only
+        """
+        self.variants = max(1, variants)
+        self.max_keys = max_keys
+        self.path = path
+        self._lock = threading.Lock()
+        # fingerprint -> question sets, least recently used first
+        self._pool: "OrderedDict[str, List[List[Dict[str, Any]]]]" = OrderedDict()
+        # fingerprint -> indexes of sets not yet handed out this round
+        self._decks: Dict[str, List[int]] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+        if path is not None:
+            self._load()
+
+    def _load(self) -> None:
+        """Read the persisted pool, dropping sets from older prompt templates."""
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Error loading question pool: {e}")
+            return
+        prefix = f"v{TEMPLATE_VERSION}:"
+        for key, sets in data.get("pool", {}).items():
+            if key.startswith(prefix):
+                self._pool[key] = sets[:self.variants]
+
+    def _save(self) -> None:
+        """Persist the pool; caller holds the lock."""
+        try:
+            atomic_write_json(self.path, {"pool": self._pool})
+        except OSError as e:
+            logger.warning(f"Error saving question pool: {e}")
+
+    def draw(self, fingerprint: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Take a question set for a fingerprint.
+
+        Args:
+            fingerprint: tech_stack_fingerprint() of the candidate's stack
+
+        Returns:
+            A copy of a pooled set, or None if the pool needs another set
+        """
+        with self._lock:
+            sets = self._pool.get(fingerprint)
+            if sets is None or len(sets) < self.variants:
+                self.misses += 1
+                return None
+            self._pool.move_to_end(fingerprint)
+
+            deck = self._decks.get(fingerprint)
+            if not deck:
+                deck = list(range(len(sets)))
+                random.shuffle(deck)
+                self._decks[fingerprint] = deck
+            self.hits += 1
+            return [dict(question) for question in sets[deck.pop()]]
+
+    def add(self, fingerprint: str, questions: List[Dict[str, Any]]) -> None:
+        """
+        Add a freshly generated question set.
+
+        Sets beyond the pool size, e.g. from concurrent generations, are
+        dropped.
+
+        Args:
+            fingerprint: tech_stack_fingerprint() of the stack
+            questions: Question set produced by the LLM
+        """
+        with self._lock:
+            sets = self._pool.setdefault(fingerprint, [])
+            self._pool.move_to_end(fingerprint)
+            if len(sets) >= self.variants:
+                return
+            sets.append([dict(question) for question in questions])
+            self._decks.pop(fingerprint, None)
+            while len(self._pool) > self.max_keys:
+                evicted, _ = self._pool.popitem(last=False)
+                self._decks.pop(evicted, None)
+            if self.path is not None:
+                self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool size and hit/miss counters."""
+        with self._lock:
+            draws = self.hits + self.misses
+            return {
+                "stacks": len(self._pool),
+                "full_stacks": sum(1 for sets in self._pool.values() if len(sets) >= self.variants),
+                "variants": self.variants,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / draws, 3) if draws else None
+            }
+
+
+# Global question pool instance
+_question_pool: Optional[QuestionPool] = None
+
+
+def get_question_pool() -> Optional[QuestionPool]:
+    """Get or create the global question pool, or None if QUESTION_POOL_VARIANTS is 0."""
+    global _question_pool
+    if _question_pool is None and config.QUESTION_POOL_VARIANTS > 0:
+        _question_pool = QuestionPool(
+            variants=config.QUESTION_POOL_VARIANTS,
+            max_keys=config.QUESTION_POOL_MAX_STACKS,
+            path=config.question_pool_path() if config.QUESTION_POOL_PERSIST else None
+        )
+    return _question_pool
@@ -0,0 +1,306 @@
+"""Retention policy enforcement for stored candidate sessions.
+
+Run periodically by the API (see RETENTION_* settings) or from the command
+line:
+
+    python -m core.retention --max-age-days 180 --max-count 50000 --dry-run
+    python -m core.retention --cold-after-days 30
+"""
+
+import argparse
+import gzip
+import heapq
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+from core.config import config
+from core.logging_utils import logger
+from core.storage import (
+    archive_cold_sessions,
+    get_cold_archive,
+    get_storage_backend,
+    get_storage_size_bytes,
+    delete_sessions,
+    iter_sessions
+)
+
+
+def find_expired_sessions(
+    max_age_days: Optional[int] = None,
+    max_count: Optional[int] = None,
+    now: Optional[datetime] = None
+) -> List[Tuple[str, str]]:
+    """
+    Find sessions that fall outside the retention policy.
+
+    Sessions are streamed, so memory is bounded by max_count plus the
+    number of expired sessions rather than by the size of the store.
+
+    Args:
+        max_age_days: Sessions last saved more than this many days ago expire
+        max_count: Keep at most this many of the newest sessions
+        now: Reference time (defaults to the current time)
+
+    Returns:
+        List of (timestamp, session_id) pairs to purge, oldest first
+    """
+    now = now or datetime.now()
+    cutoff = (now - timedelta(days=max_age_days)).isoformat() if max_age_days else None
+
+    expired: List[Tuple[str, str]] = []
+    newest: List[Tuple[str, str]] = []  # Min-heap of the max_count newest sessions
+
+    for session_data in iter_sessions():
+        entry = (session_data.get("timestamp", ""), session_data["session_id"])
+        if cutoff is not None and entry[0] < cutoff:
+            expired.append(entry)
+        elif not max_count:
+            continue
+        elif len(newest) < max_count:
+            heapq.heappush(newest, entry)
+        else:
+            # Keep the newer of the two; the older one is over the limit
+            expired.append(heapq.heappushpop(newest, entry))
+
+    expired.sort()
+    return expired
+
+
+def run_retention(
+    max_age_days: Optional[int] = None,
+    max_count: Optional[int] = None,
+    archive_path: Optional[Path] = None,
+    batch_size: int = 500,
+    batch_pause: float = 0.05,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Purge (and optionally archive) sessions outside the retention policy.
+
+    Deletes go through the storage API in batches, each written to the
+    store and sidecars at once, with a short pause in between so saves
+    from the chat path keep flowing while the job runs. A session saved
+    again after it was selected is left alone. Purged records are appended
+    to the archive as soon as their batch is deleted.
+
+    Args:
+        max_age_days: Sessions last saved more than this many days ago expire
+        max_count: Keep at most this many of the newest sessions
+        archive_path: Append purged sessions to this NDJSON file
+                      (gzip-compressed if it ends in .gz)
+        batch_size: Sessions deleted between pauses
+        batch_pause: Seconds to pause between batches
+        dry_run: Report what would be purged without deleting anything
+
+    Returns:
+        Report with counts of examined/purged/archived records and bytes reclaimed
+    """
+    started = time.perf_counter()
+    report: Dict[str, Any] = {
+        "started_at": datetime.now().isoformat(),
+        "dry_run": dry_run,
+        "candidates": 0,
+        "purged": 0,
+        "archived": 0,
+        "skipped": 0,
+        "bytes_before": 0,
+        "bytes_after": 0,
+        "bytes_reclaimed": 0,
+        "duration_ms": 0.0
+    }
+
+    if not config.ENABLE_STORAGE or not (max_age_days or max_count):
+        return report
+
+    backend = get_storage_backend()
+    report["bytes_before"] = get_storage_size_bytes()
+
+    expired = find_expired_sessions(max_age_days, max_count)
+    report["candidates"] = len(expired)
+
+    if not dry_run and expired:
+        archive = None
+        if archive_path is not None:
+            archive_path.parent.mkdir(parents=True, exist_ok=True)
+            opener = gzip.open if archive_path.suffix == ".gz" else open
+            archive = opener(archive_path, "at")
+
+        try:
+            for start in range(0, len(expired), batch_size):
+                if start:
+                    time.sleep(batch_pause)
+                batch = {session_id: timestamp for timestamp, session_id in expired[start:start + batch_size]}
+                removed = delete_sessions(batch)
+                report["purged"] += len(removed)
+                # The rest were deleted or saved again since they were selected
+                report["skipped"] += len(batch) - len(removed)
+
+                if archive is not None:
+                    for session_data in removed:
+                        archive.write(json.dumps(session_data) + "\n")
+                    archive.flush()
+                    report["archived"] += len(removed)
+        finally:
+            if archive is not None:
+                archive.close()
+
+        backend.compact()
+        get_cold_archive().compact()
+
+    report["bytes_after"] = get_storage_size_bytes()
+    report["bytes_reclaimed"] = max(0, report["bytes_before"] - report["bytes_after"])
+    report["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    logger.info(
+        f"Retention: purged {report['purged']} of {report['candidates']} expired session(s), "
+        f"reclaimed {report['bytes_reclaimed']} bytes"
+    )
+    return report
+
+
+class RetentionScheduler:
+    """Background thread that runs the retention policy at a fixed interval."""
+
+    def __init__(
+        self,
+        interval_seconds: float,
+        max_age_days: Optional[int] = None,
+        max_count: Optional[int] = None,
+        archive_path: Optional[Path] = None,
+        batch_size: int = 500,
+        cold_after_days: Optional[int] = None
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            interval_seconds: Time between runs
+            max_age_days: Sessions last saved more than this many days ago expire
+            max_count: Keep at most this many of the newest sessions
+            archive_path: Optional NDJSON archive for purged sessions
+            batch_size: Sessions deleted between pauses
+            cold_after_days: Move sessions older than this into the cold archive
+        """
+        self.interval_seconds = interval_seconds
+        self.max_age_days = max_age_days
+        self.max_count = max_count
+        self.archive_path = archive_path
+        self.batch_size = batch_size
+        self.cold_after_days = cold_after_days
+
+        self.last_report: Optional[Dict[str, Any]] = None
+        self.last_cold_report: Optional[Dict[str, Any]] = None
+        self.runs = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="retention", daemon=True)
+        self._thread.start()
+        logger.info(f"Retention scheduler started (every {self.interval_seconds:.0f}s)")
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop the background thread after the current run."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        """Run the policy immediately, then once per interval."""
+        while not self._stop.is_set():
+            try:
+                self.last_report = run_retention(
+                    max_age_days=self.max_age_days,
+                    max_count=self.max_count,
+                    archive_path=self.archive_path,
+                    batch_size=self.batch_size
+                )
+                if self.cold_after_days:
+                    self.last_cold_report = archive_cold_sessions(
+                        self.cold_after_days, batch_size=self.batch_size
+                    )
+                self.runs += 1
+            except Exception as e:
+                logger.error(f"Retention run failed: {e}")
+            self._stop.wait(self.interval_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the scheduler configuration and the last run's report."""
+        return {
+            "interval_seconds": self.interval_seconds,
+            "max_age_days": self.max_age_days,
+            "max_count": self.max_count,
+            "cold_after_days": self.cold_after_days,
+            "runs": self.runs,
+            "last_report": self.last_report,
+            "last_cold_report": self.last_cold_report
+        }
+
+
+def create_retention_scheduler() -> Optional[RetentionScheduler]:
+    """
+    Create a scheduler from configuration.
+
+    Returns:
+        Scheduler, or None if no retention limit, cold archive threshold
+        or interval is configured
+    """
+    if not config.ENABLE_STORAGE or config.RETENTION_INTERVAL_HOURS <= 0:
+        return None
+    if not (config.RETENTION_MAX_AGE_DAYS or config.RETENTION_MAX_COUNT
+            or config.COLD_ARCHIVE_AFTER_DAYS):
+        return None
+
+    return RetentionScheduler(
+        interval_seconds=config.RETENTION_INTERVAL_HOURS * 3600,
+        max_age_days=config.RETENTION_MAX_AGE_DAYS or None,
+        max_count=config.RETENTION_MAX_COUNT or None,
+        archive_path=Path(config.RETENTION_ARCHIVE_PATH) if config.RETENTION_ARCHIVE_PATH else None,
+        batch_size=config.RETENTION_BATCH_SIZE,
+        cold_after_days=config.COLD_ARCHIVE_AFTER_DAYS or None
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Purge stored sessions outside the retention policy.")
+    parser.add_argument("--max-age-days", type=int, default=config.RETENTION_MAX_AGE_DAYS or None,
+                        help="purge sessions last saved more than this many days ago")
+    parser.add_argument("--max-count", type=int, default=config.RETENTION_MAX_COUNT or None,
+                        help="keep at most this many of the newest sessions")
+    parser.add_argument("--archive", type=Path, default=None,
+                        help="append purged sessions to this NDJSON file (.gz to compress)")
+    parser.add_argument("--batch-size", type=int, default=config.RETENTION_BATCH_SIZE,
+                        help="sessions deleted between pauses")
+    parser.add_argument("--cold-after-days", type=int, default=config.COLD_ARCHIVE_AFTER_DAYS or None,
+                        help="move sessions older than this many days into the cold archive")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="report what would be purged without deleting")
+    args = parser.parse_args(argv)
+
+    if not (args.max_age_days or args.max_count or args.cold_after_days):
+        parser.error("set --max-age-days, --max-count and/or --cold-after-days "
+                     "(or RETENTION_*/COLD_ARCHIVE_* in .env)")
+
+    report = run_retention(
+        max_age_days=args.max_age_days,
+        max_count=args.max_count,
+        archive_path=args.archive,
+        batch_size=args.batch_size,
+        dry_run=args.dry_run
+    )
+    if args.cold_after_days and not args.dry_run:
+        report["cold_archive"] = archive_cold_sessions(args.cold_after_days, batch_size=args.batch_size)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,41 @@
+"""Per-session locks that let one request at a time work on a session."""
+
+import asyncio
+import weakref
+
+
+class SessionLocks:
+    """
+    asyncio locks created per session on demand.
+
+    Requests for the same session get the same lock, so their turns run
+    one after another, while requests for different sessions never wait
+    for each other, even during long LLM calls. A lock is only referenced
+    weakly here: it is dropped as soon as no request holds or waits for
+    it, so the table only grows with the sessions in use. Locks are per
+    process; across workers, concurrent updates are caught by the session
+    store's versioning instead.
+    """
+
+    def __init__(self):
+        """Initialize the lock table."""
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def lock(self, session_id: str) -> asyncio.Lock:
+        """
+        Get the lock guarding a session.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Lock to hold while reading and updating the session
+        """
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[session_id] = lock
+        return lock
+
+    def __len__(self) -> int:
+        return len(self._locks)
@@ -0,0 +1,492 @@
+"""Append-only JSONL session log with background compaction for TalentScout."""
+
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, BinaryIO, Iterator, Tuple
+from core.fileio import atomic_write_json, file_lock
+from core.logging_utils import logger
+
+
+class SessionLog:
+    """
+    Append-only session store backed by a JSON Lines file.
+
+    Every save appends one record and every delete appends a tombstone, so
+    write cost does not depend on the number of stored sessions. An in-memory
+    index maps each session_id to the byte offset of its latest record.
+    Superseded records and tombstones are folded away by compaction, which
+    runs in a background thread once enough dead records have accumulated.
+
+    The index is persisted to a hint file next to the log, so a new process
+    only scans records appended after the hint was written instead of the
+    whole log.
+
+    Appends and the final swap of a compaction hold an advisory lock on a
+    file next to the log, so worker processes sharing it never append to a
+    log that is being replaced. A second lock file lets only one process
+    compact the log at a time.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        compaction_ratio: float = 0.5,
+        compaction_min_records: int = 1000,
+        index_flush_records: int = 1000
+    ):
+        """
+        Initialize the session log.
+
+        Args:
+            path: Path to the JSONL log file
+            compaction_ratio: Fraction of dead records that triggers compaction
+            compaction_min_records: Minimum dead records before compacting
+            index_flush_records: Appends between writes of the index hint file
+        """
+        self.path = path
+        self.index_path = path.with_name(path.name + ".idx")
+        self.lock_path = path.with_name(path.name + ".lock")
+        self.compact_lock_path = path.with_name(path.name + ".compact.lock")
+        self.compaction_ratio = compaction_ratio
+        self.compaction_min_records = compaction_min_records
+        self.index_flush_records = index_flush_records
+
+        self._lock = threading.RLock()
+        self._offsets: Optional[Dict[str, int]] = None
+        self._end = 0  # Bytes of the log covered by the index
+        self._inode: Optional[int] = None
+        self._records = 0  # Lines in the log, live or dead
+        self._needs_newline = False
+        self._compacting = False
+        self._appends_since_index = 0
+        # Bumped whenever another process changes the log under us
+        self.external_changes = 0
+
+    # Index maintenance
+
+    def _apply_line(self, index: Dict[str, int], line: bytes, offset: int) -> None:
+        """Apply one raw log line at offset to an index."""
+        try:
+            record = json.loads(line)
+            session_id = record["session_id"]
+        except (json.JSONDecodeError, KeyError, TypeError, UnicodeDecodeError):
+            logger.warning(f"Skipping unreadable record at offset {offset} in {self.path.name}")
+            return
+
+        if record.get("deleted"):
+            index.pop(session_id, None)
+        else:
+            index[session_id] = offset
+
+    def _scan(self, index: Dict[str, int], start: int) -> Tuple[int, int, bool]:
+        """
+        Scan the log from start and apply each line to index.
+
+        Returns:
+            Tuple of (end offset, lines scanned, whether the last line is torn)
+        """
+        lines = 0
+        torn = False
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Partial write from a crash; the next append starts a new line
+                    torn = True
+                    offset += len(line)
+                    break
+                if line.strip():
+                    self._apply_line(index, line, offset)
+                    lines += 1
+                offset += len(line)
+        return offset, lines, torn
+
+    def _refresh(self) -> None:
+        """Bring the index up to date with the file on disk."""
+        if not self.path.exists():
+            if self._offsets:
+                self.external_changes += 1
+            self._offsets = {}
+            self._end = 0
+            self._inode = None
+            self._records = 0
+            self._needs_newline = False
+            return
+
+        stat = self.path.stat()
+        if self._offsets is None:
+            self._load_index(stat)
+
+        if self._offsets is None or stat.st_ino != self._inode or stat.st_size < self._end:
+            # First use without a hint, or the log was compacted/replaced elsewhere
+            if self._offsets is not None:
+                self.external_changes += 1
+            self._offsets = {}
+            self._end, self._records, self._needs_newline = self._scan(self._offsets, 0)
+            self._inode = stat.st_ino
+        elif stat.st_size > self._end:
+            # Another process appended records since we last looked
+            self.external_changes += 1
+            self._end, lines, self._needs_newline = self._scan(self._offsets, self._end)
+            self._records += lines
+
+    def _load_index(self, stat: os.stat_result) -> None:
+        """Load the persisted index if it still describes this log file."""
+        try:
+            with open(self.index_path, 'r') as f:
+                hint = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            return
+
+        if hint.get("inode") != stat.st_ino or hint.get("end", 0) > stat.st_size:
+            return
+        self._offsets = hint["offsets"]
+        self._end = hint["end"]
+        self._records = hint["records"]
+        self._needs_newline = hint.get("needs_newline", False)
+        self._inode = stat.st_ino
+
+    def save_index(self) -> None:
+        """Persist the session_id -> offset index to the hint file."""
+        with self._lock:
+            if self._offsets is None or self._inode is None:
+                return
+            atomic_write_json(self.index_path, {
+                "inode": self._inode,
+                "end": self._end,
+                "records": self._records,
+                "needs_newline": self._needs_newline,
+                "offsets": self._offsets
+            })
+            self._appends_since_index = 0
+
+    def _append_locked(self, record: Dict[str, Any]) -> None:
+        """Write a record at the end of the log; the caller holds both locks and has refreshed."""
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            if self._needs_newline:
+                f.write(b"\n")
+                self._needs_newline = False
+                self._end += 1
+            offset = f.tell()
+            f.write(line)
+
+        if offset != self._end:
+            # A writer that bypassed the file lock appended between our
+            # refresh and write; index its records along with ours
+            self.external_changes += 1
+            self._end, lines, self._needs_newline = self._scan(self._offsets, self._end)
+            self._records += lines
+        else:
+            self._apply_line(self._offsets, line, offset)
+            self._end = offset + len(line)
+            self._records += 1
+        if self._inode is None:
+            self._inode = self.path.stat().st_ino
+
+        self._appends_since_index += 1
+        if self._appends_since_index >= self.index_flush_records:
+            self.save_index()
+
+    def _open_current(self) -> BinaryIO:
+        """
+        Open the log file the index describes; the caller holds the lock.
+
+        Another process may swap in a compacted log between a refresh and
+        the open, so the opened file's inode is checked against the index.
+        """
+        for _ in range(3):
+            self._refresh()
+            try:
+                f = open(self.path, "rb")
+            except FileNotFoundError:
+                continue
+            if os.fstat(f.fileno()).st_ino == self._inode:
+                return f
+            f.close()
+        raise RuntimeError(f"{self.path.name} kept being replaced while opening it")
+
+    def _read(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Read a session's latest record; the caller holds the lock and has refreshed."""
+        if session_id not in self._offsets:
+            return None
+        with self._open_current() as f:
+            offset = self._offsets.get(session_id)
+            if offset is None:
+                return None
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    # Public API
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """
+        Append a session record to the log.
+
+        Args:
+            record: Session record; must contain 'session_id'
+        """
+        with self._lock, file_lock(self.lock_path):
+            self._refresh()
+            self._append_locked(record)
+
+        self._maybe_compact()
+
+    def replace(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Append a session record and return the one it supersedes.
+
+        The previous record is read under the same locks as the append, so
+        concurrent writers of one session each get the record they replaced.
+
+        Args:
+            record: Session record; must contain 'session_id'
+
+        Returns:
+            The previous record, or None if the session is new
+        """
+        with self._lock, file_lock(self.lock_path):
+            self._refresh()
+            previous = self._read(record["session_id"])
+            self._append_locked(record)
+
+        self._maybe_compact()
+        return previous
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the latest record for a session.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Session record or None if not found
+        """
+        with self._lock:
+            self._refresh()
+            return self._read(session_id)
+
+    def delete(self, session_id: str, timestamp: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Delete a session by appending a tombstone.
+
+        Args:
+            session_id: Session identifier
+            timestamp: Only delete if the latest record still has this timestamp
+
+        Returns:
+            The deleted record, or None if the session did not exist (or
+            was saved again since timestamp)
+        """
+        with self._lock, file_lock(self.lock_path):
+            self._refresh()
+            removed = self._read(session_id)
+            if removed is None or (timestamp is not None and removed.get("timestamp", "") != timestamp):
+                return None
+            self._append_locked({
+                "session_id": session_id,
+                "deleted": True,
+                "timestamp": datetime.now().isoformat()
+            })
+
+        self._maybe_compact()
+        return removed
+
+    def clear(self) -> None:
+        """Remove the log file and reset the index."""
+        with self._lock, file_lock(self.lock_path):
+            if self.path.exists():
+                self.path.unlink()
+            self.index_path.unlink(missing_ok=True)
+            self._refresh()
+
+    def generation(self) -> int:
+        """
+        Token that changes when another process modifies the log.
+
+        Appends made through this instance do not change it, so callers can
+        cache records and invalidate them only on external changes.
+        """
+        with self._lock:
+            self._refresh()
+            return self.external_changes
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Iterate over (session_id, record) pairs for live sessions."""
+        with self._lock:
+            self._refresh()
+            if not self._offsets:
+                return
+            # Opened under the lock, so a later swap cannot pair these
+            # offsets with a different file
+            f = self._open_current()
+            offsets = list(self._offsets.items())
+
+        with f:
+            for session_id, offset in offsets:
+                f.seek(offset)
+                yield session_id, json.loads(f.readline())
+
+    def __len__(self) -> int:
+        """Number of live sessions in the log."""
+        with self._lock:
+            self._refresh()
+            return len(self._offsets)
+
+    def __contains__(self, session_id: str) -> bool:
+        """Check whether a session is live in the log."""
+        with self._lock:
+            self._refresh()
+            return session_id in self._offsets
+
+    # Compaction
+
+    def dead_records(self) -> int:
+        """Number of superseded records and tombstones in the log."""
+        with self._lock:
+            self._refresh()
+            return self._records - len(self._offsets)
+
+    def needs_compaction(self) -> bool:
+        """Check whether enough dead records have built up to compact."""
+        with self._lock:
+            dead = self.dead_records()
+            return dead >= self.compaction_min_records and \
+                dead >= self._records * self.compaction_ratio
+
+    def _maybe_compact(self) -> None:
+        """Start a background compaction if one is due and none is running."""
+        with self._lock:
+            if self._compacting or not self.needs_compaction():
+                return
+            self._compacting = True
+
+        thread = threading.Thread(target=self._compact_in_background, daemon=True)
+        thread.start()
+
+    def _compact_in_background(self) -> None:
+        """Thread target wrapping _compact() with error handling; _compacting is already set."""
+        try:
+            self._compact()
+        except Exception as e:
+            logger.error(f"Session log compaction failed: {e}")
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def compact(self) -> int:
+        """
+        Rewrite the log keeping only the latest record of each live session.
+
+        Live records are copied without holding the lock, so saves continue
+        while compaction runs. Records appended in the meantime, by this or
+        another process, are copied over under both locks just before the
+        new log replaces the old one. A torn last line left by a writer that
+        crashed is dropped rather than copied.
+
+        Only one compaction runs at a time: a call made while this instance
+        is already compacting returns straight away, and other processes
+        wait for the compaction lock.
+
+        Returns:
+            Number of dead records removed
+        """
+        with self._lock:
+            if self._compacting:
+                return 0
+            self._compacting = True
+        try:
+            return self._compact()
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def _compact(self) -> int:
+        """Rewrite the log; the caller has claimed _compacting."""
+        with file_lock(self.compact_lock_path):
+            with self._lock:
+                if not self.path.exists():
+                    return 0
+                src = self._open_current()
+                snapshot = sorted(self._offsets.items(), key=lambda item: item[1])
+                snapshot_end = self._end
+                snapshot_inode = self._inode
+                records_before = self._records
+
+            with src:
+                fd, tmp_name = tempfile.mkstemp(
+                    prefix=self.path.name + ".", suffix=".compact", dir=self.path.parent
+                )
+                tmp_path = Path(tmp_name)
+                try:
+                    os.chmod(fd, os.fstat(src.fileno()).st_mode & 0o777)
+                    with os.fdopen(fd, "wb") as dst:
+                        kept = self._rewrite(src, dst, tmp_path, snapshot, snapshot_end, snapshot_inode)
+                finally:
+                    tmp_path.unlink(missing_ok=True)
+
+        if kept is None:
+            logger.warning(f"Session log {self.path.name} was replaced during compaction; skipped")
+            return 0
+        removed = records_before - kept
+        logger.info(f"Compacted session log: removed {removed} dead record(s)")
+        return removed
+
+    def _rewrite(
+        self,
+        src: BinaryIO,
+        dst: BinaryIO,
+        tmp_path: Path,
+        snapshot: list,
+        snapshot_end: int,
+        snapshot_inode: Optional[int]
+    ) -> Optional[int]:
+        """
+        Copy live records to tmp_path and swap it in for the log.
+
+        Returns:
+            Number of records kept, or None if the log was replaced meanwhile
+        """
+        new_offsets: Dict[str, int] = {}
+        for session_id, offset in snapshot:
+            src.seek(offset)
+            line = src.readline()
+            new_offsets[session_id] = dst.tell()
+            dst.write(line)
+
+        with self._lock, file_lock(self.lock_path):
+            self._refresh()
+            if self._inode != snapshot_inode:
+                return None
+            # Copy anything appended while we were rewriting
+            src.seek(snapshot_end)
+            tail = src.read(self._end - snapshot_end)
+            tail_lines = 0
+            for line in tail.splitlines(keepends=True):
+                if not line.endswith(b"\n"):
+                    break
+                if line.strip():
+                    self._apply_line(new_offsets, line, dst.tell())
+                    tail_lines += 1
+                dst.write(line)
+
+            dst.flush()
+            os.fsync(dst.fileno())
+            dst.close()
+            os.replace(tmp_path, self.path)
+
+            stat = self.path.stat()
+            self._offsets = new_offsets
+            self._end = stat.st_size
+            self._inode = stat.st_ino
+            self._records = len(snapshot) + tail_lines
+            self._needs_newline = False
+            self.save_index()
+        return len(snapshot)
@@ -0,0 +1,355 @@
+"""Persistent backends for live API session state with optimistic versioning."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple
+from core.config import config
+from core.fileio import atomic_write_text, file_lock
+from core.logging_utils import logger
+
+# Lock files shared by the file backend's sessions
+LOCK_STRIPES = 64
+
+
+class SessionConflictError(Exception):
+    """Raised when a session was modified by someone else since it was read."""
+
+
+class SessionStateBackend(ABC):
+    """
+    Persistent store for live session state.
+
+    Every saved session carries a version that starts at 1 and grows by
+    one on each save. save() takes the version the caller last read and
+    fails with SessionConflictError if another worker saved in between.
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """
+        Load a session.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            (version, session) or None if not found
+        """
+
+    @abstractmethod
+    def version(self, session_id: str) -> Optional[int]:
+        """
+        Get a session's current version without loading it.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Version or None if not found
+        """
+
+    @abstractmethod
+    def save(self, session_id: str, session: Dict[str, Any],
+             expected_version: Optional[int] = None) -> int:
+        """
+        Save a session.
+
+        Args:
+            session_id: Session identifier
+            session: Session state (JSON-serializable)
+            expected_version: Version the caller last read, 0 if the session
+                              must not exist yet, or None to overwrite
+                              unconditionally
+
+        Returns:
+            The new version
+
+        Raises:
+            SessionConflictError: If the stored version does not match
+        """
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """
+        Delete a session.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            True if the session existed
+        """
+
+    @abstractmethod
+    def count(self) -> int:
+        """Get the number of saved sessions."""
+
+    @abstractmethod
+    def purge(self, older_than: float) -> int:
+        """
+        Delete sessions not saved since a point in time.
+
+        Args:
+            older_than: Unix timestamp
+
+        Returns:
+            Number of sessions removed
+        """
+
+    def close(self) -> None:
+        """Release resources held by the backend."""
+
+
+class FileSessionStateBackend(SessionStateBackend):
+    """
+    One JSON file per session in a shared directory.
+
+    File names are hashes of the session id, so client-supplied ids never
+    form a path. Saves hold an advisory lock on one of a fixed set of lock
+    files, so worker processes on the same machine serialize per session.
+
+    The first line of a file is a small header with the id and version,
+    and the session follows on the second, so version() never parses the
+    session itself. Files written before the header was split out hold
+    everything on one line and are still read.
+    """
+
+    name = "file"
+
+    def __init__(self, directory: Path):
+        """
+        Initialize the file backend.
+
+        Args:
+            directory: Directory holding one file per session
+        """
+        self.directory = directory
+
+    def _digest(self, session_id: str) -> str:
+        """Stable hash of a session id."""
+        return hashlib.blake2b(session_id.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _path(self, session_id: str) -> Path:
+        """File holding a session."""
+        return self.directory / f"{self._digest(session_id)}.json"
+
+    def _lock_path(self, session_id: str) -> Path:
+        """Lock file guarding a session's saves."""
+        stripe = int(self._digest(session_id)[:8], 16) % LOCK_STRIPES
+        return self.directory / "locks" / f"{stripe:02d}.lock"
+
+    def _read(self, session_id: str, with_session: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Read a session's file, ignoring files for colliding ids.
+
+        Args:
+            session_id: Session identifier
+            with_session: Also read the session; otherwise only the header
+
+        Returns:
+            Header dict, with the session under "session" if requested
+        """
+        try:
+            with open(self._path(session_id), 'r') as f:
+                data = json.loads(f.readline())
+                if data.get("session_id") != session_id:
+                    return None
+                if with_session and "session" not in data:
+                    data["session"] = json.loads(f.readline())
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Error loading session state: {e}")
+            return None
+        return data
+
+    def load(self, session_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        data = self._read(session_id)
+        return (data.get("version", 1), data["session"]) if data else None
+
+    def version(self, session_id: str) -> Optional[int]:
+        data = self._read(session_id, with_session=False)
+        return data.get("version", 1) if data else None
+
+    def save(self, session_id: str, session: Dict[str, Any],
+             expected_version: Optional[int] = None) -> int:
+        with file_lock(self._lock_path(session_id)):
+            current = self.version(session_id) or 0
+            if expected_version is not None and current != expected_version:
+                raise SessionConflictError(session_id)
+            header = {"session_id": session_id, "version": current + 1, "updated_at": time.time()}
+            atomic_write_text(self._path(session_id), f"{json.dumps(header)}\n{json.dumps(session)}\n")
+            return current + 1
+
+    def delete(self, session_id: str) -> bool:
+        with file_lock(self._lock_path(session_id)):
+            if self._read(session_id, with_session=False) is None:
+                return False
+            self._path(session_id).unlink(missing_ok=True)
+            return True
+
+    def count(self) -> int:
+        if not self.directory.exists():
+            return 0
+        return sum(1 for _ in self.directory.glob("*.json"))
+
+    def purge(self, older_than: float) -> int:
+        if not self.directory.exists():
+            return 0
+        removed = 0
+        for path in self.directory.glob("*.json"):
+            try:
+                if path.stat().st_mtime < older_than:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+
+class SQLiteSessionStateBackend(SessionStateBackend):
+    """
+    SQLite table of session state in WAL mode.
+
+    Versions are checked inside the UPDATE itself, so concurrent saves from
+    several workers never overwrite each other silently.
+    """
+
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS session_state (
+            session_id TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            updated_at REAL NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_session_state_updated ON session_state (updated_at);
+    """
+
+    def __init__(self, path: Path, busy_timeout: float = 5.0):
+        """
+        Initialize the SQLite backend.
+
+        Args:
+            path: Path to the database file
+            busy_timeout: Seconds to wait for a competing writer's lock
+        """
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Used only by this thread, but closed by whichever thread calls close()
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def load(self, session_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        row = self._connect().execute(
+            "SELECT version, data FROM session_state WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def version(self, session_id: str) -> Optional[int]:
+        row = self._connect().execute(
+            "SELECT version FROM session_state WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def save(self, session_id: str, session: Dict[str, Any],
+             expected_version: Optional[int] = None) -> int:
+        conn = self._connect()
+        data = json.dumps(session)
+        now = time.time()
+        with conn:
+            if expected_version is None:
+                conn.execute(
+                    "INSERT INTO session_state (session_id, version, updated_at, data) "
+                    "VALUES (?, 1, ?, ?) ON CONFLICT (session_id) DO UPDATE SET "
+                    "version = version + 1, updated_at = excluded.updated_at, data = excluded.data",
+                    (session_id, now, data)
+                )
+                return conn.execute(
+                    "SELECT version FROM session_state WHERE session_id = ?", (session_id,)
+                ).fetchone()[0]
+
+            if expected_version == 0:
+                try:
+                    conn.execute(
+                        "INSERT INTO session_state (session_id, version, updated_at, data) "
+                        "VALUES (?, 1, ?, ?)",
+                        (session_id, now, data)
+                    )
+                except sqlite3.IntegrityError:
+                    raise SessionConflictError(session_id) from None
+                return 1
+
+            cursor = conn.execute(
+                "UPDATE session_state SET version = version + 1, updated_at = ?, data = ? "
+                "WHERE session_id = ? AND version = ?",
+                (now, data, session_id, expected_version)
+            )
+            if cursor.rowcount == 0:
+                raise SessionConflictError(session_id)
+            return expected_version + 1
+
+    def delete(self, session_id: str) -> bool:
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute("DELETE FROM session_state WHERE session_id = ?", (session_id,))
+        return cursor.rowcount > 0
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM session_state").fetchone()[0]
+
+    def purge(self, older_than: float) -> int:
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute("DELETE FROM session_state WHERE updated_at < ?", (older_than,))
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def create_session_state_backend(name: Optional[str] = None) -> SessionStateBackend:
+    """
+    Create a session state backend.
+
+    Args:
+        name: 'file' or 'sqlite' (defaults to SESSION_STATE_BACKEND)
+
+    Returns:
+        Session state backend instance
+    """
+    name = name or config.SESSION_STATE_BACKEND
+    if name == "sqlite":
+        return SQLiteSessionStateBackend(config.session_state_db_path())
+    if name == "file":
+        return FileSessionStateBackend(config.session_hibernate_dir())
+    raise ValueError(f"Unknown session state backend: {name}")
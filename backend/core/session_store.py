@@ -0,0 +1,407 @@
+"""Bounded in-memory store for live API conversation state."""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Callable, Iterator, List, Tuple
+from core.config import config
+from core.logging_utils import logger
+from core.session_state import (
+    SessionConflictError,
+    SessionStateBackend,
+    create_session_state_backend
+)
+
+# Seconds between purges of expired sessions from the backend
+PURGE_INTERVAL = 600.0
+
+# Key under which a session dict carries the version it was read at
+VERSION_KEY = "_state_version"
+
+
+class SessionStore:
+    """
+    Live conversation state with a memory cap and an idle timeout.
+
+    Resident sessions are kept in least-recently-used order. When the cap
+    is exceeded, or a session has been idle for longer than idle_ttl, it is
+    dropped from memory and the next access reloads it from the backend.
+
+    In the default (single-process) mode sessions are only written to the
+    backend when they are hibernated, and removed from it when rehydrated.
+    In shared mode every change is written through with save(), resident
+    copies are revalidated against the backend's version on each access,
+    and a save that races with another worker raises SessionConflictError.
+    That lets several uvicorn workers serve the same sessions.
+
+    Session dicts are returned by reference so callers can update them in
+    place, as with a plain dict. Each one carries the version it was read
+    at under VERSION_KEY, and save() checks that version rather than the
+    one resident at save time, so a copy that went stale is never saved
+    over a newer one.
+
+    The store's lock only guards the in-memory tables; backend I/O runs
+    outside it, under a per-session lock, so one slow disk access does not
+    stall every other session. A session waiting to be hibernated is kept
+    aside until it is written and can be taken back without any I/O.
+    """
+
+    def __init__(
+        self,
+        max_resident: int = 1000,
+        idle_ttl: float = 1800.0,
+        backend: Optional[SessionStateBackend] = None,
+        hibernate_ttl: float = 72 * 3600.0,
+        shared: bool = False
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            max_resident: Maximum sessions kept in memory
+            idle_ttl: Seconds without access before a session is hibernated
+                      (0 disables the idle timeout)
+            backend: Persistent session state; evicted sessions are
+                     discarded when None
+            hibernate_ttl: Seconds a session is kept in the backend after
+                           its last save
+            shared: Write every change through to the backend (requires one)
+        """
+        if shared and backend is None:
+            raise ValueError("A shared session store needs a backend")
+        self.max_resident = max_resident
+        self.idle_ttl = idle_ttl
+        self.backend = backend
+        self.hibernate_ttl = hibernate_ttl
+        self.shared = shared
+
+        # session_id -> (last access, version, session), least recently used first
+        self._resident: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        # session_id -> (version, session) evicted but not yet written to the backend
+        self._hibernating: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        # session_id -> [lock, holders and waiters], while a session has I/O in progress
+        self._io_locks: Dict[str, List[Any]] = {}
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+
+        self.hibernations = 0
+        self.rehydrations = 0
+        self.discarded = 0
+        self.conflicts = 0
+
+    @contextmanager
+    def _session_io(self, session_id: str) -> Iterator[None]:
+        """Hold a session's I/O lock, so its hibernation and rehydration never overlap."""
+        with self._lock:
+            entry = self._io_locks.get(session_id)
+            if entry is None:
+                entry = self._io_locks[session_id] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._io_locks[session_id]
+
+    def _hibernate(self, session_id: str, session: Dict[str, Any]) -> None:
+        """Write an evicted session to the backend, or discard it; no lock held."""
+        with self._session_io(session_id):
+            with self._lock:
+                pending = self._hibernating.get(session_id)
+                if pending is None or pending[1] is not session:
+                    return  # Taken back, or already handled by another thread
+                del self._hibernating[session_id]
+                if self.backend is None:
+                    self.discarded += 1
+                    return
+            try:
+                self.backend.save(session_id, session)
+            except (OSError, TypeError, ValueError) as e:
+                with self._lock:
+                    self.discarded += 1
+                logger.warning(f"Could not hibernate session: {e}")
+            else:
+                with self._lock:
+                    self.hibernations += 1
+
+    def _evict(self, session_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Remove a resident session, setting it aside for hibernation; caller holds the lock."""
+        _, version, session = self._resident.pop(session_id)
+        if self.shared:
+            return None  # Already saved on every change
+        self._hibernating[session_id] = (version, session)
+        return session_id, session
+
+    def _insert(self, session_id: str, version: int, session: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Make a session resident and enforce the limits; caller holds the lock.
+
+        Returns:
+            Evicted (session_id, session) pairs for _finish() to hibernate
+        """
+        session[VERSION_KEY] = version
+        self._resident[session_id] = (time.monotonic(), version, session)
+        self._resident.move_to_end(session_id)
+        return self._enforce_limits()
+
+    def _enforce_limits(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Evict sessions over the cap or past the idle timeout; caller holds the lock."""
+        evicted = []
+        while len(self._resident) > self.max_resident:
+            evicted.append(self._evict(next(iter(self._resident))))
+
+        # Least recently used first, so stop at the first session still active
+        if self.idle_ttl > 0:
+            cutoff = time.monotonic() - self.idle_ttl
+            while self._resident:
+                session_id, (last_access, _, _) = next(iter(self._resident.items()))
+                if last_access >= cutoff:
+                    break
+                evicted.append(self._evict(session_id))
+        return [pair for pair in evicted if pair is not None]
+
+    def _finish(self, evicted: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Hibernate evicted sessions and purge expired ones when due; caller holds no lock."""
+        for session_id, session in evicted:
+            self._hibernate(session_id, session)
+
+        if self.backend is None:
+            return
+        with self._lock:
+            due = time.monotonic() >= self._next_purge
+            if due:
+                self._next_purge = time.monotonic() + PURGE_INTERVAL
+        if due:
+            self.purge_hibernated()
+
+    def _take_in_memory(self, session_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Get a resident or hibernating session without any I/O; caller holds the lock."""
+        entry = self._resident.get(session_id)
+        if entry is not None:
+            return entry[1], entry[2]
+        return self._hibernating.pop(session_id, None)
+
+    def _rehydrate(self, session_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Load a session from the backend; caller holds its I/O lock."""
+        with self._lock:
+            found = self._take_in_memory(session_id)
+        if found is not None:
+            # Made resident again by another thread while we waited
+            return found
+        if self.backend is None:
+            return None
+        loaded = self.backend.load(session_id)
+        if loaded is None:
+            return None
+        if not self.shared:
+            # The resident copy is authoritative until it is hibernated again
+            self.backend.delete(session_id)
+        with self._lock:
+            self.rehydrations += 1
+        return loaded
+
+    def _get(self, session_id: str) -> Tuple[Optional[Dict[str, Any]], List[Tuple[str, Dict[str, Any]]]]:
+        """Get a session and the sessions its insertion evicted; caller holds its I/O lock."""
+        with self._lock:
+            found = self._take_in_memory(session_id)
+        if found is not None and self.shared:
+            # Another worker may have saved a newer version, or deleted it
+            if self.backend.version(session_id) != found[0]:
+                with self._lock:
+                    self._resident.pop(session_id, None)
+                found = None
+        if found is None:
+            found = self._rehydrate(session_id)
+            if found is None:
+                return None, []
+        version, session = found
+        with self._lock:
+            evicted = self._insert(session_id, version, session)
+        return session, evicted
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a session, rehydrating it if it is not resident.
+
+        Unknown ids return None without allocating anything.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Session dict or None if not found
+        """
+        if not self.shared:
+            # Resident sessions need no I/O lock
+            with self._lock:
+                entry = self._resident.get(session_id)
+                if entry is not None:
+                    evicted = self._insert(session_id, entry[1], entry[2])
+            if entry is not None:
+                self._finish(evicted)
+                return entry[2]
+
+        with self._session_io(session_id):
+            session, evicted = self._get(session_id)
+        self._finish(evicted)
+        return session
+
+    def get_or_create(self, session_id: str, factory: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Get a session, creating it with factory() if it does not exist.
+
+        Args:
+            session_id: Session identifier
+            factory: Builds the initial state of a new session
+
+        Returns:
+            Session dict
+        """
+        with self._session_io(session_id):
+            session, evicted = self._get(session_id)
+            if session is None:
+                session = factory()
+                version = 0
+                created = True
+                if self.shared:
+                    try:
+                        version = self.backend.save(session_id, session, expected_version=0)
+                    except SessionConflictError:
+                        # Created by another worker in the meantime
+                        with self._lock:
+                            self.conflicts += 1
+                        created = False
+                        session, evicted = self._get(session_id)
+                if created:
+                    with self._lock:
+                        evicted = self._insert(session_id, version, session)
+        self._finish(evicted)
+        return session
+
+    def save(self, session_id: str, session: Dict[str, Any]) -> None:
+        """
+        Record changes made to a session.
+
+        In shared mode the session is written to the backend, provided
+        nobody saved it since this dict was read. Otherwise this only marks
+        the session as recently used.
+
+        Args:
+            session_id: Session identifier
+            session: Session dict returned by get() or get_or_create()
+
+        Raises:
+            SessionConflictError: If the session was saved since this dict
+                was read, or the dict was not read from this store
+        """
+        version = session.get(VERSION_KEY)
+        if self.shared:
+            try:
+                if version is None:
+                    raise SessionConflictError(f"Session {session_id} was not read from the store")
+                version = self.backend.save(session_id, session, expected_version=version)
+            except SessionConflictError:
+                # Drop the stale copy so the next access reloads it
+                with self._lock:
+                    self.conflicts += 1
+                    self._resident.pop(session_id, None)
+                raise
+        with self._lock:
+            self._hibernating.pop(session_id, None)
+            evicted = self._insert(session_id, version or 0, session)
+        self._finish(evicted)
+
+    def delete(self, session_id: str) -> bool:
+        """
+        Remove a session from memory and the backend.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            True if the session existed
+        """
+        with self._session_io(session_id):
+            with self._lock:
+                found = self._take_in_memory(session_id) is not None
+                self._resident.pop(session_id, None)
+            if self.backend is not None and self.backend.delete(session_id):
+                found = True
+            return found
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id in self._resident or session_id in self._hibernating:
+                return True
+        return self.backend is not None and self.backend.version(session_id) is not None
+
+    def hibernate_all(self) -> None:
+        """Write every resident session to the backend, e.g. before shutdown."""
+        with self._lock:
+            evicted = [self._evict(session_id) for session_id in list(self._resident)]
+        for pair in evicted:
+            if pair is not None:
+                self._hibernate(*pair)
+
+    def purge_hibernated(self) -> int:
+        """
+        Delete sessions not saved for longer than hibernate_ttl.
+
+        Returns:
+            Number of sessions removed
+        """
+        if self.backend is None:
+            return 0
+        removed = self.backend.purge(time.time() - self.hibernate_ttl)
+        if removed:
+            logger.info(f"Purged {removed} expired hibernated session(s)")
+        return removed
+
+    def hibernated_count(self) -> int:
+        """Get the number of sessions held by the backend."""
+        return self.backend.count() if self.backend is not None else 0
+
+    def close(self) -> None:
+        """Hibernate resident sessions and release the backend."""
+        self.hibernate_all()
+        if self.backend is not None:
+            self.backend.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get resident/hibernated counts and eviction counters."""
+        hibernated = self.hibernated_count()
+        with self._lock:
+            return {
+                "backend": self.backend.name if self.backend is not None else None,
+                "shared": self.shared,
+                "resident": len(self._resident),
+                "max_resident": self.max_resident,
+                "hibernated": hibernated,
+                "hibernations": self.hibernations,
+                "rehydrations": self.rehydrations,
+                "discarded": self.discarded,
+                "conflicts": self.conflicts
+            }
+
+
+# Global session store instance
+_session_store: Optional[SessionStore] = None
+
+
+def get_session_store() -> SessionStore:
+    """Get or create the global session store from configuration."""
+    global _session_store
+    if _session_store is None:
+        shared = config.SESSION_SHARED
+        _session_store = SessionStore(
+            max_resident=config.SESSION_MAX_RESIDENT,
+            idle_ttl=config.SESSION_IDLE_TTL_SECONDS,
+            backend=create_session_state_backend() if (config.SESSION_HIBERNATE or shared) else None,
+            hibernate_ttl=config.SESSION_HIBERNATE_TTL_HOURS * 3600,
+            shared=shared
+        )
+    return _session_store
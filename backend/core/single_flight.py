@@ -0,0 +1,171 @@
+"""Coalescing of concurrent identical calls, so only one of them does the work."""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    """A call in progress, shared by every thread that asked for its key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time, across threads.
+
+    A thread calling do() while another thread runs the same key waits for
+    that call and gets its result, or its exception, instead of running fn
+    itself. Keys are forgotten as soon as the call finishes, so this does
+    not cache anything.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initialize the group.
+
+        Args:
+            enabled: When False, every call runs on its own
+        """
+        self.enabled = enabled
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """
+        Run fn, or wait for the call already running for key.
+
+        Args:
+            key: Identifies calls that are interchangeable
+            fn: Makes the call
+
+        Returns:
+            The result and whether it came from another thread's call
+        """
+        if not self.enabled:
+            return fn(), False
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of calls made and avoided."""
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executions": self.executions,
+                "coalesced": self.coalesced
+            }
+
+
+class AsyncSingleFlight:
+    """
+    Runs at most one call per key at a time, across asyncio tasks.
+
+    The call runs in its own task. Callers that give up (are cancelled) do
+    not cancel it while others are still waiting; once the last one gives
+    up, it is cancelled too. Must be used from a single event loop.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initialize the group.
+
+        Args:
+            enabled: When False, every call runs on its own
+        """
+        self.enabled = enabled
+        # key -> (task running the call, number of callers waiting for it)
+        self._calls: Dict[str, Tuple[asyncio.Task, int]] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Run fn, or wait for the call already running for key.
+
+        Args:
+            key: Identifies calls that are interchangeable
+            fn: Coroutine function making the call
+
+        Returns:
+            The result and whether it came from another caller's call
+        """
+        if not self.enabled:
+            return await fn(), False
+
+        entry = self._calls.get(key)
+        shared = entry is not None and not entry[0].done()
+        if shared:
+            task = entry[0]
+            self._calls[key] = (task, entry[1] + 1)
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = (task, 1)
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.executions += 1
+
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            self._leave(key, task)
+            raise
+
+    def _leave(self, key: str, task: asyncio.Task) -> None:
+        """Drop a cancelled caller, cancelling the call if nobody else waits for it."""
+        entry = self._calls.get(key)
+        if entry is None or entry[0] is not task:
+            return
+        if entry[1] > 1:
+            self._calls[key] = (task, entry[1] - 1)
+        else:
+            task.cancel()
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        """Remove a finished call."""
+        entry = self._calls.get(key)
+        if entry is not None and entry[0] is task:
+            del self._calls[key]
+        # Every waiter may have gone; do not leave the exception unretrieved
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of calls made and avoided."""
+        return {
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "coalesced": self.coalesced
+        }
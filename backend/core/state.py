@@ -7,15 +7,17 @@ from core.config import config
 # Conversation stages
 ConversationStage = Literal["greeting", "collection", "questions", "exit"]
 
-# Required fields for candidate information
+# Required fields for candidate information, in the order they are asked.
+# Tech stack comes early so question generation can start while the rest
+# of the fields are collected.
 REQUIRED_FIELDS = [
     "full_name",
+    "tech_stack",
     "email",
     "phone",
     "years_experience",
     "desired_position",
-    "current_location",
-    "tech_stack"
+    "current_location"
 ]
 
 
@@ -1,11 +1,155 @@
 """Data storage utilities with PII anonymization for TalentScout."""
 
+import copy
+import itertools
 import json
-from datetime import datetime
+import threading
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+from core.cache import LRUCache
+from core.cold_archive import ColdArchive
 from core.config import config
 from core.logging_utils import logger, redact_pii
+from core.storage_backends import StorageBackend, create_storage_backend
+from core.storage_meta import StorageMetadata
+from core.tech_index import TechStackIndex, remove_tech_index
+from core.write_behind import WriteBehindQueue
+
+# Global storage backend instance
+_storage_backend: Optional[StorageBackend] = None
+_storage_backend_key: Optional[tuple] = None
+
+# Global metadata sidecar (count, last-modified time, per-day totals)
+_storage_meta: Optional[StorageMetadata] = None
+
+# Global per-technology session counters
+_tech_index: Optional[TechStackIndex] = None
+
+# Global cold archive for old sessions (compressed, append-only segments)
+_cold_archive: Optional[ColdArchive] = None
+
+# Read-through cache for load_session: session_id -> (generation, record)
+_read_cache = LRUCache(config.STORAGE_READ_CACHE_SIZE)
+
+# Writes made by this process leave the backend generation unchanged, so a
+# load only fills the cache if no local write happened while it was reading
+_cache_writes = 0
+_cache_lock = threading.Lock()
+
+# Global write-behind queue for session saves
+_save_queue: Optional[WriteBehindQueue] = None
+
+
+def get_storage_backend() -> StorageBackend:
+    """Get or create the storage backend selected by configuration."""
+    global _storage_backend, _storage_backend_key
+    key = (config.get_storage_backend_name(), config.STORAGE_PATH)
+    if _storage_backend is None or _storage_backend_key != key:
+        if _storage_backend is not None:
+            _storage_backend.close()
+        _storage_backend = create_storage_backend(key[0])
+        _storage_backend_key = key
+        _cache_write(None)
+        if _storage_backend.name != "json":
+            _migrate_legacy_file(_storage_backend)
+    return _storage_backend
+
+
+def _cache_write(
+    session_id: Optional[str],
+    entry: Optional[tuple] = None,
+    writes: Optional[int] = None
+) -> None:
+    """
+    Apply a local write to the read cache.
+
+    Args:
+        session_id: Session written, or None to drop every entry
+        entry: (generation, record) to cache, or None to drop the entry
+        writes: Value of _cache_writes before the write; if other writes
+            happened since, the entry may be older than theirs and is dropped
+    """
+    global _cache_writes
+    with _cache_lock:
+        if writes is not None and _cache_writes != writes:
+            entry = None
+        _cache_writes += 1
+        if session_id is None:
+            _read_cache.clear()
+        elif entry is None:
+            _read_cache.pop(session_id)
+        else:
+            _read_cache.set(session_id, entry)
+
+
+def get_cold_archive() -> ColdArchive:
+    """Get or create the cold archive that sits next to the storage path."""
+    global _cold_archive
+    directory = config.cold_archive_dir()
+    if _cold_archive is None or _cold_archive.directory != directory:
+        _cold_archive = ColdArchive(
+            directory,
+            codec=config.COLD_ARCHIVE_CODEC,
+            block_records=config.COLD_ARCHIVE_BLOCK_RECORDS
+        )
+    return _cold_archive
+
+
+def get_storage_metadata_store() -> StorageMetadata:
+    """Get or create the metadata sidecar, rebuilding it if missing."""
+    global _storage_meta
+    backend = get_storage_backend()
+    if _storage_meta is None or _storage_meta.path != config.storage_meta_path():
+        _storage_meta = StorageMetadata(config.storage_meta_path())
+        if not _storage_meta.exists():
+            # First run on an existing store: one full scan, then O(1) from here on
+            _storage_meta.rebuild(itertools.chain(
+                backend.load_all().values(), get_cold_archive().iter_records()
+            ))
+    return _storage_meta
+
+
+def get_tech_index_store() -> TechStackIndex:
+    """Get or create the tech stack index, rebuilding it if missing."""
+    global _tech_index
+    backend = get_storage_backend()
+    if _tech_index is None or _tech_index.path != config.tech_index_path():
+        if _tech_index is not None:
+            _tech_index.close()
+        _tech_index = TechStackIndex(config.tech_index_path())
+        if not _tech_index.exists():
+            _tech_index.rebuild(itertools.chain(
+                backend.load_all().values(), get_cold_archive().iter_records()
+            ))
+    return _tech_index
+
+
+def _migrate_legacy_file(backend: StorageBackend) -> None:
+    """Import sessions from the legacy JSON file into a new, empty backend."""
+    if not config.STORAGE_PATH.exists() or config.STORAGE_PATH.suffix != ".json":
+        return
+    if backend.count() > 0:
+        return
+    
+    try:
+        with open(config.STORAGE_PATH, 'r') as f:
+            legacy_sessions = json.load(f)
+        for session_data in legacy_sessions.values():
+            backend.save(session_data)
+        # Keep the original but stop it from being imported again
+        config.STORAGE_PATH.rename(config.STORAGE_PATH.with_suffix(".json.migrated"))
+        # Metadata describing the old file is rebuilt from the new backend
+        global _storage_meta, _tech_index
+        config.storage_meta_path().unlink(missing_ok=True)
+        if _tech_index is not None:
+            _tech_index.close()
+        remove_tech_index(config.tech_index_path())
+        _storage_meta = None
+        _tech_index = None
+        logger.info(f"Migrated {len(legacy_sessions)} session(s) to the {backend.name} backend")
+    except (json.JSONDecodeError, OSError) as e:
+        logger.warning(f"Could not migrate legacy sessions file: {e}")
 
 
 def anonymize_pii(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -54,15 +198,15 @@ def anonymize_pii(data: Dict[str, Any]) -> Dict[str, Any]:
     return anonymized
 
 
-def save_session(
+def build_session_record(
     session_id: str,
     collected_fields: Dict[str, Any],
     tech_stack: list[str],
     answers: list[str],
     sentiment_log: Optional[list[Dict[str, Any]]] = None
-) -> bool:
+) -> Dict[str, Any]:
     """
-    Save session data to JSON file.
+    Build the stored record for a session, anonymizing PII.
     
     Args:
         session_id: Unique session identifier
@@ -72,34 +216,42 @@ def save_session(
         sentiment_log: Optional list of sentiment analysis results
     
     Returns:
-        True if saved successfully, False otherwise
+        Session record ready to be written
     """
-    if not config.ENABLE_STORAGE:
-        logger.info("Storage is disabled, skipping save")
-        return False
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "session_id": session_id,
+        "pii": anonymize_pii(collected_fields.copy()),
+        "tech_stack": list(tech_stack),
+        "answers": list(answers),
+        "sentiment_log": list(sentiment_log or [])
+    }
+
+
+def write_session_record(session_data: Dict[str, Any]) -> bool:
+    """
+    Write a prepared session record to the configured storage backend.
+    
+    Args:
+        session_data: Record built by build_session_record
     
+    Returns:
+        True if saved successfully, False otherwise
+    """
+    session_id = session_data["session_id"]
     try:
         config.ensure_storage_dir()
-        
-        # Load existing sessions
-        sessions = load_all_sessions()
-        
-        # Create session data
-        session_data = {
-            "timestamp": datetime.now().isoformat(),
-            "session_id": session_id,
-            "pii": anonymize_pii(collected_fields.copy()),
-            "tech_stack": tech_stack,
-            "answers": answers,
-            "sentiment_log": sentiment_log or []
-        }
-        
-        # Add or update session
-        sessions[session_id] = session_data
-        
-        # Save to file
-        with open(config.STORAGE_PATH, 'w') as f:
-            json.dump(sessions, f, indent=2)
+        meta = get_storage_metadata_store()
+        tech_index = get_tech_index_store()
+        backend = get_storage_backend()
+        writes = _cache_writes
+        previous = backend.save(session_data)
+        if previous is None:
+            # An archived session saved again moves back to the hot store
+            previous = get_cold_archive().delete(session_id)
+        meta.record_save(session_data, previous)
+        tech_index.record_save(session_data, previous)
+        _cache_write(session_id, (backend.generation(), copy.deepcopy(session_data)), writes)
         
         logger.info(f"Session {session_id} saved successfully")
         return True
@@ -109,36 +261,224 @@ def save_session(
         return False
 
 
+def save_session(
+    session_id: str,
+    collected_fields: Dict[str, Any],
+    tech_stack: list[str],
+    answers: list[str],
+    sentiment_log: Optional[list[Dict[str, Any]]] = None
+) -> bool:
+    """
+    Save session data to the configured storage backend.
+    
+    Args:
+        session_id: Unique session identifier
+        collected_fields: Dictionary of collected candidate fields
+        tech_stack: List of technologies in tech stack
+        answers: List of candidate answers to questions
+        sentiment_log: Optional list of sentiment analysis results
+    
+    Returns:
+        True if saved successfully, False otherwise
+    """
+    if not config.ENABLE_STORAGE:
+        logger.info("Storage is disabled, skipping save")
+        return False
+    
+    return write_session_record(
+        build_session_record(session_id, collected_fields, tech_stack, answers, sentiment_log)
+    )
+
+
+def get_save_queue() -> WriteBehindQueue:
+    """Get or create the global write-behind queue for session saves."""
+    global _save_queue
+    if _save_queue is None:
+        _save_queue = WriteBehindQueue(
+            write_session_record,
+            max_size=config.STORAGE_QUEUE_SIZE,
+            flush_interval=config.STORAGE_FLUSH_INTERVAL,
+            name="session-writer"
+        )
+    return _save_queue
+
+
+def enqueue_save_session(
+    session_id: str,
+    collected_fields: Dict[str, Any],
+    tech_stack: list[str],
+    answers: list[str],
+    sentiment_log: Optional[list[Dict[str, Any]]] = None
+) -> bool:
+    """
+    Queue a session save without waiting for disk I/O.
+    
+    Saves of the same session within the flush interval are coalesced into
+    one write. Falls back to a synchronous save when write-behind is
+    disabled or the queue is full.
+    
+    Args:
+        session_id: Unique session identifier
+        collected_fields: Dictionary of collected candidate fields
+        tech_stack: List of technologies in tech stack
+        answers: List of candidate answers to questions
+        sentiment_log: Optional list of sentiment analysis results
+    
+    Returns:
+        True if queued or saved successfully, False otherwise
+    """
+    if not config.ENABLE_STORAGE:
+        return False
+    
+    session_data = build_session_record(
+        session_id, collected_fields, tech_stack, answers, sentiment_log
+    )
+    if not config.STORAGE_WRITE_BEHIND:
+        return write_session_record(session_data)
+    
+    return get_save_queue().submit(session_id, session_data)
+
+
+def flush_pending_saves(timeout: Optional[float] = None) -> bool:
+    """
+    Wait until every queued save has been written.
+    
+    Args:
+        timeout: Maximum seconds to wait (None waits indefinitely)
+    
+    Returns:
+        True if the queue drained, False on timeout
+    """
+    if _save_queue is None:
+        return True
+    return _save_queue.flush(timeout)
+
+
+def get_storage_stats() -> Dict[str, Any]:
+    """
+    Get storage backend and write queue statistics.
+    
+    Returns:
+        Dictionary with the backend name and write-behind queue metrics
+    """
+    return {
+        "enabled": config.ENABLE_STORAGE,
+        "backend": config.get_storage_backend_name(),
+        "sessions": get_storage_metadata() if config.ENABLE_STORAGE else None,
+        "cold_archive": get_cold_archive().stats() if config.ENABLE_STORAGE else None,
+        "read_cache": _read_cache.stats(),
+        "write_queue": _save_queue.stats() if _save_queue is not None else None
+    }
+
+
+def shutdown_storage() -> None:
+    """Flush queued saves and release the storage backend."""
+    global _save_queue
+    if _save_queue is not None:
+        _save_queue.stop()
+        _save_queue = None
+    if _storage_backend is not None:
+        _storage_backend.close()
+    if _tech_index is not None:
+        _tech_index.close()
+
+
 def load_all_sessions() -> Dict[str, Dict[str, Any]]:
     """
-    Load all sessions from storage file.
+    Load all sessions from storage, including archived ones.
     
     Returns:
         Dictionary of session_id -> session_data
     """
-    if not config.ENABLE_STORAGE or not config.STORAGE_PATH.exists():
+    if not config.ENABLE_STORAGE:
         return {}
     
-    try:
-        with open(config.STORAGE_PATH, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError) as e:
-        logger.warning(f"Error loading sessions: {e}")
-        return {}
+    sessions = get_storage_backend().load_all()
+    for session_data in get_cold_archive().iter_records():
+        sessions.setdefault(session_data["session_id"], session_data)
+    return sessions
+
+
+def _to_record_timestamp(value: Optional[datetime]) -> Optional[str]:
+    """Convert a datetime to the naive local ISO format records are saved with."""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat()
+
+
+def iter_sessions(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    tech: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream stored sessions one at a time.
+    
+    Unlike load_all_sessions(), memory use does not grow with the number of
+    stored sessions (except on the legacy single-file backend, which has to
+    parse the whole document). Hot sessions are yielded first, followed by
+    archived ones.
+    
+    Args:
+        since: Only include sessions saved at or after this time
+        until: Only include sessions saved before this time
+        tech: Only include sessions whose tech stack lists this technology
+              (case-insensitive)
+    
+    Yields:
+        Session data dictionaries
+    """
+    if not config.ENABLE_STORAGE:
+        return
+    
+    tech_lower = tech.lower().strip() if tech else None
+    since_ts, until_ts = _to_record_timestamp(since), _to_record_timestamp(until)
+    records = itertools.chain(
+        get_storage_backend().iter_records(since=since_ts, until=until_ts),
+        get_cold_archive().iter_records(since=since_ts, until=until_ts)
+    )
+    for session_data in records:
+        if tech_lower and tech_lower not in (t.lower() for t in session_data.get("tech_stack", [])):
+            continue
+        yield session_data
 
 
 def load_session(session_id: str) -> Optional[Dict[str, Any]]:
     """
     Load a specific session by ID.
     
+    Reads go through an in-process LRU cache. Entries are tagged with the
+    backend's generation and ignored once another process modifies the
+    store, so cached reads never return stale data; a record read while
+    this process wrote to the store is not cached. Sessions missing from
+    the hot store are looked up in the cold archive (and not cached).
+    
     Args:
         session_id: Session identifier
     
     Returns:
         Session data or None if not found
     """
-    sessions = load_all_sessions()
-    return sessions.get(session_id)
+    if not config.ENABLE_STORAGE:
+        return None
+    
+    backend = get_storage_backend()
+    writes = _cache_writes
+    generation = backend.generation()
+    cached = _read_cache.get(session_id)
+    if cached is not None and cached[0] == generation:
+        return copy.deepcopy(cached[1])
+    
+    session_data = backend.load(session_id)
+    if session_data is None:
+        return get_cold_archive().get(session_id)
+    entry = (generation, copy.deepcopy(session_data))
+    with _cache_lock:
+        if _cache_writes == writes:
+            _read_cache.set(session_id, entry)
+    return session_data
 
 
 def delete_session(session_id: str) -> bool:
@@ -155,25 +495,67 @@ def delete_session(session_id: str) -> bool:
         return False
     
     try:
-        sessions = load_all_sessions()
+        meta = get_storage_metadata_store()
+        tech_index = get_tech_index_store()
+        removed = get_storage_backend().delete(session_id)
+        _cache_write(session_id)
+        if removed is None:
+            removed = get_cold_archive().delete(session_id)
+        if removed is None:
+            return False
+        meta.record_delete(removed)
+        tech_index.record_delete(removed)
         
-        if session_id in sessions:
-            del sessions[session_id]
-            
-            # Save updated sessions
-            with open(config.STORAGE_PATH, 'w') as f:
-                json.dump(sessions, f, indent=2)
-            
-            logger.info(f"Session {session_id} deleted successfully")
-            return True
-        
-        return False
+        logger.info(f"Session {session_id} deleted successfully")
+        return True
     
     except Exception as e:
         logger.error(f"Error deleting session: {redact_pii(str(e))}")
         return False
 
 
+def delete_sessions(timestamps: Dict[str, str]) -> List[Dict[str, Any]]:
+    """
+    Delete a batch of sessions, e.g. for the retention job.
+
+    Each store and sidecar is written once for the whole batch rather
+    than once per session. A session saved again since it was selected
+    (so its timestamp no longer matches) is left alone.
+
+    Args:
+        timestamps: session_id -> timestamp the session had when selected
+
+    Returns:
+        The deleted records, in the order they were given
+    """
+    if not config.ENABLE_STORAGE or not timestamps:
+        return []
+
+    try:
+        meta = get_storage_metadata_store()
+        tech_index = get_tech_index_store()
+        removed = get_storage_backend().delete_many(timestamps)
+        remaining = dict(timestamps)
+        for record in removed:
+            remaining.pop(record["session_id"], None)
+        if remaining:
+            removed.extend(get_cold_archive().delete_many(remaining))
+        for session_id in timestamps:
+            _cache_write(session_id)
+        if removed:
+            meta.record_deletes(removed)
+            tech_index.record_deletes(removed)
+
+        order = {session_id: i for i, session_id in enumerate(timestamps)}
+        removed.sort(key=lambda record: order[record["session_id"]])
+        logger.info(f"Deleted {len(removed)} of {len(timestamps)} session(s)")
+        return removed
+
+    except Exception as e:
+        logger.error(f"Error deleting sessions: {redact_pii(str(e))}")
+        return []
+
+
 def delete_all_sessions() -> bool:
     """
     Delete all sessions from storage.
@@ -185,8 +567,11 @@ def delete_all_sessions() -> bool:
         return False
     
     try:
-        if config.STORAGE_PATH.exists():
-            config.STORAGE_PATH.unlink()
+        get_storage_backend().delete_all()
+        get_cold_archive().clear()
+        get_storage_metadata_store().reset()
+        get_tech_index_store().reset()
+        _cache_write(None)
         
         logger.info("All sessions deleted successfully")
         return True
@@ -196,6 +581,95 @@ def delete_all_sessions() -> bool:
         return False
 
 
+def archive_cold_sessions(
+    older_than_days: int,
+    batch_size: int = 500,
+    now: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Move sessions not saved for a while into the compressed cold archive.
+
+    Sessions are moved in batches: each batch is written to a new archive
+    segment before it is removed from the hot store, so a crash can leave
+    a session in both tiers but never in neither. A session saved again
+    while it was being moved stays in the hot store.
+
+    Args:
+        older_than_days: Archive sessions last saved more than this many days ago
+        batch_size: Sessions compressed into each archive segment
+        now: Reference time (defaults to the current time)
+
+    Returns:
+        Report with the number of sessions moved and hot/cold sizes in bytes
+    """
+    report: Dict[str, Any] = {
+        "candidates": 0,
+        "archived": 0,
+        "hot_bytes_before": 0,
+        "hot_bytes_after": 0,
+        "cold_bytes_written": 0
+    }
+    if not config.ENABLE_STORAGE or older_than_days <= 0:
+        return report
+
+    backend = get_storage_backend()
+    cold = get_cold_archive()
+    cutoff = ((now or datetime.now()) - timedelta(days=older_than_days)).isoformat()
+    report["hot_bytes_before"] = backend.size_bytes()
+
+    # Only ids are kept in memory; records are re-read batch by batch
+    candidates: List[Tuple[str, str]] = [
+        (record["session_id"], record.get("timestamp", ""))
+        for record in backend.iter_records(until=cutoff)
+    ]
+    report["candidates"] = len(candidates)
+
+    for start in range(0, len(candidates), batch_size):
+        batch = []
+        for session_id, timestamp in candidates[start:start + batch_size]:
+            record = backend.load(session_id)
+            if record is not None and record.get("timestamp", "") == timestamp:
+                batch.append(record)
+        if not batch:
+            continue
+
+        report["cold_bytes_written"] += cold.add(batch)
+        for record in batch:
+            session_id = record["session_id"]
+            # Bypasses the metadata sidecar: the session still exists
+            removed = backend.delete(session_id)
+            _cache_write(session_id)
+            if removed is not None and removed.get("timestamp") != record.get("timestamp"):
+                # Saved again after the batch was read; keep the new version hot
+                backend.save(removed)
+                cold.delete(session_id)
+                continue
+            report["archived"] += 1
+
+    if report["archived"]:
+        backend.compact()
+    report["hot_bytes_after"] = backend.size_bytes()
+
+    logger.info(
+        f"Archived {report['archived']} session(s) older than {older_than_days} day(s) "
+        f"({report['cold_bytes_written']} compressed bytes)"
+    )
+    return report
+
+
+def get_storage_size_bytes() -> int:
+    """
+    Get the on-disk size of the hot store plus the cold archive.
+
+    Returns:
+        Size in bytes
+    """
+    if not config.ENABLE_STORAGE:
+        return 0
+
+    return get_storage_backend().size_bytes() + get_cold_archive().size_bytes()
+
+
 def get_session_count() -> int:
     """
     Get the total number of stored sessions.
@@ -203,6 +677,59 @@ def get_session_count() -> int:
     Returns:
         Number of sessions
     """
-    sessions = load_all_sessions()
-    return len(sessions)
+    if not config.ENABLE_STORAGE:
+        return 0
+    
+    return get_storage_metadata_store().count()
+
+
+def get_storage_metadata() -> Dict[str, Any]:
+    """
+    Get stored session statistics without reading any sessions.
+    
+    Returns:
+        Dictionary with 'count', 'last_modified' and 'daily' totals
+    """
+    if not config.ENABLE_STORAGE:
+        return {"count": 0, "last_modified": None, "daily": {}}
+    
+    return get_storage_metadata_store().get()
+
 
+def get_tech_stack_stats(
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    tech: Optional[str] = None,
+    limit: int = 20
+) -> Dict[str, Any]:
+    """
+    Get how many stored sessions list each technology, without reading any sessions.
+    
+    Counts are kept per day, so since/until have day granularity and
+    sessions are attributed to the day they were last saved.
+    
+    Args:
+        since: First day to include
+        until: First day to exclude
+        tech: Count only this technology (case-insensitive)
+        limit: Maximum number of technologies to return
+    
+    Returns:
+        Dictionary with the day range and a 'technologies' list of
+        {'technology', 'count'} entries, most listed first
+    """
+    since_day = since.isoformat()[:10] if since else None
+    until_day = until.isoformat()[:10] if until else None
+    stats: Dict[str, Any] = {"since": since_day, "until": until_day, "technologies": []}
+    if not config.ENABLE_STORAGE:
+        return stats
+    
+    tech_index = get_tech_index_store()
+    if tech:
+        stats["technologies"] = [{
+            "technology": tech.strip(),
+            "count": tech_index.count_sessions(tech, since_day, until_day)
+        }]
+    else:
+        stats["technologies"] = tech_index.top(limit, since_day, until_day)
+    return stats
@@ -0,0 +1,690 @@
+"""Pluggable storage backends for TalentScout session data."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, Any, Hashable, Iterator, List
+from core.config import config
+from core.fileio import atomic_write_json, file_lock
+from core.logging_utils import logger
+from core.session_log import SessionLog
+
+
+class StorageBackend(ABC):
+    """Interface implemented by every session storage backend."""
+
+    name: str = ""
+
+    @abstractmethod
+    def save(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Insert or replace a session record.
+
+        Args:
+            record: Session record; must contain 'session_id'
+
+        Returns:
+            The record this save replaced, or None if the session is new
+        """
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a single session record.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Session record or None if not found
+        """
+
+    @abstractmethod
+    def delete(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Delete a session record.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            The deleted record, or None if the session did not exist
+        """
+
+    def delete_many(self, timestamps: Dict[str, str]) -> List[Dict[str, Any]]:
+        """
+        Delete a batch of sessions, skipping any saved again since they were selected.
+
+        The default implementation deletes one session at a time; backends
+        that rewrite a whole file per delete override it to write once.
+
+        Args:
+            timestamps: session_id -> timestamp the record had when selected
+
+        Returns:
+            The deleted records
+        """
+        removed = []
+        for session_id, timestamp in timestamps.items():
+            record = self.load(session_id)
+            if record is not None and record.get("timestamp", "") == timestamp:
+                record = self.delete(session_id)
+                if record is not None:
+                    removed.append(record)
+        return removed
+
+    @abstractmethod
+    def delete_all(self) -> None:
+        """Delete every stored session."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Get the number of stored sessions."""
+
+    @abstractmethod
+    def load_all(self) -> Dict[str, Dict[str, Any]]:
+        """Load every stored session as a session_id -> record dictionary."""
+
+    @abstractmethod
+    def generation(self) -> Hashable:
+        """
+        Token that changes when the store is modified outside this instance.
+
+        Writes made through this instance leave it unchanged, so the caller
+        can keep cached records and only invalidate them on external changes.
+        """
+
+    def iter_records(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over stored sessions without materializing them all.
+
+        The default implementation filters load_all(); backends that can
+        stream override it.
+
+        Args:
+            since: Only yield records with timestamp >= since (ISO format)
+            until: Only yield records with timestamp < until (ISO format)
+
+        Yields:
+            Session records
+        """
+        for record in self.load_all().values():
+            if _in_range(record, since, until):
+                yield record
+
+    def size_bytes(self) -> int:
+        """Get the on-disk footprint of the store in bytes."""
+        return 0
+
+    def compact(self) -> None:
+        """Reclaim space left behind by deletes, where the backend needs it."""
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+def _file_size(path: Path) -> int:
+    """Size of a file in bytes, or 0 if it does not exist."""
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _in_range(record: Dict[str, Any], since: Optional[str], until: Optional[str]) -> bool:
+    """Check a record's ISO timestamp against an optional [since, until) range."""
+    timestamp = record.get("timestamp", "")
+    if since is not None and timestamp < since:
+        return False
+    if until is not None and timestamp >= until:
+        return False
+    return True
+
+
+def _pop_matching(
+    sessions: Dict[str, Dict[str, Any]],
+    timestamps: Dict[str, str]
+) -> List[Dict[str, Any]]:
+    """Remove and return the sessions whose timestamp still matches."""
+    return [
+        sessions.pop(session_id)
+        for session_id, timestamp in timestamps.items()
+        if session_id in sessions and sessions[session_id].get("timestamp", "") == timestamp
+    ]
+
+
+class JSONFileBackend(StorageBackend):
+    """Legacy backend that keeps every session in one JSON document."""
+
+    name = "json"
+
+    def __init__(self, path: Path):
+        """
+        Initialize the JSON file backend.
+
+        Args:
+            path: Path to the JSON file
+        """
+        self.path = path
+        self.lock_path = path.with_name(path.name + ".lock")
+        self._lock = threading.Lock()
+        self._known_stat: Optional[tuple] = self._stat()
+        self._external_changes = 0
+
+    def _stat(self) -> Optional[tuple]:
+        """Identify the file's current contents."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _write(self, sessions: Dict[str, Dict[str, Any]]) -> None:
+        """Rewrite the whole file atomically."""
+        atomic_write_json(self.path, sessions, indent=2)
+        self._known_stat = self._stat()
+
+    def save(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock, file_lock(self.lock_path):
+            sessions = self.load_all()
+            previous = sessions.get(record["session_id"])
+            sessions[record["session_id"]] = record
+            self._write(sessions)
+            return previous
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self.load_all().get(session_id)
+
+    def delete(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock, file_lock(self.lock_path):
+            sessions = self.load_all()
+            removed = sessions.pop(session_id, None)
+            if removed is not None:
+                self._write(sessions)
+            return removed
+
+    def delete_many(self, timestamps: Dict[str, str]) -> List[Dict[str, Any]]:
+        with self._lock, file_lock(self.lock_path):
+            sessions = self.load_all()
+            removed = _pop_matching(sessions, timestamps)
+            if removed:
+                self._write(sessions)
+            return removed
+
+    def delete_all(self) -> None:
+        with self._lock, file_lock(self.lock_path):
+            if self.path.exists():
+                self.path.unlink()
+            self._known_stat = None
+
+    def count(self) -> int:
+        return len(self.load_all())
+
+    def generation(self) -> Hashable:
+        with self._lock:
+            current = self._stat()
+            if current != self._known_stat:
+                self._external_changes += 1
+                self._known_stat = current
+            return self._external_changes
+
+    def size_bytes(self) -> int:
+        return _file_size(self.path)
+
+    def load_all(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError) as e:
+            logger.warning(f"Error loading sessions: {e}")
+            return {}
+
+
+class JSONLBackend(StorageBackend):
+    """Append-only JSON Lines backend; see core.session_log.SessionLog."""
+
+    name = "jsonl"
+
+    def __init__(
+        self,
+        path: Path,
+        compaction_ratio: float = 0.5,
+        compaction_min_records: int = 1000,
+        index_flush_records: int = 1000
+    ):
+        """
+        Initialize the JSONL backend.
+
+        Args:
+            path: Path to the JSONL log file
+            compaction_ratio: Fraction of dead records that triggers compaction
+            compaction_min_records: Minimum dead records before compacting
+            index_flush_records: Appends between writes of the offset index
+        """
+        self.path = path
+        self.log = SessionLog(
+            path,
+            compaction_ratio=compaction_ratio,
+            compaction_min_records=compaction_min_records,
+            index_flush_records=index_flush_records
+        )
+
+    def save(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return self.log.replace(record)
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self.log.get(session_id)
+
+    def delete(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self.log.delete(session_id)
+
+    def delete_many(self, timestamps: Dict[str, str]) -> List[Dict[str, Any]]:
+        removed = []
+        for session_id, timestamp in timestamps.items():
+            record = self.log.delete(session_id, timestamp)
+            if record is not None:
+                removed.append(record)
+        return removed
+
+    def delete_all(self) -> None:
+        self.log.clear()
+
+    def count(self) -> int:
+        return len(self.log)
+
+    def load_all(self) -> Dict[str, Dict[str, Any]]:
+        return dict(self.log.items())
+
+    def generation(self) -> Hashable:
+        return self.log.generation()
+
+    def iter_records(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        for _, record in self.log.items():
+            if _in_range(record, since, until):
+                yield record
+
+    def size_bytes(self) -> int:
+        return _file_size(self.path)
+
+    def compact(self) -> None:
+        # Deletes only append tombstones; compaction is what frees the space
+        self.log.compact()
+
+    def close(self) -> None:
+        self.log.save_index()
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    SQLite backend in WAL mode.
+
+    WAL lets readers proceed while a writer commits, so several uvicorn
+    workers can share one database file. Sessions are indexed by
+    session_id (primary key) and timestamp. Every write transaction bumps
+    a version counter stored in the database, which generation() compares
+    with the last version this instance wrote.
+    """
+
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            timestamp TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_sessions_timestamp ON sessions (timestamp);
+        CREATE TABLE IF NOT EXISTS store_version (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            version INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO store_version (id, version) VALUES (0, 0);
+    """
+
+    def __init__(self, path: Path, busy_timeout: float = 5.0):
+        """
+        Initialize the SQLite backend.
+
+        Args:
+            path: Path to the database file
+            busy_timeout: Seconds to wait for a competing writer's lock
+        """
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._version_lock = threading.Lock()
+        self._known_version: Optional[int] = None
+        self._external_changes = 0
+
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Used only by this thread, but closed by whichever thread calls close()
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+            # Only takes effect on a new database; must precede WAL and the schema
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _write_transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run a block in a transaction that holds the write lock from the start.
+
+        Python's sqlite3 only begins a (deferred) transaction at the first
+        write, so a row read before it could be replaced by another writer
+        before our write lands. BEGIN IMMEDIATE takes the lock up front.
+        The block's writes are stamped with a new store version.
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            version = conn.execute("SELECT version FROM store_version").fetchone()[0]
+            conn.execute("UPDATE store_version SET version = version + 1")
+            with self._version_lock:
+                if version != self._known_version:
+                    self._external_changes += 1
+                self._known_version = version + 1
+
+    def save(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._write_transaction() as conn:
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ?", (record["session_id"],)
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, timestamp, data) VALUES (?, ?, ?)",
+                (record["session_id"], record.get("timestamp", ""), json.dumps(record))
+            )
+        return json.loads(row[0]) if row else None
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute(
+            "SELECT data FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._write_transaction() as conn:
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row:
+                conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        return json.loads(row[0]) if row else None
+
+    def delete_many(self, timestamps: Dict[str, str]) -> List[Dict[str, Any]]:
+        removed = []
+        with self._write_transaction() as conn:
+            for session_id, timestamp in timestamps.items():
+                row = conn.execute(
+                    "SELECT data FROM sessions WHERE session_id = ? AND timestamp = ?",
+                    (session_id, timestamp)
+                ).fetchone()
+                if row:
+                    conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                    removed.append(json.loads(row[0]))
+        return removed
+
+    def delete_all(self) -> None:
+        with self._write_transaction() as conn:
+            conn.execute("DELETE FROM sessions")
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def load_all(self) -> Dict[str, Dict[str, Any]]:
+        rows = self._connect().execute(
+            "SELECT session_id, data FROM sessions ORDER BY timestamp"
+        ).fetchall()
+        return {session_id: json.loads(data) for session_id, data in rows}
+
+    def iter_records(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        # Streaming responses may resume the generator on different threads,
+        # so iteration uses its own connection rather than the thread-local one
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+        try:
+            cursor = conn.execute(f"SELECT data FROM sessions{where} ORDER BY timestamp", params)
+            for (data,) in cursor:
+                yield json.loads(data)
+        finally:
+            conn.close()
+
+    def size_bytes(self) -> int:
+        wal_path = self.path.with_name(self.path.name + "-wal")
+        return _file_size(self.path) + _file_size(wal_path)
+
+    def compact(self) -> None:
+        # Incremental vacuum frees pages without rewriting the whole database
+        # (executescript steps the pragma to completion; execute frees one page)
+        conn = self._connect()
+        conn.executescript("PRAGMA incremental_vacuum;")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+    def generation(self) -> Hashable:
+        # The version lives in the database, so every thread's connection
+        # sees the same value
+        version = self._connect().execute("SELECT version FROM store_version").fetchone()[0]
+        with self._version_lock:
+            if version != self._known_version:
+                self._external_changes += 1
+                self._known_version = version
+            return self._external_changes
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+class ShardedJSONBackend(StorageBackend):
+    """
+    Directory of JSON shard files, one chosen per session by hashing its id.
+
+    A write rewrites only its own shard, via temp-file-plus-rename, while
+    holding that shard's advisory file lock. Writers to different shards
+    (including separate worker processes) proceed in parallel, readers
+    never see a torn file, and concurrent updates to the same shard are
+    serialized instead of overwriting each other.
+    """
+
+    name = "sharded"
+
+    def __init__(self, directory: Path, shard_count: int = 16):
+        """
+        Initialize the sharded backend.
+
+        Args:
+            directory: Directory holding the shard files
+            shard_count: Number of shards; fixed for the lifetime of the data
+        """
+        self.directory = directory
+        self.shard_count = shard_count
+        self._locks = [threading.Lock() for _ in range(shard_count)]
+        self._known_stats: Dict[int, Optional[tuple]] = {
+            shard: self._stat(shard) for shard in range(shard_count)
+        }
+        self._external_changes = 0
+
+    def shard_for(self, session_id: str) -> int:
+        """Get the shard index for a session (stable across processes)."""
+        digest = hashlib.blake2b(session_id.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") % self.shard_count
+
+    def _shard_path(self, shard: int) -> Path:
+        """Path of a shard's data file."""
+        return self.directory / f"shard-{shard:03d}.json"
+
+    def _lock_path(self, shard: int) -> Path:
+        """Path of a shard's advisory lock file."""
+        return self.directory / f"shard-{shard:03d}.lock"
+
+    def _stat(self, shard: int) -> Optional[tuple]:
+        """Identify a shard file's current contents."""
+        try:
+            stat = self._shard_path(shard).stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _read_shard(self, shard: int) -> Dict[str, Dict[str, Any]]:
+        """Read one shard; atomic renames mean no lock is needed."""
+        try:
+            with open(self._shard_path(shard), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError as e:
+            logger.warning(f"Error loading shard {shard}: {e}")
+            return {}
+
+    def _write_shard(self, shard: int, sessions: Dict[str, Dict[str, Any]]) -> None:
+        """Replace a shard atomically; the caller holds the shard's locks."""
+        if sessions:
+            atomic_write_json(self._shard_path(shard), sessions)
+        else:
+            self._shard_path(shard).unlink(missing_ok=True)
+        self._known_stats[shard] = self._stat(shard)
+
+    def save(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        shard = self.shard_for(record["session_id"])
+        with self._locks[shard], file_lock(self._lock_path(shard)):
+            sessions = self._read_shard(shard)
+            previous = sessions.get(record["session_id"])
+            sessions[record["session_id"]] = record
+            self._write_shard(shard, sessions)
+        return previous
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self._read_shard(self.shard_for(session_id)).get(session_id)
+
+    def delete(self, session_id: str) -> Optional[Dict[str, Any]]:
+        shard = self.shard_for(session_id)
+        with self._locks[shard], file_lock(self._lock_path(shard)):
+            sessions = self._read_shard(shard)
+            removed = sessions.pop(session_id, None)
+            if removed is not None:
+                self._write_shard(shard, sessions)
+        return removed
+
+    def delete_many(self, timestamps: Dict[str, str]) -> List[Dict[str, Any]]:
+        by_shard: Dict[int, Dict[str, str]] = {}
+        for session_id, timestamp in timestamps.items():
+            by_shard.setdefault(self.shard_for(session_id), {})[session_id] = timestamp
+
+        removed = []
+        for shard, shard_timestamps in by_shard.items():
+            with self._locks[shard], file_lock(self._lock_path(shard)):
+                sessions = self._read_shard(shard)
+                shard_removed = _pop_matching(sessions, shard_timestamps)
+                if shard_removed:
+                    self._write_shard(shard, sessions)
+            removed.extend(shard_removed)
+        return removed
+
+    def delete_all(self) -> None:
+        for shard in range(self.shard_count):
+            with self._locks[shard], file_lock(self._lock_path(shard)):
+                self._write_shard(shard, {})
+
+    def count(self) -> int:
+        return sum(len(self._read_shard(shard)) for shard in range(self.shard_count))
+
+    def load_all(self) -> Dict[str, Dict[str, Any]]:
+        sessions: Dict[str, Dict[str, Any]] = {}
+        for shard in range(self.shard_count):
+            sessions.update(self._read_shard(shard))
+        return sessions
+
+    def iter_records(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        # Only one shard is held in memory at a time
+        for shard in range(self.shard_count):
+            for record in self._read_shard(shard).values():
+                if _in_range(record, since, until):
+                    yield record
+
+    def size_bytes(self) -> int:
+        return sum(_file_size(self._shard_path(shard)) for shard in range(self.shard_count))
+
+    def generation(self) -> Hashable:
+        for shard in range(self.shard_count):
+            with self._locks[shard]:
+                current = self._stat(shard)
+                if current != self._known_stats[shard]:
+                    self._external_changes += 1
+                    self._known_stats[shard] = current
+        return self._external_changes
+
+
+def create_storage_backend(name: Optional[str] = None) -> StorageBackend:
+    """
+    Create a storage backend from configuration.
+
+    Args:
+        name: Backend name ('json', 'jsonl', 'sqlite' or 'sharded');
+            defaults to config
+
+    Returns:
+        Storage backend instance
+    """
+    name = name or config.get_storage_backend_name()
+
+    if name == "json":
+        return JSONFileBackend(config.STORAGE_PATH)
+    if name == "jsonl":
+        return JSONLBackend(
+            config.session_log_path(),
+            compaction_ratio=config.STORAGE_COMPACTION_RATIO,
+            compaction_min_records=config.STORAGE_COMPACTION_MIN_RECORDS,
+            index_flush_records=config.STORAGE_INDEX_FLUSH_RECORDS
+        )
+    if name == "sqlite":
+        return SQLiteBackend(config.sqlite_path())
+    if name == "sharded":
+        return ShardedJSONBackend(config.shard_dir(), shard_count=config.STORAGE_SHARDS)
+
+    raise ValueError(f"Unknown storage backend: {name}")
@@ -0,0 +1,168 @@
+"""Storage metadata sidecar kept up to date on every write and delete."""
+
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterable, List
+from core.fileio import atomic_write_json, file_lock
+from core.logging_utils import logger
+
+
+def _record_day(record: Dict[str, Any]) -> str:
+    """Get the YYYY-MM-DD day a record was saved on."""
+    return str(record.get("timestamp", ""))[:10] or "unknown"
+
+
+class StorageMetadata:
+    """
+    Small JSON document holding session count, last-modified time and
+    per-day totals.
+
+    Reads are served from memory and only reloaded when the file changes
+    on disk, so callers such as the Streamlit sidebar get stats without
+    deserializing any sessions. Updates hold an advisory file lock so
+    several worker processes can maintain the same sidecar.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize the metadata sidecar.
+
+        Args:
+            path: Path to the sidecar JSON file
+        """
+        self.path = path
+        self.lock_path = path.with_name(path.name + ".lock")
+        self._lock = threading.RLock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._version: Optional[tuple] = None
+
+    @staticmethod
+    def _empty() -> Dict[str, Any]:
+        """Metadata for an empty store."""
+        return {"count": 0, "last_modified": None, "daily": {}}
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        """Return current metadata, reloading if the file changed on disk."""
+        try:
+            version = self._file_version()
+        except FileNotFoundError:
+            self._data, self._version = None, None
+            return None
+
+        if self._data is None or version != self._version:
+            try:
+                with open(self.path, 'r') as f:
+                    self._data = json.load(f)
+                self._version = version
+            except (json.JSONDecodeError, OSError) as e:
+                logger.warning(f"Error loading storage metadata: {e}")
+                self._data, self._version = None, None
+        return self._data
+
+    def _file_version(self) -> tuple:
+        """Identify the file's current contents; atomic writes change the inode."""
+        stat = self.path.stat()
+        return (stat.st_ino, stat.st_mtime_ns)
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        """Persist metadata atomically."""
+        data["last_modified"] = datetime.now().isoformat()
+        atomic_write_json(self.path, data)
+        self._data = data
+        self._version = self._file_version()
+
+    def exists(self) -> bool:
+        """Check whether the sidecar has been written."""
+        with self._lock:
+            return self._read() is not None
+
+    def get(self) -> Dict[str, Any]:
+        """
+        Get a copy of the current metadata.
+
+        Returns:
+            Dictionary with 'count', 'last_modified' and 'daily' totals
+        """
+        with self._lock:
+            data = self._read() or self._empty()
+            return {**data, "daily": dict(data.get("daily", {}))}
+
+    def count(self) -> int:
+        """Get the stored session count."""
+        with self._lock:
+            data = self._read()
+            return data["count"] if data else 0
+
+    def record_save(self, record: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> None:
+        """
+        Update metadata after a save.
+
+        Args:
+            record: Record that was written
+            previous: Record it replaced, or None if the session is new
+        """
+        with self._lock, file_lock(self.lock_path):
+            data = self._read() or self._empty()
+            daily = data.setdefault("daily", {})
+            if previous is None:
+                data["count"] += 1
+            else:
+                self._decrement(daily, _record_day(previous))
+            day = _record_day(record)
+            daily[day] = daily.get(day, 0) + 1
+            self._write(data)
+
+    def record_delete(self, removed: Dict[str, Any]) -> None:
+        """
+        Update metadata after a delete.
+
+        Args:
+            removed: Record that was deleted
+        """
+        self.record_deletes([removed])
+
+    def record_deletes(self, removed: List[Dict[str, Any]]) -> None:
+        """
+        Update metadata after a batch delete, with a single write.
+
+        Args:
+            removed: Records that were deleted
+        """
+        with self._lock, file_lock(self.lock_path):
+            data = self._read() or self._empty()
+            daily = data.setdefault("daily", {})
+            for record in removed:
+                data["count"] = max(0, data["count"] - 1)
+                self._decrement(daily, _record_day(record))
+            self._write(data)
+
+    @staticmethod
+    def _decrement(daily: Dict[str, int], day: str) -> None:
+        """Decrement a per-day total, dropping it when it reaches zero."""
+        if daily.get(day, 0) > 1:
+            daily[day] -= 1
+        else:
+            daily.pop(day, None)
+
+    def reset(self) -> None:
+        """Reset metadata for an empty store."""
+        with self._lock, file_lock(self.lock_path):
+            self._write(self._empty())
+
+    def rebuild(self, records: Iterable[Dict[str, Any]]) -> None:
+        """
+        Recompute metadata from scratch.
+
+        Args:
+            records: Every stored session record
+        """
+        data = self._empty()
+        for record in records:
+            data["count"] += 1
+            day = _record_day(record)
+            data["daily"][day] = data["daily"].get(day, 0) + 1
+        with self._lock, file_lock(self.lock_path):
+            self._write(data)
+        logger.info(f"Rebuilt storage metadata for {data['count']} session(s)")
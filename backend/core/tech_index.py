@@ -0,0 +1,245 @@
+"""Per-technology session counters kept up to date on every write and delete."""
+
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterable, List
+from core.logging_utils import logger
+from core.storage_meta import _record_day
+
+
+def _technologies(record: Dict[str, Any]) -> Dict[str, str]:
+    """Map normalized technology name -> name as listed, once per record."""
+    techs: Dict[str, str] = {}
+    for tech in record.get("tech_stack") or []:
+        name = str(tech).strip()
+        if name:
+            techs.setdefault(name.lower(), name)
+    return techs
+
+
+def remove_tech_index(path: Path) -> None:
+    """Delete an index database and its WAL files so it is rebuilt on next use."""
+    for suffix in ("", "-wal", "-shm"):
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+
+class TechStackIndex:
+    """
+    SQLite database holding, for every technology, the number of stored
+    sessions that list it per day.
+
+    A save or delete updates one row per technology the record lists, in
+    a single transaction, so its cost does not grow with the number of
+    technologies or days tracked. Queries sum the per-day rows and never
+    read any sessions. WAL mode lets several worker processes share the
+    database. Technology names are matched case-insensitively.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tech_daily (
+            tech TEXT NOT NULL,
+            day TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (tech, day)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS tech_names (
+            tech TEXT PRIMARY KEY,
+            name TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS tech_index_info (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, path: Path, busy_timeout: float = 5.0):
+        """
+        Initialize the index.
+
+        Args:
+            path: Path to the database file
+            busy_timeout: Seconds to wait for a competing writer's lock
+        """
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Used only by this thread, but closed by whichever thread calls close()
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @staticmethod
+    def _apply(conn: sqlite3.Connection, record: Dict[str, Any], delta: int) -> None:
+        """Add delta to the day's counter of every technology a record lists."""
+        day = _record_day(record)
+        for key, name in _technologies(record).items():
+            conn.execute(
+                "INSERT INTO tech_daily (tech, day, count) VALUES (?, ?, ?) "
+                "ON CONFLICT (tech, day) DO UPDATE SET count = count + excluded.count",
+                (key, day, delta)
+            )
+            if delta > 0:
+                conn.execute("INSERT OR IGNORE INTO tech_names (tech, name) VALUES (?, ?)", (key, name))
+            else:
+                conn.execute("DELETE FROM tech_daily WHERE tech = ? AND day = ? AND count <= 0", (key, day))
+                conn.execute(
+                    "DELETE FROM tech_names WHERE tech = ? "
+                    "AND NOT EXISTS (SELECT 1 FROM tech_daily WHERE tech = ?)",
+                    (key, key)
+                )
+
+    @staticmethod
+    def _touch(conn: sqlite3.Connection) -> None:
+        """Record the time of the latest change."""
+        conn.execute(
+            "INSERT OR REPLACE INTO tech_index_info (key, value) VALUES ('last_modified', ?)",
+            (datetime.now().isoformat(),)
+        )
+
+    def exists(self) -> bool:
+        """Check whether the index has been built."""
+        if not self.path.exists():
+            return False
+        row = self._connect().execute(
+            "SELECT 1 FROM tech_index_info WHERE key = 'last_modified'"
+        ).fetchone()
+        return row is not None
+
+    def record_save(self, record: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> None:
+        """
+        Update counters after a save.
+
+        Args:
+            record: Record that was written
+            previous: Record it replaced, or None if the session is new
+        """
+        conn = self._connect()
+        with conn:
+            if previous is not None:
+                self._apply(conn, previous, -1)
+            self._apply(conn, record, 1)
+            self._touch(conn)
+
+    def record_delete(self, removed: Dict[str, Any]) -> None:
+        """
+        Update counters after a delete.
+
+        Args:
+            removed: Record that was deleted
+        """
+        self.record_deletes([removed])
+
+    def record_deletes(self, removed: List[Dict[str, Any]]) -> None:
+        """
+        Update counters after a batch delete, in one transaction.
+
+        Args:
+            removed: Records that were deleted
+        """
+        conn = self._connect()
+        with conn:
+            for record in removed:
+                self._apply(conn, record, -1)
+            self._touch(conn)
+
+    def reset(self) -> None:
+        """Reset counters for an empty store."""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM tech_daily")
+            conn.execute("DELETE FROM tech_names")
+            self._touch(conn)
+
+    def rebuild(self, records: Iterable[Dict[str, Any]]) -> None:
+        """
+        Recompute counters from scratch.
+
+        Args:
+            records: Every stored session record
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM tech_daily")
+            conn.execute("DELETE FROM tech_names")
+            for record in records:
+                self._apply(conn, record, 1)
+            self._touch(conn)
+        technologies = conn.execute("SELECT COUNT(*) FROM tech_names").fetchone()[0]
+        logger.info(f"Rebuilt tech stack index for {technologies} technologies")
+
+    @staticmethod
+    def _day_range(since: Optional[str], until: Optional[str]) -> tuple:
+        """SQL condition and parameters for since <= day < until."""
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("day >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("day < ?")
+            params.append(until)
+        return "".join(f" AND {clause}" for clause in clauses), params
+
+    def count_sessions(self, tech: str, since: Optional[str] = None,
+                       until: Optional[str] = None) -> int:
+        """
+        Count sessions listing a technology.
+
+        Args:
+            tech: Technology name (case-insensitive)
+            since: First day to include (YYYY-MM-DD)
+            until: First day to exclude (YYYY-MM-DD)
+
+        Returns:
+            Number of sessions, by the day they were last saved
+        """
+        condition, params = self._day_range(since, until)
+        row = self._connect().execute(
+            f"SELECT COALESCE(SUM(count), 0) FROM tech_daily WHERE tech = ?{condition}",
+            [tech.strip().lower(), *params]
+        ).fetchone()
+        return row[0]
+
+    def top(self, limit: int = 20, since: Optional[str] = None,
+            until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the most listed technologies.
+
+        Args:
+            limit: Maximum number of technologies to return
+            since: First day to include (YYYY-MM-DD)
+            until: First day to exclude (YYYY-MM-DD)
+
+        Returns:
+            List of {'technology', 'count'} dictionaries, most listed first
+        """
+        condition, params = self._day_range(since, until)
+        rows = self._connect().execute(
+            "SELECT n.name, SUM(d.count) AS total FROM tech_daily d "
+            f"JOIN tech_names n ON n.tech = d.tech WHERE 1 = 1{condition} "
+            "GROUP BY d.tech HAVING total > 0 ORDER BY total DESC, LOWER(n.name) LIMIT ?",
+            [*params, limit]
+        ).fetchall()
+        return [{"technology": name, "count": n} for name, n in rows]
+
+    def close(self) -> None:
+        """Close every connection opened by this index."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -0,0 +1,218 @@
+"""Write-behind queue that coalesces session saves off the request path."""
+
+import atexit
+import threading
+import time
+from typing import Callable, Dict, Any, Optional
+from core.logging_utils import logger
+
+
+class WriteBehindQueue:
+    """
+    Single-writer background flusher with per-key coalescing.
+
+    Callers submit a payload under a key and return immediately. A worker
+    thread waits for the coalescing window to pass, then writes the latest
+    payload for every pending key, so repeated saves of the same session
+    within the window cost one write. The number of pending keys is bounded;
+    when the queue is full the caller writes synchronously instead, which
+    applies backpressure without dropping data.
+    """
+
+    def __init__(
+        self,
+        write_fn: Callable[[Any], bool],
+        max_size: int = 1000,
+        flush_interval: float = 0.5,
+        name: str = "write-behind"
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            write_fn: Function that persists one payload, returning success
+            max_size: Maximum number of distinct pending keys
+            flush_interval: Coalescing window in seconds
+            name: Name of the worker thread
+        """
+        self.write_fn = write_fn
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.name = name
+
+        self._pending: Dict[str, Any] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._in_flight = 0
+        self._atexit_registered = False
+
+        # Metrics
+        self._enqueued = 0
+        self._coalesced = 0
+        self._written = 0
+        self._failed = 0
+        self._overflow = 0
+        self._flushes = 0
+        self._flush_time_total = 0.0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+
+    def start(self) -> None:
+        """Start the worker thread if it is not running."""
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.stop)
+                self._atexit_registered = True
+
+    def submit(self, key: str, payload: Any) -> bool:
+        """
+        Queue a payload for writing, replacing any pending payload for key.
+
+        Args:
+            key: Coalescing key (e.g. session_id)
+            payload: Value passed to write_fn
+
+        Returns:
+            True if queued or written successfully, False if a synchronous
+            overflow write failed
+        """
+        overflow = False
+        with self._condition:
+            if key in self._pending:
+                self._pending[key] = payload
+                self._coalesced += 1
+                return True
+
+            if len(self._pending) >= self.max_size or self._stopping:
+                self._overflow += 1
+                overflow = True
+            else:
+                self._pending[key] = payload
+                self._enqueued += 1
+                self._condition.notify()
+
+        if overflow:
+            # Queue full (or shutting down): write on the caller's thread
+            return self._write(payload)
+
+        self.start()
+        return True
+
+    def _write(self, payload: Any) -> bool:
+        """Write one payload and update counters."""
+        try:
+            ok = self.write_fn(payload)
+        except Exception as e:
+            logger.error(f"Write-behind write failed: {e}")
+            ok = False
+        with self._condition:
+            if ok:
+                self._written += 1
+            else:
+                self._failed += 1
+        return ok
+
+    def _run(self) -> None:
+        """Worker loop: wait for work, let the window fill, then flush."""
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopping:
+                    self._condition.wait()
+                if not self._pending and self._stopping:
+                    return
+                stopping = self._stopping
+
+            if not stopping:
+                # Coalescing window: later saves of the same key replace the payload.
+                # stop() cuts the window short.
+                with self._condition:
+                    self._condition.wait_for(lambda: self._stopping, timeout=self.flush_interval)
+
+            self._flush_pending()
+
+    def _flush_pending(self) -> None:
+        """Write every pending payload as one batch."""
+        with self._condition:
+            batch = self._pending
+            self._pending = {}
+            self._in_flight = len(batch)
+
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        for payload in batch.values():
+            self._write(payload)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        with self._condition:
+            self._in_flight = 0
+            self._flushes += 1
+            self._flush_time_total += elapsed_ms
+            self._last_flush_ms = elapsed_ms
+            self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+            self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until everything queued so far has been written.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the queue drained, False on timeout
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._flush_pending()
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """
+        Flush pending writes and stop the worker thread.
+
+        Args:
+            timeout: Maximum seconds to wait for the final flush
+        """
+        with self._condition:
+            thread = self._thread
+            self._stopping = True
+            self._condition.notify_all()
+
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+        # Anything submitted after the worker exited is written here
+        self._flush_pending()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth, throughput counters and flush latency."""
+        with self._condition:
+            return {
+                "queue_depth": len(self._pending),
+                "in_flight": self._in_flight,
+                "max_size": self.max_size,
+                "enqueued": self._enqueued,
+                "coalesced": self._coalesced,
+                "written": self._written,
+                "failed": self._failed,
+                "overflow_writes": self._overflow,
+                "flushes": self._flushes,
+                "last_flush_ms": round(self._last_flush_ms, 2),
+                "avg_flush_ms": round(self._flush_time_total / self._flushes, 2) if self._flushes else 0.0,
+                "max_flush_ms": round(self._max_flush_ms, 2)
+            }
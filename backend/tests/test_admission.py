@@ -0,0 +1,83 @@
+"""Tests for LLM admission control."""
+
+import asyncio
+import pytest
+from core.admission import AdmissionRejected, LLMAdmission, TokenBucketLimiter
+
+
+async def _hold(admission: LLMAdmission, seconds: float, background: bool = False) -> str:
+    """Hold a slot for a while and report the outcome."""
+    try:
+        async with admission.slot(background):
+            await asyncio.sleep(seconds)
+        return "ok"
+    except AdmissionRejected as e:
+        return e.reason
+
+
+class TestLLMAdmission:
+    """Tests for the global concurrency limit and its wait queue."""
+
+    def test_queue_full_and_timeout(self):
+        """Test that calls past the queue are refused and queued calls time out."""
+        admission = LLMAdmission(max_concurrent=1, max_queue=1, max_wait=0.05)
+
+        async def main():
+            first = asyncio.create_task(_hold(admission, 0.2))
+            await asyncio.sleep(0)
+            return await asyncio.gather(first, _hold(admission, 0), _hold(admission, 0))
+
+        assert asyncio.run(main()) == ["ok", "timeout", "queue_full"]
+        stats = admission.stats()
+        assert stats["rejected_timeout"] == 1
+        assert stats["rejected_queue_full"] == 1
+        assert stats["in_flight"] == 0 and stats["queued"] == 0
+
+    def test_waiters_are_admitted_in_order(self):
+        """Test that queued calls run one at a time once slots free up."""
+        admission = LLMAdmission(max_concurrent=1, max_queue=10, max_wait=5)
+        order = []
+
+        async def call(name):
+            async with admission.slot():
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        async def main():
+            await asyncio.gather(*(call(i) for i in range(4)))
+
+        asyncio.run(main())
+        assert order == [0, 1, 2, 3]
+        assert admission.stats()["admitted"] == 4
+
+    def test_background_calls_wait(self):
+        """Test that background calls queue past the limits instead of failing."""
+        admission = LLMAdmission(max_concurrent=1, max_queue=0, max_wait=0.01)
+
+        async def main():
+            first = asyncio.create_task(_hold(admission, 0.05))
+            await asyncio.sleep(0)
+            return await asyncio.gather(first, _hold(admission, 0, background=True))
+
+        assert asyncio.run(main()) == ["ok", "ok"]
+
+
+class TestTokenBucketLimiter:
+    """Tests for per-client rate limits."""
+
+    def test_burst_then_refuse(self):
+        """Test that a client gets its burst, then a wait, without affecting others."""
+        limiter = TokenBucketLimiter(rate_per_minute=60, burst=2)
+        assert limiter.acquire("a") == 0
+        assert limiter.acquire("a") == 0
+        assert limiter.acquire("a") == pytest.approx(1.0, abs=0.05)
+        assert limiter.acquire("b") == 0
+        assert limiter.stats()["rejected"] == 1
+
+    def test_client_table_is_bounded(self):
+        """Test that only the most recent clients keep a bucket."""
+        limiter = TokenBucketLimiter(rate_per_minute=60, burst=1, max_clients=2)
+        for key in ("a", "b", "c"):
+            limiter.acquire(key)
+        assert limiter.stats()["clients"] == 2
+        assert limiter.acquire("a") == 0
@@ -0,0 +1,582 @@
+"""Tests for the API endpoints, with a stubbed LLM provider."""
+
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+import pytest
+from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
+import api
+from core import question_bank, question_pool
+from core.admission import LLMAdmission, TokenBucketLimiter
+from core.config import config
+from core.llm import LLMStreamError
+from core.session_state import FileSessionStateBackend
+from core.session_store import SessionStore
+
+QUESTIONS_REPLY = "\n".join(
+    f"{i}) [★★] Explain how you would design component number {i} of the system." for i in range(1, 4)
+)
+
+FIELD_ANSWERS = [
+    ("full_name", "Jane Doe"),
+    ("tech_stack", "Python, Django"),
+    ("email", "jane@example.com"),
+    ("phone", "5551234567"),
+    ("years_experience", "5"),
+    ("desired_position", "Backend Engineer"),
+    ("current_location", "Berlin"),
+]
+
+
+class FakeProvider:
+    """Async LLM provider answering from canned text."""
+
+    def __init__(self):
+        self.calls = []
+        self.reply = "Happy to help."
+
+    def is_available(self):
+        return True
+
+    def _answer(self, max_tokens):
+        # Question generation asks for 800 tokens, chat turns for 500
+        return QUESTIONS_REPLY if max_tokens == 800 else self.reply
+
+    async def generate_response(self, messages, temperature=0.7, max_tokens=500, use_cache=False):
+        self.calls.append("generate")
+        return self._answer(max_tokens)
+
+    async def stream_response(self, messages, temperature=0.7, max_tokens=500, use_cache=False):
+        self.calls.append("stream")
+        for line in self._answer(max_tokens).splitlines(keepends=True):
+            await asyncio.sleep(0)
+            yield line
+
+    def start_health_probe(self, interval):
+        pass
+
+    def stats(self):
+        return {}
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Fresh API state around a fake LLM provider."""
+    fake = FakeProvider()
+    monkeypatch.setattr(api, "sessions", SessionStore())
+    monkeypatch.setattr(api, "rate_limiter", None)
+    monkeypatch.setattr(api, "llm_admission", LLMAdmission(max_concurrent=4, max_queue=4, max_wait=1))
+    monkeypatch.setattr(api, "question_tasks", type(api.question_tasks)())
+    monkeypatch.setattr(api, "get_async_llm_provider", lambda: fake)
+    monkeypatch.setattr(question_bank, "get_async_llm_provider", lambda: fake)
+    monkeypatch.setattr(question_pool, "_question_pool", None)
+    monkeypatch.setattr(config, "QUESTION_POOL_VARIANTS", 0)
+    monkeypatch.setattr(config, "ENABLE_STORAGE", False)
+    return fake
+
+
+@pytest.fixture
+def client(provider):
+    """Client that keeps one event loop, so background tasks outlive requests."""
+    with TestClient(api.app) as test_client:
+        yield test_client
+
+
+def _start(client) -> str:
+    """Create a session and return its id."""
+    return client.post("/api/sessions").json()["session_id"]
+
+
+def _answer_fields(client, session_id: str, count: int) -> dict:
+    """Answer the first count collection prompts over POST /api/message."""
+    body = None
+    for _, answer in FIELD_ANSWERS[:count]:
+        body = client.post("/api/message", json={"session_id": session_id, "message": answer}).json()
+    return body
+
+
+def _sse_events(body: str) -> list:
+    """Split a Server-Sent Events body into (event, data) pairs."""
+    events = []
+    for block in body.split("\n\n"):
+        if block:
+            fields = dict(line.split(": ", 1) for line in block.split("\n"))
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class TestMessageEndpoint:
+    """Tests for POST /api/message."""
+
+    def test_collection_then_questions(self, client, provider):
+        """Test that answering every field ends with generated questions."""
+        session_id = _start(client)
+        body = _answer_fields(client, session_id, len(FIELD_ANSWERS))
+        assert body["conversation_stage"] == "questions"
+        assert len(body["questions"]) == 3
+        assert body["missing_fields"] == []
+
+    def test_rejected_turn_leaves_session_unchanged(self, client, monkeypatch):
+        """Test that a 429 while waiting for an LLM slot can be retried from the same field."""
+        session_id = _start(client)
+        _answer_fields(client, session_id, len(FIELD_ANSWERS) - 1)
+        before = client.get(f"/api/sessions/{session_id}").json()
+
+        @asynccontextmanager
+        async def busy(background=False):
+            raise api._too_many_requests("Server is busy; please retry", 1)
+            yield
+
+        available = api.llm_slot
+        monkeypatch.setattr(api, "llm_slot", busy)
+        # The background task would otherwise answer without a slot
+        api.question_tasks.clear()
+        last = {"session_id": session_id, "message": FIELD_ANSWERS[-1][1]}
+        assert client.post("/api/message", json=last).status_code == 429
+
+        after = client.get(f"/api/sessions/{session_id}").json()
+        assert after["missing_fields"] == ["current_location"]
+        assert after["history_total"] == before["history_total"]
+
+        monkeypatch.setattr(api, "llm_slot", available)
+        body = client.post("/api/message", json=last).json()
+        assert body["conversation_stage"] == "questions"
+        assert len(body["questions"]) == 3
+
+    def test_failed_turn_leaves_session_unchanged(self, client, provider, monkeypatch):
+        """Test that an unexpected provider error mid-turn rolls the session back too."""
+        session_id = _start(client)
+        _answer_fields(client, session_id, len(FIELD_ANSWERS))
+        before = client.get(f"/api/sessions/{session_id}").json()
+
+        async def broken(messages, temperature=0.7, max_tokens=500, use_cache=False):
+            raise RuntimeError("provider exploded")
+
+        monkeypatch.setattr(provider, "generate_response", broken)
+        with pytest.raises(RuntimeError):
+            client.post("/api/message", json={"session_id": session_id, "message": "Hi"})
+
+        after = client.get(f"/api/sessions/{session_id}").json()
+        assert after["chat_history"] == before["chat_history"]
+
+    def test_conversation_turn_saves_off_the_event_loop(self, client, provider, monkeypatch):
+        """Test that a chat turn answers from the LLM and queues the record save in a worker thread."""
+        saves = []
+
+        def record_save(**kwargs):
+            try:
+                asyncio.get_running_loop()
+                saves.append("event loop")
+            except RuntimeError:
+                saves.append(kwargs["session_id"])
+
+        monkeypatch.setattr(api, "enqueue_save_session", record_save)
+        monkeypatch.setattr(config, "ENABLE_STORAGE", True)
+        session_id = _start(client)
+        _answer_fields(client, session_id, len(FIELD_ANSWERS))
+
+        body = client.post("/api/message", json={"session_id": session_id, "message": "What's next?"}).json()
+        assert body["response"] == "Happy to help."
+        assert saves == [session_id]
+
+    def test_generate_questions_endpoint(self, client, provider):
+        """Test that generated questions are stored and reused."""
+        session_id = _start(client)
+        assert client.post("/api/generate-questions", json={"session_id": session_id}).status_code == 400
+
+        _answer_fields(client, session_id, 2)
+        first = client.post("/api/generate-questions", json={"session_id": session_id}).json()
+        second = client.post("/api/generate-questions", json={"session_id": session_id}).json()
+        assert len(first["questions"]) == 3
+        assert second["questions"] == first["questions"]
+
+
+class TestRateLimit:
+    """Tests for per-client rate limiting."""
+
+    def _send(self, client, session_id: str, headers=None) -> int:
+        """Send one message and return the status code."""
+        body = {"session_id": session_id, "message": "Jane Doe"}
+        return client.post("/api/message", json=body, headers=headers or {}).status_code
+
+    def test_sessions_have_their_own_buckets(self, client, monkeypatch):
+        """Test that clients behind one address are limited per session by default."""
+        monkeypatch.setattr(api, "rate_limiter", TokenBucketLimiter(rate_per_minute=0.001, burst=1))
+        monkeypatch.setattr(config, "RATE_LIMIT_KEY", "session")
+        first, second = _start(client), _start(client)
+
+        assert self._send(client, first) == 200
+        assert self._send(client, second) == 200
+        assert self._send(client, first) == 429
+
+    def test_ip_keying_uses_trusted_header(self, client, monkeypatch):
+        """Test that ip keying takes the client address from the proxy's header."""
+        monkeypatch.setattr(api, "rate_limiter", TokenBucketLimiter(rate_per_minute=0.001, burst=1))
+        monkeypatch.setattr(config, "RATE_LIMIT_KEY", "ip")
+        monkeypatch.setattr(config, "RATE_LIMIT_CLIENT_HEADER", "X-Forwarded-For")
+        session_id = _start(client)
+
+        assert self._send(client, session_id, {"X-Forwarded-For": "spoofed, 203.0.113.1"}) == 200
+        assert self._send(client, session_id, {"X-Forwarded-For": "203.0.113.2"}) == 200
+        assert self._send(client, session_id, {"X-Forwarded-For": "other, 203.0.113.1"}) == 429
+
+        monkeypatch.setattr(config, "RATE_LIMIT_CLIENT_HEADER", "")
+        assert self._send(client, session_id, {"X-Forwarded-For": "203.0.113.3"}) == 200
+        assert self._send(client, session_id, {"X-Forwarded-For": "203.0.113.4"}) == 429
+
+
+class TestBackgroundQuestions:
+    """Tests for question generation overlapping field collection."""
+
+    def test_final_turn_consumes_background_task(self, client, provider):
+        """Test that questions started at the tech stack turn are the ones the last turn returns."""
+        session_id = _start(client)
+        _answer_fields(client, session_id, 2)
+        stack, task = api.question_tasks[session_id]
+        assert stack == ("Python", "Django")
+        for _ in range(100):
+            if task.done():
+                break
+            time.sleep(0.01)
+        assert provider.calls == ["generate"]
+
+        body = _answer_fields(client, session_id, len(FIELD_ANSWERS))
+        assert body["conversation_stage"] == "questions"
+        assert [q["text"] for q in body["questions"]] == [q["text"] for q in task.result()]
+        assert provider.calls == ["generate"]
+        assert session_id not in api.question_tasks
+
+    def test_task_for_another_stack_is_replaced(self, client, provider):
+        """Test that a task started for a different tech stack is cancelled, not used."""
+        session_id = _start(client)
+        _answer_fields(client, session_id, len(FIELD_ANSWERS) - 1)
+        api.question_tasks[session_id][1].cancel()
+        stale = client.portal.call(self._stale_task)
+        api.question_tasks[session_id] = (("Cobol",), stale)
+
+        last = {"session_id": session_id, "message": FIELD_ANSWERS[-1][1]}
+        body = client.post("/api/message", json=last).json()
+
+        assert len(body["questions"]) == 3
+        assert stale.cancelled()
+        assert session_id not in api.question_tasks
+
+    def test_failed_task_falls_back_to_generating(self, client, provider):
+        """Test that the last turn generates questions itself when the background task failed."""
+        session_id = _start(client)
+        _answer_fields(client, session_id, len(FIELD_ANSWERS) - 1)
+        api.question_tasks[session_id][1].cancel()
+        failed = client.portal.call(self._failed_task)
+        api.question_tasks[session_id] = (("Python", "Django"), failed)
+
+        last = {"session_id": session_id, "message": FIELD_ANSWERS[-1][1]}
+        response = client.post("/api/message", json=last)
+
+        assert response.status_code == 200
+        assert len(response.json()["questions"]) == 3
+        assert session_id not in api.question_tasks
+
+    @staticmethod
+    async def _failed_task() -> asyncio.Task:
+        """A generation task that raised."""
+        async def fail():
+            raise RuntimeError("provider exploded")
+
+        task = asyncio.create_task(fail())
+        await asyncio.sleep(0)
+        return task
+
+    @staticmethod
+    async def _stale_task() -> asyncio.Task:
+        """A generation task for some other stack that never finishes on its own."""
+        return asyncio.create_task(asyncio.sleep(3600))
+
+
+class TestSessionEndpoint:
+    """Tests for GET /api/sessions/{id} paging and conditional requests."""
+
+    def test_history_paging(self, client):
+        """Test that since and limit select a window of the chat history."""
+        session_id = _start(client)
+        _answer_fields(client, session_id, 2)
+        full = client.get(f"/api/sessions/{session_id}").json()
+        total = full["history_total"]
+
+        page = client.get(f"/api/sessions/{session_id}", params={"since": 1, "limit": 2}).json()
+        assert page["chat_history"] == full["chat_history"][1:3]
+        assert (page["history_start"], page["history_total"]) == (1, total)
+
+        past_end = client.get(f"/api/sessions/{session_id}", params={"since": total + 5}).json()
+        assert past_end["chat_history"] == [] and past_end["history_start"] == total
+        assert client.get(f"/api/sessions/{session_id}", params={"limit": 0}).status_code == 400
+
+    def test_etag_follows_content(self, client):
+        """Test 304 for an unchanged page and a new tag as soon as the session changes in memory."""
+        session_id = _start(client)
+        first = client.get(f"/api/sessions/{session_id}")
+        etag = first.headers["ETag"]
+        assert client.get(f"/api/sessions/{session_id}", headers={"If-None-Match": etag}).status_code == 304
+        assert client.get(f"/api/sessions/{session_id}", params={"since": 1},
+                          headers={"If-None-Match": etag}).status_code == 200
+
+        # A turn in progress has changed the session but not saved it yet
+        api.sessions.get(session_id)["chat_history"].append({"role": "user", "content": "Jane Doe"})
+        changed = client.get(f"/api/sessions/{session_id}", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+
+    @pytest.mark.parametrize("header,matches", [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", W/"abc"', True),
+        ("*", True),
+        ('"xyz"', False),
+        ('"ab"', False),
+    ])
+    def test_etag_matches(self, header, matches):
+        """Test weak comparison of If-None-Match lists."""
+        assert api._etag_matches(header, '"abc"') is matches
+
+
+class TestStreamEndpoint:
+    """Tests for POST /api/message/stream."""
+
+    def test_collection_turn_is_one_done_event(self, client):
+        """Test that a turn answered without the LLM is framed as a single done event."""
+        session_id = _start(client)
+        response = client.post("/api/message/stream", json={"session_id": session_id, "message": "Jane Doe"})
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _sse_events(response.text)
+        assert [event for event, _ in events] == ["done"]
+        assert events[0][1]["conversation_stage"] == "collection"
+
+    def test_conversation_turn_streams_tokens(self, client, provider):
+        """Test that chat replies arrive as token events followed by the full reply."""
+        provider.reply = "First line.\nSecond line.\n"
+        session_id = _start(client)
+        _answer_fields(client, session_id, len(FIELD_ANSWERS))
+
+        body = {"session_id": session_id, "message": "What's next?"}
+        events = _sse_events(client.post("/api/message/stream", json=body).text)
+
+        assert [event for event, _ in events] == ["token", "token", "done"]
+        assert "".join(data["text"] for _, data in events[:-1]) == provider.reply
+        assert events[-1][1]["response"] == provider.reply
+        assert client.get(f"/api/sessions/{session_id}").json()["chat_history"][-1]["content"] == provider.reply
+
+    def test_errors_after_start_are_events(self, client, monkeypatch):
+        """Test that a rejection once the stream has started becomes an error event, not a status."""
+        session_id = _start(client)
+        _answer_fields(client, session_id, len(FIELD_ANSWERS))
+
+        @asynccontextmanager
+        async def busy(background=False):
+            raise api._too_many_requests("Server is busy; please retry", 3)
+            yield
+
+        monkeypatch.setattr(api, "llm_slot", busy)
+        response = client.post("/api/message/stream", json={"session_id": session_id, "message": "Hi"})
+
+        assert response.status_code == 200
+        assert _sse_events(response.text) == [
+            ("error", {"status": 429, "detail": "Server is busy; please retry", "retry_after": 3})
+        ]
+
+    def test_interrupted_reply_is_an_error_and_rolled_back(self, client, provider, monkeypatch):
+        """Test that a reply cut short mid-stream ends with an error event and is not saved."""
+        session_id = _start(client)
+        _answer_fields(client, session_id, len(FIELD_ANSWERS))
+        before = client.get(f"/api/sessions/{session_id}").json()
+
+        async def broken_stream(messages, temperature=0.7, max_tokens=500, use_cache=False):
+            yield "Half a "
+            raise LLMStreamError("openai stream interrupted")
+
+        monkeypatch.setattr(provider, "stream_response", broken_stream)
+        response = client.post("/api/message/stream", json={"session_id": session_id, "message": "Hi"})
+
+        assert _sse_events(response.text) == [
+            ("token", {"text": "Half a "}),
+            ("error", {"status": 502, "detail": "LLM response was interrupted"})
+        ]
+        after = client.get(f"/api/sessions/{session_id}").json()
+        assert after["chat_history"] == before["chat_history"]
+
+    def test_unavailable_provider_fails_before_streaming(self, client, provider, monkeypatch):
+        """Test that a missing provider is still reported with a status code."""
+        monkeypatch.setattr(provider, "is_available", lambda: False)
+        session_id = _start(client)
+        response = client.post("/api/message/stream", json={"session_id": session_id, "message": "Hi"})
+        assert response.status_code == 500
+
+
+class TestChatWebSocket:
+    """Tests for the /api/ws/{session_id} channel."""
+
+    def _turn(self, websocket, message: str) -> list:
+        """Send a message and collect events up to and including done or error."""
+        websocket.send_json({"message": message})
+        events = []
+        while not events or events[-1]["type"] not in ("done", "error"):
+            events.append(websocket.receive_json())
+        return events
+
+    def test_collection_pushes_question_progress(self, client):
+        """Test that the final collection turn pushes progress and each question before done."""
+        session_id = _start(client)
+        with client.websocket_connect(f"/api/ws/{session_id}") as websocket:
+            for _, answer in FIELD_ANSWERS[:-1]:
+                assert self._turn(websocket, answer)[-1]["type"] == "done"
+            events = self._turn(websocket, FIELD_ANSWERS[-1][1])
+
+        types = [event["type"] for event in events]
+        assert types == ["confirmation", "progress", "question", "question", "question", "done"]
+        assert events[-1]["conversation_stage"] == "questions"
+        assert [e["question"] for e in events if e["type"] == "question"] == events[-1]["questions"]
+
+    def test_conversation_turn_streams_tokens(self, client, provider):
+        """Test that chat replies are pushed as tokens and saved."""
+        provider.reply = "One.\nTwo.\n"
+        session_id = _start(client)
+        _answer_fields(client, session_id, len(FIELD_ANSWERS))
+        with client.websocket_connect(f"/api/ws/{session_id}") as websocket:
+            events = self._turn(websocket, "What's next?")
+
+        assert [event["type"] for event in events] == ["token", "token", "done"]
+        assert events[-1]["response"] == provider.reply
+
+    def test_bad_frames_get_error_events(self, client):
+        """Test that binary, non-JSON and empty messages are answered with an error and the channel stays open."""
+        session_id = _start(client)
+        with client.websocket_connect(f"/api/ws/{session_id}") as websocket:
+            websocket.send_bytes(b"\x00\x01")
+            assert websocket.receive_json()["status"] == 422
+            websocket.send_text("not json")
+            assert websocket.receive_json()["status"] == 422
+            websocket.send_json(["message"])
+            assert websocket.receive_json()["status"] == 422
+            assert self._turn(websocket, "Jane Doe")[-1]["type"] == "done"
+
+    def test_unknown_session_is_closed(self, client):
+        """Test that connecting to an unknown session closes with 4404."""
+        with pytest.raises(WebSocketDisconnect) as closed:
+            with client.websocket_connect("/api/ws/unknown") as websocket:
+                websocket.receive_json()
+        assert closed.value.code == 4404
+
+    def test_disconnect_mid_session_releases_lock(self, client):
+        """Test that a client leaving does not block the session for later requests."""
+        session_id = _start(client)
+        with client.websocket_connect(f"/api/ws/{session_id}") as websocket:
+            self._turn(websocket, "Jane Doe")
+
+        body = client.post("/api/message", json={"session_id": session_id, "message": "Python"}).json()
+        assert body["missing_fields"][0] == "email"
+
+
+class TestQuestionJobs:
+    """Tests for background question generation jobs."""
+
+    def _wait(self, client, session_id: str, job_id: str) -> dict:
+        """Poll a job until it is no longer pending."""
+        for _ in range(200):
+            status = client.get(f"/api/sessions/{session_id}/question-jobs/{job_id}").json()
+            if status["status"] not in ("queued", "running"):
+                return status
+            time.sleep(0.01)
+        raise AssertionError(f"job {job_id} still {status['status']}")
+
+    def test_job_lifecycle(self, client):
+        """Test that a job runs to completion and later requests reuse its result."""
+        session_id = _start(client)
+        assert client.post(f"/api/sessions/{session_id}/question-jobs").status_code == 400
+
+        _answer_fields(client, session_id, 2)
+        created = client.post(f"/api/sessions/{session_id}/question-jobs")
+        assert created.status_code == 202
+        job_id = created.json()["job_id"]
+
+        assert self._wait(client, session_id, job_id)["status"] == "succeeded"
+        result = client.get(f"/api/sessions/{session_id}/question-jobs/{job_id}/result").json()
+        assert len(result["questions"]) == 3
+
+        again = client.post(f"/api/sessions/{session_id}/question-jobs")
+        assert again.status_code == 200
+        assert again.json()["job_id"] == job_id
+        assert client.get(f"/api/sessions/{session_id}/question-jobs/unknown").status_code == 404
+
+    def test_failed_job_result(self, client, monkeypatch):
+        """Test that a failed job reports its error and can be started again."""
+        async def broken(*args, **kwargs):
+            raise RuntimeError("provider down")
+
+        monkeypatch.setattr(api, "_collect_questions", broken)
+        session_id = _start(client)
+        _answer_fields(client, session_id, 2)
+        job_id = client.post(f"/api/sessions/{session_id}/question-jobs").json()["job_id"]
+
+        assert self._wait(client, session_id, job_id)["status"] == "failed"
+        result = client.get(f"/api/sessions/{session_id}/question-jobs/{job_id}/result")
+        assert result.status_code == 500
+        assert client.post(f"/api/sessions/{session_id}/question-jobs").json()["job_id"] != job_id
+
+    def test_lost_job_is_failed_and_replaced(self, client):
+        """Test that a job whose worker stopped renewing it no longer blocks new jobs."""
+        session_id = _start(client)
+        _answer_fields(client, session_id, 2)
+        api.sessions.get(session_id)["question_job"] = {
+            "job_id": "lost",
+            "status": "running",
+            "tech_stack": ["Python", "Django"],
+            "created_at": "2026-01-01T12:00:00",
+            "owner": "another-worker",
+            "heartbeat_at": "2026-01-01T12:00:00"
+        }
+
+        status = client.get(f"/api/sessions/{session_id}/question-jobs/lost").json()
+        assert status["status"] == "failed"
+
+        created = client.post(f"/api/sessions/{session_id}/question-jobs")
+        assert created.json()["job_id"] != "lost"
+
+    def test_shutdown_fails_running_jobs(self, provider, monkeypatch, tmp_path):
+        """Test that jobs cancelled at shutdown are recorded as failed."""
+        monkeypatch.setattr(api, "sessions", SessionStore(backend=FileSessionStateBackend(tmp_path)))
+        stalled = asyncio.Event()
+
+        async def never(*args, **kwargs):
+            await stalled.wait()
+
+        provider.generate_response = never
+        with TestClient(api.app) as client:
+            session_id = _start(client)
+            _answer_fields(client, session_id, 2)
+            job_id = client.post(f"/api/sessions/{session_id}/question-jobs").json()["job_id"]
+
+        job = api.sessions.get(session_id)["question_job"]
+        assert job["job_id"] == job_id
+        assert job["status"] == "failed"
+        assert not api.question_job_tasks
+
+
+class TestAdminEndpoints:
+    """Tests for the admin key check."""
+
+    @pytest.mark.parametrize("path", ["/api/export/sessions.ndjson", "/api/stats/tech-stack"])
+    def test_disabled_without_configured_key(self, client, monkeypatch, path):
+        """Test that admin endpoints refuse every request while ADMIN_API_KEY is empty."""
+        monkeypatch.setattr(config, "ADMIN_API_KEY", "")
+        assert client.get(path).status_code == 403
+        assert client.get(path, headers={"X-Admin-Key": ""}).status_code == 403
+
+    def test_key_required_when_configured(self, client, monkeypatch):
+        """Test that only the configured key is accepted."""
+        monkeypatch.setattr(config, "ADMIN_API_KEY", "s3cret")
+        path = "/api/stats/tech-stack"
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers={"X-Admin-Key": "wrong"}).status_code == 401
+        assert client.get(path, headers={"X-Admin-Key": "s3cret"}).status_code == 200
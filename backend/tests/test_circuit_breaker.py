@@ -0,0 +1,162 @@
+"""Tests for circuit breakers, retry budgets and LLM provider failover."""
+
+import time
+import httpx
+import openai
+import pytest
+from core.circuit_breaker import CircuitBreaker, RetryBudget, backoff_delay
+from core.config import config
+from core.llm import LLMProvider
+
+
+class TestCircuitBreaker:
+    """Tests for breaker state transitions."""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that the threshold of consecutive failures opens the breaker."""
+        breaker = CircuitBreaker("svc", failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+        assert breaker.stats()["trips"] == 1
+
+    def test_half_open_probe(self):
+        """Test that one probe goes through after the timeout and decides the state."""
+        breaker = CircuitBreaker("svc", failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+        time.sleep(0.02)
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestRetryBudget:
+    """Tests for the retry budget and backoff."""
+
+    def test_budget_limits_retries(self):
+        """Test that retries are refused once the balance runs out."""
+        budget = RetryBudget(ratio=0.5, reserve=1)
+        assert budget.withdraw()
+        assert not budget.withdraw()
+        budget.deposit()
+        budget.deposit()
+        assert budget.withdraw()
+        assert budget.stats()["exhausted"] == 1
+
+    def test_backoff_is_capped(self):
+        """Test that jittered delays stay below the exponential ceiling and the cap."""
+        for attempt in range(10):
+            assert 0 <= backoff_delay(attempt, 0.5, 4) <= min(4, 0.5 * 2 ** attempt)
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Provider with both backends configured and no real network calls."""
+    monkeypatch.setattr(config, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(config, "HF_TOKEN", "test-token")
+    monkeypatch.setattr(config, "LLM_RETRY_BASE_DELAY", 0)
+    monkeypatch.setattr(config, "LLM_MAX_RETRIES", 1)
+    monkeypatch.setattr(config, "LLM_BREAKER_FAILURES", 2)
+    provider = LLMProvider()
+    provider.calls = []
+    provider.openai_up = True
+
+    def fake_openai(messages, temperature, max_tokens):
+        provider.calls.append("openai")
+        if not provider.openai_up:
+            raise openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))
+        return "from openai"
+
+    def fake_huggingface(messages, temperature, max_tokens):
+        provider.calls.append("huggingface")
+        return "from huggingface"
+
+    def fake_ping(name):
+        if name == "openai" and not provider.openai_up:
+            raise ConnectionError("down")
+
+    monkeypatch.setattr(provider, "_generate_openai", fake_openai)
+    monkeypatch.setattr(provider, "_generate_huggingface", fake_huggingface)
+    monkeypatch.setattr(provider, "_ping", fake_ping)
+    yield provider
+    provider.close()
+
+
+class TestProviderFailover:
+    """Tests for routing between LLM providers."""
+
+    def test_transient_error_is_retried(self, provider):
+        """Test that one transient failure is retried on the same provider."""
+        original = provider._generate_openai
+        failures = iter([True])
+
+        def flaky(*args):
+            if next(failures, False):
+                provider.calls.append("openai")
+                raise openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))
+            return original(*args)
+
+        provider._generate_openai = flaky
+        assert provider.generate_response([{"role": "user", "content": "hi"}]) == "from openai"
+        assert provider.calls == ["openai", "openai"]
+        assert provider.stats()["retry_budget"]["retries"] == 1
+
+    def test_fallback_and_recovery(self, provider):
+        """Test that an outage shifts traffic to HuggingFace and recovery brings it back."""
+        messages = [{"role": "user", "content": "hi"}]
+        provider.openai_up = False
+        assert provider.generate_response(messages) == "from huggingface"
+        assert provider.provider == "huggingface"
+
+        # The breaker is open, so OpenAI is not even tried
+        provider.calls.clear()
+        assert provider.generate_response(messages) == "from huggingface"
+        assert provider.calls == ["huggingface"]
+        assert provider.is_available()
+
+        # The health check leaves an open breaker alone until it half-opens
+        provider.openai_up = True
+        provider.check_health()
+        assert provider.provider == "huggingface"
+
+        provider.health.breakers["openai"].reset_timeout = 0.01
+        time.sleep(0.02)
+        provider.check_health()
+        assert provider.provider == "openai"
+        assert provider.generate_response(messages) == "from openai"
+
+    def test_rejected_requests_do_not_open_the_breaker(self, provider):
+        """Test that errors caused by the request, not the provider, are not counted."""
+        def bad_request(*args):
+            provider.calls.append("openai")
+            raise openai.BadRequestError(
+                "context length exceeded",
+                response=httpx.Response(400, request=httpx.Request("POST", "https://api.openai.com")),
+                body=None
+            )
+
+        provider._generate_openai = bad_request
+        for _ in range(3):
+            assert provider.generate_response([{"role": "user", "content": "hi"}]) == "from huggingface"
+        assert provider.calls.count("openai") == 3
+        assert provider.health.breakers["openai"].state == "closed"
+
+    def test_ping_does_not_reset_call_failures(self, provider):
+        """Test that a successful ping does not clear failures counted by real calls."""
+        breaker = provider.health.breakers["openai"]
+        breaker.record_failure()
+        provider.check_health()
+        assert breaker.stats()["consecutive_failures"] == 1
@@ -0,0 +1,168 @@
+"""Tests for the LLM providers' pooled HTTP clients."""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+import pytest
+from core import llm
+from core.config import config
+from core.llm import AsyncLLMProvider, LLMProvider, LLMStreamError
+from core.llm_cache import LLMResponseCache
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+class _InferenceHandler(BaseHTTPRequestHandler):
+    """Answers like the HuggingFace Inference API and records each caller's port."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.ports.append(self.client_address[1])
+        body = json.dumps([{"generated_text": "pong"}]).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def inference_server(monkeypatch):
+    """Local HuggingFace stand-in; the providers are configured to use only it."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _InferenceHandler)
+    server.ports = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(llm, "HF_API_BASE", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(config, "OPENAI_API_KEY", "")
+    monkeypatch.setattr(config, "HF_TOKEN", "test-token")
+    monkeypatch.setattr(config, "LLM_SINGLE_FLIGHT", False)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestPooledClients:
+    """Tests that connections are kept alive between calls and released on close."""
+
+    def test_sync_provider_reuses_connection(self, inference_server):
+        """Test that consecutive calls share one keep-alive connection."""
+        provider = LLMProvider()
+        assert provider.generate_response(MESSAGES) == "pong"
+        assert provider.generate_response(MESSAGES) == "pong"
+        assert len(inference_server.ports) == 2
+        assert len(set(inference_server.ports)) == 1
+
+        adapter = provider.http_session.get_adapter(llm.HF_API_BASE)
+        provider.close()
+        assert not adapter.poolmanager.pools
+        assert provider._probe_stop.is_set()
+
+    def test_async_provider_reuses_connection(self, inference_server):
+        """Test that consecutive async calls share one connection and aclose() closes the client."""
+        provider = AsyncLLMProvider()
+
+        async def main():
+            first = await provider.generate_response(MESSAGES)
+            second = await provider.generate_response(MESSAGES)
+            await provider.aclose()
+            return first, second
+
+        assert asyncio.run(main()) == ("pong", "pong")
+        assert len(set(inference_server.ports)) == 1
+        assert provider.http_client.is_closed
+
+    def test_cached_responses_skip_the_provider(self, inference_server, monkeypatch):
+        """Test that both providers answer a repeated cacheable request from the response cache."""
+        cache = LLMResponseCache(max_entries=10, ttl=60)
+        monkeypatch.setattr(llm, "get_llm_cache", lambda: cache)
+        provider = LLMProvider()
+        assert provider.generate_response(MESSAGES, use_cache=True) == "pong"
+        assert list(provider.stream_response(MESSAGES, use_cache=True)) == ["pong"]
+        provider.close()
+
+        async_provider = AsyncLLMProvider()
+
+        async def main():
+            first = await async_provider.generate_response(MESSAGES, use_cache=True)
+            streamed = [chunk async for chunk in async_provider.stream_response(MESSAGES, use_cache=True)]
+            await async_provider.aclose()
+            return first, streamed
+
+        assert asyncio.run(main()) == ("pong", ["pong"])
+        assert len(inference_server.ports) == 1
+
+    def test_openai_clients_are_closed(self, monkeypatch):
+        """Test that both providers close the OpenAI clients they created."""
+        monkeypatch.setattr(config, "OPENAI_API_KEY", "test-key")
+        provider = LLMProvider()
+        async_provider = AsyncLLMProvider()
+
+        provider.close()
+        asyncio.run(async_provider.aclose())
+
+        assert provider.openai_client.is_closed()
+        assert async_provider.openai_client.is_closed()
+
+
+def _chunk(text):
+    """An OpenAI streaming chunk carrying text."""
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def _fake_openai(create):
+    """Stand-in OpenAI client whose chat completions are made by create()."""
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+class TestInterruptedStreams:
+    """Tests that a stream breaking off after the first token is reported, not ended quietly."""
+
+    @pytest.fixture(autouse=True)
+    def openai_only(self, monkeypatch):
+        monkeypatch.setattr(config, "OPENAI_API_KEY", "test-key")
+        monkeypatch.setattr(config, "HF_TOKEN", "")
+
+    def test_sync_stream_raises_after_tokens(self):
+        """Test that the sync provider raises once text has been yielded."""
+        def broken():
+            yield _chunk("Hel")
+            raise ConnectionResetError("peer went away")
+
+        provider = LLMProvider()
+        provider.openai_client.close()
+        provider.openai_client = _fake_openai(lambda **kwargs: broken())
+        chunks = []
+        with pytest.raises(LLMStreamError):
+            for chunk in provider.stream_response(MESSAGES):
+                chunks.append(chunk)
+        assert chunks == ["Hel"]
+
+    def test_async_stream_raises_after_tokens(self):
+        """Test that the async provider raises once text has been yielded."""
+        async def broken():
+            yield _chunk("Hel")
+            raise ConnectionResetError("peer went away")
+
+        async def create(**kwargs):
+            return broken()
+
+        provider = AsyncLLMProvider()
+        asyncio.run(provider.openai_client.close())
+        provider.openai_client = _fake_openai(create)
+
+        async def main():
+            chunks = []
+            with pytest.raises(LLMStreamError):
+                async for chunk in provider.stream_response(MESSAGES):
+                    chunks.append(chunk)
+            return chunks
+
+        assert asyncio.run(main()) == ["Hel"]
@@ -0,0 +1,72 @@
+"""Tests for the LLM response cache."""
+
+import asyncio
+import time
+from core.llm_cache import LLMResponseCache, cache_key
+
+
+MESSAGES = [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "Python  questions"}]
+
+
+class TestCacheKey:
+    """Tests for request hashing."""
+
+    def test_normalized_prompts_share_a_key(self):
+        """Test that whitespace differences do not change the key."""
+        spaced = [{"role": "system", "content": " Be brief.\n"}, {"role": "USER", "content": "Python questions"}]
+        assert cache_key(MESSAGES, "m", 0.8, 800) == cache_key(spaced, "m", 0.8, 800)
+
+    def test_parameters_change_the_key(self):
+        """Test that model, temperature and max_tokens are part of the key."""
+        key = cache_key(MESSAGES, "m", 0.8, 800)
+        assert key != cache_key(MESSAGES, "other", 0.8, 800)
+        assert key != cache_key(MESSAGES, "m", 0.2, 800)
+        assert key != cache_key(MESSAGES, "m", 0.8, 100)
+
+
+class TestLLMResponseCache:
+    """Tests for the memory and disk tiers."""
+
+    def test_lru_and_ttl(self):
+        """Test eviction of the least recently used entry and expiry."""
+        cache = LLMResponseCache(max_entries=2, ttl=0.05)
+        cache.set("a", "A", 1.5)
+        cache.set("b", "B", 1.0)
+        assert cache.get("a") == "A"
+        cache.set("c", "C", 1.0)
+
+        assert cache.get("b") is None
+        assert cache.get("c") == "C"
+        time.sleep(0.06)
+        assert cache.get("a") is None
+
+        stats = cache.stats()
+        assert stats["memory_hits"] == 2
+        assert stats["misses"] == 2
+        assert stats["evictions"] == 1
+        assert stats["latency_saved_seconds"] == 2.5
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """Test that a new cache on the same file serves earlier responses."""
+        path = tmp_path / "llm_cache.db"
+        cache = LLMResponseCache(disk_path=path)
+        cache.set("k", "answer", 2.0)
+        cache.close()
+
+        restarted = LLMResponseCache(disk_path=path)
+        assert asyncio.run(asyncio.to_thread(restarted.get, "k")) == "answer"
+        assert restarted.get("k") == "answer"
+        assert restarted.stats()["disk_hits"] == 1
+        assert restarted.stats()["memory_hits"] == 1
+        restarted.close()
+
+    def test_disk_tier_is_bounded(self, tmp_path, monkeypatch):
+        """Test that sweeps keep the disk tier within its limit."""
+        monkeypatch.setattr("core.llm_cache.SWEEP_EVERY", 5)
+        cache = LLMResponseCache(max_entries=1, disk_path=tmp_path / "c.db", disk_max_entries=3)
+        for i in range(10):
+            cache.set(f"k{i}", str(i), 0.1)
+        count = cache._connect().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        assert count == 3
+        assert cache.get("k9") == "9"
+        cache.close()
@@ -1,6 +1,10 @@
 """Tests for question generation module."""
 
+import asyncio
+from contextlib import asynccontextmanager
 import pytest
+from core import question_bank, question_pool
+from core.config import config
 from core.question_bank import (
     categorize_tech_stack,
     parse_questions_from_response,
@@ -125,3 +129,80 @@ class TestQuestionFormatting:
         formatted = format_questions_for_display([])
         assert "No questions generated" in formatted or len(formatted) == 0
 
+
+
+class _StreamingProvider:
+    """Async provider streaming a canned question set line by line."""
+
+    def is_available(self):
+        return True
+
+    async def stream_response(self, messages, temperature=0.7, max_tokens=500, use_cache=False):
+        for i in range(1, 4):
+            await asyncio.sleep(0.01)
+            yield f"{i}) [★★] Explain how you would design component number {i} of the system.\n"
+
+    async def generate_response(self, messages, temperature=0.7, max_tokens=500, use_cache=False):
+        chunks = [chunk async for chunk in self.stream_response(messages)]
+        return "".join(chunks)
+
+
+class TestSharedQuestionGeneration:
+    """Tests for concurrent generations of one tech stack sharing a call."""
+
+    def test_slow_leader_does_not_stall_waiters(self, monkeypatch):
+        """Test that a caller blocked on reporting questions does not hold back the shared result."""
+        monkeypatch.setattr(question_bank, "get_async_llm_provider", _StreamingProvider)
+        monkeypatch.setattr(question_pool, "_question_pool", None)
+        monkeypatch.setattr(config, "QUESTION_POOL_VARIANTS", 0)
+        coalesced = question_bank.async_question_flights.coalesced
+
+        async def main():
+            release = asyncio.Event()
+            reported = []
+
+            async def slow_socket(question):
+                reported.append(question)
+                await release.wait()
+
+            leader = asyncio.create_task(question_bank.generate_questions_async(["Python"], slow_socket))
+            await asyncio.sleep(0)
+            follower = await asyncio.wait_for(question_bank.generate_questions_async(["Python"]), timeout=2)
+            assert not leader.done()
+
+            release.set()
+            return await leader, follower, reported
+
+        leader, follower, reported = asyncio.run(main())
+        assert len(follower) == 3
+        assert [q["text"] for q in leader] == [q["text"] for q in follower]
+        assert len(reported) == 3
+        assert question_bank.async_question_flights.coalesced == coalesced + 1
+
+    def test_only_the_shared_call_is_admitted(self, monkeypatch):
+        """Test that callers joining a shared generation or drawing from the pool take no LLM slot."""
+        monkeypatch.setattr(question_bank, "get_async_llm_provider", _StreamingProvider)
+        monkeypatch.setattr(question_pool, "_question_pool", None)
+        monkeypatch.setattr(config, "QUESTION_POOL_VARIANTS", 0)
+        admitted = []
+
+        @asynccontextmanager
+        async def slot():
+            admitted.append(1)
+            yield
+
+        async def main():
+            return await asyncio.gather(*(
+                question_bank.generate_questions_async(["Python"], admission=slot) for _ in range(3)
+            ))
+
+        results = asyncio.run(main())
+        assert [len(questions) for questions in results] == [3, 3, 3]
+        assert admitted == [1]
+
+        pool = question_pool.QuestionPool(variants=1)
+        pool.add(question_pool.tech_stack_fingerprint(["Python"]), results[0])
+        monkeypatch.setattr(question_bank, "get_question_pool", lambda: pool)
+        assert len(asyncio.run(question_bank.generate_questions_async(["Python"], admission=slot))) == 3
+        assert admitted == [1]
+
@@ -0,0 +1,62 @@
+"""Tests for tech stack fingerprints and the question set pool."""
+
+from core.question_pool import QuestionPool, canonical_tech, tech_stack_fingerprint
+
+
+def _question_set(n: int):
+    """A distinguishable question set."""
+    return [{"text": f"Question {n}.{i} about the stack", "difficulty": 2, "difficulty_stars": "★★"}
+            for i in range(3)]
+
+
+class TestTechStackFingerprint:
+    """Tests for canonical tech stack keys."""
+
+    def test_aliases_case_and_order(self):
+        """Test that equivalent stacks share a fingerprint."""
+        assert canonical_tech("  Postgres ") == "postgresql"
+        assert canonical_tech("NodeJS") == "node.js"
+        assert tech_stack_fingerprint(["Python", "Django", "Postgres"]) == \
+            tech_stack_fingerprint(["postgresql", "python3", "django", "Django"])
+
+    def test_different_stacks_differ(self):
+        """Test that a different technology changes the fingerprint."""
+        assert tech_stack_fingerprint(["Python"]) != tech_stack_fingerprint(["Python", "Docker"])
+        assert tech_stack_fingerprint(["Python"]).startswith("v")
+
+
+class TestQuestionPool:
+    """Tests for drawing and adding question sets."""
+
+    def test_fills_then_draws_without_repeats(self):
+        """Test that draws start once the pool is full and cycle through every set."""
+        pool = QuestionPool(variants=3)
+        for n in range(3):
+            assert pool.draw("k") is None
+            pool.add("k", _question_set(n))
+        pool.add("k", _question_set(99))
+
+        drawn = [pool.draw("k")[0]["text"] for _ in range(3)]
+        assert sorted(drawn) == [f"Question {n}.0 about the stack" for n in range(3)]
+        assert pool.draw("k") is not None
+        assert pool.stats()["hits"] == 4 and pool.stats()["misses"] == 3
+
+    def test_draws_are_copies(self):
+        """Test that callers cannot modify pooled sets."""
+        pool = QuestionPool(variants=1)
+        pool.add("k", _question_set(0))
+        pool.draw("k")[0]["text"] = "changed"
+        assert pool.draw("k")[0]["text"] == "Question 0.0 about the stack"
+
+    def test_stacks_are_bounded_and_persisted(self, tmp_path):
+        """Test LRU eviction of stacks and reloading from disk."""
+        path = tmp_path / "question_pool.json"
+        keys = [tech_stack_fingerprint([tech]) for tech in ("Go", "Rust", "Java")]
+        pool = QuestionPool(variants=1, max_keys=2, path=path)
+        for key in keys:
+            pool.add(key, _question_set(0))
+        assert pool.stats()["stacks"] == 2
+
+        reloaded = QuestionPool(variants=1, max_keys=2, path=path)
+        assert reloaded.draw(keys[0]) is None
+        assert reloaded.draw(keys[2])[0]["text"] == "Question 0.0 about the stack"
@@ -0,0 +1,325 @@
+"""Tests for the live session store."""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import pytest
+from core.config import config
+from core.idempotency import (
+    IdempotencyKeyReusedError,
+    lookup_response,
+    request_fingerprint,
+    store_response
+)
+from core.session_locks import SessionLocks
+from core.session_state import (
+    FileSessionStateBackend,
+    SQLiteSessionStateBackend,
+    SessionConflictError
+)
+from core.session_store import SessionStore
+
+
+def _new_session(session_id: str) -> dict:
+    """Build a minimal live session."""
+    return {"session_id": session_id, "collected_fields": {}, "chat_history": []}
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Store with room for two resident sessions."""
+    return SessionStore(max_resident=2, idle_ttl=0, backend=FileSessionStateBackend(tmp_path / "hibernated"))
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def state_backend(request, tmp_path):
+    """Each session state backend, backed by a temporary directory."""
+    if request.param == "sqlite":
+        backend = SQLiteSessionStateBackend(tmp_path / "session_state.db")
+    else:
+        backend = FileSessionStateBackend(tmp_path / "hibernated")
+    yield backend
+    backend.close()
+
+
+class TestSessionStore:
+    """Tests for eviction, hibernation and rehydration."""
+
+    def test_unknown_id_does_not_allocate(self, store):
+        """Test that reading an unknown session returns None and stores nothing."""
+        assert store.get("missing") is None
+        assert "missing" not in store
+        assert store.stats()["resident"] == 0
+
+    def test_eviction_hibernates_and_rehydrates(self, store):
+        """Test that sessions over the cap spill to disk and come back intact."""
+        for i in range(3):
+            session = store.get_or_create(f"s{i}", lambda i=i: _new_session(f"s{i}"))
+            session["chat_history"].append({"role": "user", "content": f"hello {i}"})
+
+        stats = store.stats()
+        assert stats["resident"] == 2
+        assert stats["hibernated"] == 1
+
+        session = store.get("s0")
+        assert session["chat_history"] == [{"role": "user", "content": "hello 0"}]
+        assert store.stats()["rehydrations"] == 1
+        assert store.stats()["resident"] == 2
+
+    def test_idle_sessions_are_hibernated(self, tmp_path):
+        """Test that sessions idle past the timeout leave memory."""
+        store = SessionStore(max_resident=10, idle_ttl=0.01, backend=FileSessionStateBackend(tmp_path))
+        store.get_or_create("idle", lambda: _new_session("idle"))
+        time.sleep(0.02)
+        store.get_or_create("active", lambda: _new_session("active"))
+
+        assert store.stats()["resident"] == 1
+        assert store.get("idle")["session_id"] == "idle"
+
+    def test_expired_hibernated_sessions_are_purged(self, store):
+        """Test that hibernated files older than the TTL are removed."""
+        store.get_or_create("old", lambda: _new_session("old"))
+        store.hibernate_all()
+        path = next(store.backend.directory.glob("*.json"))
+        stale = time.time() - store.hibernate_ttl - 60
+        os.utime(path, (stale, stale))
+
+        assert store.purge_hibernated() == 1
+        assert store.get("old") is None
+
+    def test_delete_and_path_safety(self, store):
+        """Test deletion and that ids never become file paths."""
+        store.get_or_create("../../etc/passwd", lambda: _new_session("x"))
+        store.hibernate_all()
+        assert all(p.parent == store.backend.directory for p in store.backend.directory.iterdir())
+
+        assert store.delete("../../etc/passwd")
+        assert not store.delete("../../etc/passwd")
+        assert store.stats()["hibernated"] == 0
+
+
+    def test_concurrent_rehydration_loads_once(self, store):
+        """Test that threads reading one hibernated session all get the same copy."""
+        for i in range(3):
+            store.get_or_create(f"s{i}", lambda i=i: _new_session(f"s{i}"))
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(store.get("s0"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(results) == 8
+        assert all(session is results[0] for session in results)
+        assert store.stats()["rehydrations"] == 1
+
+    def test_slow_backend_does_not_block_resident_sessions(self, store):
+        """Test that a rehydration waiting on disk leaves other sessions available."""
+        for i in range(3):
+            store.get_or_create(f"s{i}", lambda i=i: _new_session(f"s{i}"))
+        load = store.backend.load
+        loading = threading.Event()
+        release = threading.Event()
+
+        def slow_load(session_id):
+            loading.set()
+            release.wait(5)
+            return load(session_id)
+
+        store.backend.load = slow_load
+        reader = threading.Thread(target=store.get, args=("s0",))
+        reader.start()
+        assert loading.wait(5)
+
+        started = time.monotonic()
+        assert store.get("s2")["session_id"] == "s2"
+        assert "s1" in store
+        assert time.monotonic() - started < 1
+        release.set()
+        reader.join()
+        assert store.get("s0")["session_id"] == "s0"
+
+
+class TestSharedSessionStore:
+    """Tests for multi-worker session state with optimistic versioning."""
+
+    def test_backend_versions(self, state_backend):
+        """Test that versions advance on save and stale saves are rejected."""
+        assert state_backend.save("s1", {"n": 1}, expected_version=0) == 1
+        assert state_backend.save("s1", {"n": 2}, expected_version=1) == 2
+        with pytest.raises(SessionConflictError):
+            state_backend.save("s1", {"n": 3}, expected_version=1)
+        with pytest.raises(SessionConflictError):
+            state_backend.save("s1", {"n": 3}, expected_version=0)
+
+        assert state_backend.load("s1") == (2, {"n": 2})
+        assert state_backend.save("s1", {"n": 4}) == 3
+        assert state_backend.count() == 1
+        assert state_backend.delete("s1")
+        assert state_backend.version("s1") is None
+
+    def test_file_version_reads_only_the_header(self, tmp_path, monkeypatch):
+        """Test that the file backend's version() does not parse the session, and old files still load."""
+        backend = FileSessionStateBackend(tmp_path)
+        backend.save("s1", {"chat_history": ["x" * 1000]}, expected_version=0)
+        parsed = []
+        loads = json.loads
+        monkeypatch.setattr(json, "loads", lambda text: parsed.append(len(text)) or loads(text))
+        assert backend.version("s1") == 1
+        assert len(parsed) == 1 and parsed[0] < 200
+        monkeypatch.setattr(json, "loads", loads)
+
+        legacy = {"session_id": "s2", "version": 4, "updated_at": time.time(), "session": {"n": 1}}
+        backend._path("s2").write_text(json.dumps(legacy))
+        assert backend.version("s2") == 4
+        assert backend.load("s2") == (4, {"n": 1})
+        assert backend.save("s2", {"n": 2}, expected_version=4) == 5
+        assert backend.load("s2") == (5, {"n": 2})
+
+    def test_close_after_use_from_other_threads(self, state_backend):
+        """Test that close() releases connections opened by worker threads."""
+        worker = threading.Thread(target=lambda: state_backend.save("s1", {"n": 1}, expected_version=0))
+        worker.start()
+        worker.join()
+        state_backend.close()
+        assert state_backend.version("s1") == 1
+
+    def test_workers_see_each_others_changes(self, state_backend):
+        """Test that two stores on one backend stay consistent."""
+        worker_a = SessionStore(backend=state_backend, shared=True)
+        worker_b = SessionStore(backend=state_backend, shared=True)
+
+        session = worker_a.get_or_create("s1", lambda: _new_session("s1"))
+        session["collected_fields"]["email"] = "a@example.com"
+        worker_a.save("s1", session)
+
+        other = worker_b.get("s1")
+        assert other["collected_fields"] == {"email": "a@example.com"}
+        other["collected_fields"]["phone"] = "555"
+        worker_b.save("s1", other)
+
+        assert worker_a.get("s1")["collected_fields"] == {"email": "a@example.com", "phone": "555"}
+
+    def test_concurrent_update_conflicts(self, state_backend):
+        """Test that the second of two racing saves is rejected."""
+        worker_a = SessionStore(backend=state_backend, shared=True)
+        worker_b = SessionStore(backend=state_backend, shared=True)
+        worker_a.get_or_create("s1", lambda: _new_session("s1"))
+
+        session_a = worker_a.get("s1")
+        session_b = worker_b.get("s1")
+        worker_b.save("s1", session_b)
+
+        with pytest.raises(SessionConflictError):
+            worker_a.save("s1", session_a)
+        assert worker_a.stats()["conflicts"] == 1
+        assert worker_a.get("s1") is not None
+
+    def test_stale_copy_conflicts_after_reload(self, state_backend):
+        """Test that a save checks the version the caller read, not the one now resident."""
+        worker_a = SessionStore(backend=state_backend, shared=True)
+        worker_b = SessionStore(backend=state_backend, shared=True)
+        worker_a.get_or_create("s1", lambda: _new_session("s1"))
+
+        session_a = worker_a.get("s1")
+        session_b = worker_b.get("s1")
+        session_b["collected_fields"]["email"] = "b@example.com"
+        worker_b.save("s1", session_b)
+
+        # Reloads the newer version while session_a is still the old one
+        assert worker_a.get("s1")["collected_fields"] == {"email": "b@example.com"}
+        with pytest.raises(SessionConflictError):
+            worker_a.save("s1", session_a)
+        assert worker_b.get("s1")["collected_fields"] == {"email": "b@example.com"}
+
+    def test_unread_session_is_never_saved_blindly(self, state_backend):
+        """Test that a dict without a read version is refused instead of overwriting."""
+        worker = SessionStore(backend=state_backend, shared=True)
+        worker.get_or_create("s1", lambda: _new_session("s1"))
+        with pytest.raises(SessionConflictError):
+            worker.save("s1", _new_session("s1"))
+
+
+class TestIdempotency:
+    """Tests for replaying responses stored under an Idempotency-Key."""
+
+    def test_replay_and_reuse(self):
+        """Test that a retry gets the stored response and a different request is refused."""
+        session = _new_session("s1")
+        fingerprint = request_fingerprint("hello")
+        assert lookup_response(session, "k1", fingerprint) is None
+
+        store_response(session, "k1", fingerprint, {"response": "hi"})
+        assert lookup_response(session, "k1", fingerprint) == {"response": "hi"}
+        with pytest.raises(IdempotencyKeyReusedError):
+            lookup_response(session, "k1", request_fingerprint("goodbye"))
+
+    def test_keys_are_capped_and_expire(self, monkeypatch):
+        """Test that old keys are dropped by count and by age."""
+        monkeypatch.setattr(config, "IDEMPOTENCY_KEYS_PER_SESSION", 2)
+        session = _new_session("s1")
+        for key in ("a", "b", "c"):
+            store_response(session, key, "f", {"key": key})
+        assert list(session["idempotency"]) == ["b", "c"]
+
+        session["idempotency"]["b"]["stored_at"] -= config.IDEMPOTENCY_TTL_SECONDS + 1
+        assert lookup_response(session, "b", "f") is None
+        assert lookup_response(session, "c", "f") == {"key": "c"}
+
+
+class TestSessionLocks:
+    """Tests for the per-session lock table."""
+
+    def test_same_session_shares_a_lock(self):
+        """Test that a session maps to one lock while it is in use, and other sessions never share it."""
+        locks = SessionLocks()
+        held = locks.lock("s1")
+        assert locks.lock("s1") is held
+        assert all(locks.lock(f"s{i}") is not held for i in range(2, 100))
+
+    def test_unused_locks_are_dropped(self):
+        """Test that the table only keeps locks someone still references."""
+        locks = SessionLocks()
+
+        async def main():
+            async with locks.lock("s1"):
+                assert len(locks) == 1
+
+        asyncio.run(main())
+        assert len(locks) == 0
+
+    def test_other_sessions_do_not_wait(self):
+        """Test that a long turn on one session does not hold up another session."""
+        locks = SessionLocks()
+        events = []
+
+        async def turn(session_id, seconds):
+            async with locks.lock(session_id):
+                await asyncio.sleep(seconds)
+                events.append(session_id)
+
+        async def main():
+            await asyncio.gather(*(turn(f"s{i}", 0.05) for i in range(1000)), turn("fast", 0))
+
+        asyncio.run(main())
+        assert events[0] == "fast"
+
+    def test_turns_are_serialized(self):
+        """Test that two turns on one session never overlap."""
+        locks = SessionLocks()
+        events = []
+
+        async def turn(name):
+            async with locks.lock("s1"):
+                events.append(f"{name} start")
+                await asyncio.sleep(0.01)
+                events.append(f"{name} end")
+
+        async def main():
+            await asyncio.gather(turn("a"), turn("b"))
+
+        asyncio.run(main())
+        assert events == ["a start", "a end", "b start", "b end"]
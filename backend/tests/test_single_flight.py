@@ -0,0 +1,114 @@
+"""Tests for coalescing of concurrent identical calls."""
+
+import asyncio
+import threading
+import time
+import pytest
+from core.single_flight import AsyncSingleFlight, SingleFlight
+
+
+class TestSingleFlight:
+    """Tests for the thread-safe group."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that threads asking for the same key get one call's result."""
+        flights = SingleFlight()
+        calls = []
+        results = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.1)
+            return "answer"
+
+        threads = [threading.Thread(target=lambda: results.append(flights.do("k", slow))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert sorted(results) == [("answer", False)] + [("answer", True)] * 4
+        assert flights.stats() == {"in_flight": 0, "executions": 1, "coalesced": 4}
+
+    def test_errors_are_shared_and_keys_forgotten(self):
+        """Test that waiters see the call's exception and later calls run again."""
+        flights = SingleFlight()
+        started = threading.Event()
+        errors = []
+
+        def failing():
+            started.set()
+            time.sleep(0.05)
+            raise ValueError("boom")
+
+        def call():
+            try:
+                flights.do("k", failing)
+            except ValueError as e:
+                errors.append(str(e))
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        call()
+        leader.join()
+
+        assert errors == ["boom", "boom"]
+        assert flights.do("k", lambda: "ok") == ("ok", False)
+
+    def test_disabled(self):
+        """Test that a disabled group runs every call."""
+        flights = SingleFlight(enabled=False)
+        assert flights.do("k", lambda: 1) == (1, False)
+        assert flights.stats()["executions"] == 0
+
+
+class TestAsyncSingleFlight:
+    """Tests for the asyncio group."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that tasks asking for the same key await one call."""
+        flights = AsyncSingleFlight()
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        async def main():
+            return await asyncio.gather(*(flights.do("k", slow) for _ in range(4)), flights.do("other", slow))
+
+        results = asyncio.run(main())
+        assert len(calls) == 2
+        assert [shared for _, shared in results] == [False, True, True, True, False]
+        assert flights.stats() == {"in_flight": 0, "executions": 2, "coalesced": 3}
+
+    def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that the call survives one caller leaving and stops when all have."""
+        flights = AsyncSingleFlight()
+        finished = []
+
+        async def slow():
+            await asyncio.sleep(0.05)
+            finished.append(1)
+            return "answer"
+
+        async def main():
+            first = asyncio.create_task(flights.do("k", slow))
+            second = asyncio.create_task(flights.do("k", slow))
+            await asyncio.sleep(0)
+            first.cancel()
+            assert await second == ("answer", True)
+            with pytest.raises(asyncio.CancelledError):
+                await first
+
+            alone = asyncio.create_task(flights.do("k", slow))
+            await asyncio.sleep(0)
+            alone.cancel()
+            await asyncio.sleep(0.1)
+
+        asyncio.run(main())
+        assert finished == [1]
+        assert flights.stats()["in_flight"] == 0
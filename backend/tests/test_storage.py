@@ -0,0 +1,756 @@
+"""Tests for session storage."""
+
+import gzip
+import json
+import tempfile
+import threading
+from datetime import date, datetime
+import pytest
+from core.cold_archive import ColdArchive
+from core.config import Config
+from core import storage
+from core.retention import find_expired_sessions, run_retention
+from core.session_log import SessionLog
+from core.tech_index import TechStackIndex, remove_tech_index
+from core.storage_backends import (
+    JSONFileBackend,
+    JSONLBackend,
+    SQLiteBackend,
+    ShardedJSONBackend,
+    create_storage_backend
+)
+from core.write_behind import WriteBehindQueue
+
+
+@pytest.fixture
+def storage_path(tmp_path, monkeypatch):
+    """Point storage at a temporary directory."""
+    path = tmp_path / "sessions.json"
+    monkeypatch.setattr(Config, "ENABLE_STORAGE", True)
+    monkeypatch.setattr(Config, "STORAGE_PATH", path)
+    monkeypatch.setattr(Config, "STORAGE_BACKEND", "")
+    yield path
+    if storage._storage_backend is not None:
+        storage._storage_backend.close()
+    storage._storage_backend = None
+    storage._storage_backend_key = None
+    if storage._tech_index is not None:
+        storage._tech_index.close()
+    storage._storage_meta = None
+    storage._tech_index = None
+    storage._cold_archive = None
+    storage._read_cache.clear()
+
+
+def _record(session_id: str, **extra) -> dict:
+    """Build a minimal session record."""
+    record = {"session_id": session_id, "tech_stack": ["Python"]}
+    record.update(extra)
+    return record
+
+
+class TestSessionLog:
+    """Tests for the append-only JSONL session log."""
+
+    def test_append_and_get(self, tmp_path):
+        """Test that appended records can be read back."""
+        log = SessionLog(tmp_path / "sessions.jsonl")
+        log.append(_record("a"))
+        log.append(_record("b"))
+
+        assert len(log) == 2
+        assert log.get("a")["session_id"] == "a"
+        assert log.get("missing") is None
+
+    def test_latest_record_wins(self, tmp_path):
+        """Test that a later save supersedes an earlier one."""
+        log = SessionLog(tmp_path / "sessions.jsonl")
+        log.append(_record("a", answers=["first"]))
+        log.append(_record("a", answers=["second"]))
+
+        assert len(log) == 1
+        assert log.get("a")["answers"] == ["second"]
+        assert log.dead_records() == 1
+
+    def test_delete_appends_tombstone(self, tmp_path):
+        """Test that deletes append a tombstone instead of rewriting."""
+        path = tmp_path / "sessions.jsonl"
+        log = SessionLog(path)
+        log.append(_record("a"))
+
+        assert log.delete("a")
+        assert not log.delete("a")
+        assert log.get("a") is None
+        assert len(path.read_text().splitlines()) == 2
+
+    def test_index_rebuilt_from_disk(self, tmp_path):
+        """Test that a fresh instance sees records written by another."""
+        path = tmp_path / "sessions.jsonl"
+        writer = SessionLog(path)
+        writer.append(_record("a"))
+        writer.append(_record("b"))
+        writer.delete("a")
+
+        reader = SessionLog(path)
+        assert dict(reader.items()).keys() == {"b"}
+
+        writer.append(_record("c"))
+        assert "c" in reader
+
+    def test_torn_last_line_is_ignored(self, tmp_path):
+        """Test that a partial write from a crash does not break the log."""
+        path = tmp_path / "sessions.jsonl"
+        path.write_text(json.dumps(_record("a")) + "\n" + '{"session_id": "b", "te')
+
+        log = SessionLog(path)
+        assert len(log) == 1
+        log.append(_record("c"))
+        assert SessionLog(path).get("c")["session_id"] == "c"
+
+    def test_index_hint_avoids_full_scan(self, tmp_path):
+        """Test that a persisted index is reused and only the tail is scanned."""
+        path = tmp_path / "sessions.jsonl"
+        writer = SessionLog(path, index_flush_records=2)
+        writer.append(_record("a"))
+        writer.append(_record("b"))  # index hint written here
+        writer.append(_record("c"))
+
+        reader = SessionLog(path)
+        scanned_from = []
+        original_scan = reader._scan
+        reader._scan = lambda index, start: scanned_from.append(start) or original_scan(index, start)
+
+        assert len(reader) == 3
+        assert scanned_from and scanned_from[0] > 0
+
+    def test_generation_tracks_external_writes(self, tmp_path):
+        """Test that only other writers change the generation token."""
+        path = tmp_path / "sessions.jsonl"
+        log = SessionLog(path)
+        log.append(_record("a"))
+        generation = log.generation()
+        log.append(_record("b"))
+        assert log.generation() == generation
+
+        SessionLog(path).append(_record("c"))
+        assert log.generation() != generation
+
+    def test_compact_removes_dead_records(self, tmp_path):
+        """Test that compaction keeps only live records."""
+        path = tmp_path / "sessions.jsonl"
+        log = SessionLog(path, compaction_min_records=10_000)
+        for i in range(5):
+            log.append(_record("a", answers=[str(i)]))
+        log.append(_record("b"))
+        log.delete("b")
+
+        removed = log.compact()
+
+        assert removed == 6
+        assert len(path.read_text().splitlines()) == 1
+        assert log.get("a")["answers"] == ["4"]
+        assert SessionLog(path).get("a")["answers"] == ["4"]
+
+    def test_compact_drops_torn_tail(self, tmp_path):
+        """Test that a partial line written during compaction does not swallow the next append."""
+        path = tmp_path / "sessions.jsonl"
+        log = SessionLog(path, compaction_min_records=10_000)
+        for i in range(3):
+            log.append(_record("a", answers=[str(i)]))
+
+        refresh = log._refresh
+        calls = []
+
+        def crash_writer_before_swap():
+            calls.append(1)
+            if len(calls) == 2:
+                with open(path, "ab") as f:
+                    f.write(b'{"session_id": "torn", "te')
+            refresh()
+
+        log._refresh = crash_writer_before_swap
+        log.compact()
+        log._refresh = refresh
+        log.append(_record("b"))
+
+        assert [json.loads(line)["session_id"] for line in path.read_text().splitlines()] == ["a", "b"]
+        assert SessionLog(path).get("b")["session_id"] == "b"
+
+    def test_compact_skips_while_compacting(self, tmp_path):
+        """Test that compact() returns at once while another compaction is running."""
+        path = tmp_path / "sessions.jsonl"
+        log = SessionLog(path, compaction_min_records=10_000)
+        for i in range(3):
+            log.append(_record("a", answers=[str(i)]))
+        log._compacting = True
+
+        assert log.compact() == 0
+        assert len(path.read_text().splitlines()) == 3
+
+        log._compacting = False
+        assert log.compact() == 2
+        assert list(tmp_path.glob("*.compact")) == []
+
+    def test_compact_aborts_when_log_is_replaced(self, tmp_path, monkeypatch):
+        """Test that a compaction skips the swap if another process replaced the log meanwhile."""
+        path = tmp_path / "sessions.jsonl"
+        log = SessionLog(path, compaction_min_records=10_000)
+        for i in range(3):
+            log.append(_record("a", answers=[str(i)]))
+
+        mkstemp = tempfile.mkstemp
+        other = SessionLog(path, compaction_min_records=10_000)
+        # Stands in for another process; flock would block it on our own lock
+        other.compact_lock_path = tmp_path / "other.compact.lock"
+
+        def other_process_compacts_after_snapshot(**kwargs):
+            monkeypatch.setattr(tempfile, "mkstemp", mkstemp)
+            other.append(_record("b"))
+            other.compact()
+            return mkstemp(**kwargs)
+
+        monkeypatch.setattr(tempfile, "mkstemp", other_process_compacts_after_snapshot)
+        assert log.compact() == 0
+
+        assert [json.loads(line)["session_id"] for line in path.read_text().splitlines()] == ["a", "b"]
+        assert log.get("a")["answers"] == ["2"]
+        assert log.get("b")["session_id"] == "b"
+        assert list(tmp_path.glob("*.compact")) == []
+
+    def test_items_unaffected_by_compaction(self, tmp_path):
+        """Test that iterating while the log is compacted still yields every session."""
+        path = tmp_path / "sessions.jsonl"
+        log = SessionLog(path, compaction_min_records=10_000)
+        for session_id in ("a", "b", "c"):
+            log.append(_record(session_id))
+            log.append(_record(session_id))
+
+        seen = []
+        for session_id, record in log.items():
+            if not seen:
+                SessionLog(path).compact()
+            seen.append(record["session_id"])
+
+        assert sorted(seen) == ["a", "b", "c"]
+        assert sorted(session_id for session_id, _ in log.items()) == ["a", "b", "c"]
+
+    def test_needs_compaction_threshold(self, tmp_path):
+        """Test the dead-record threshold for background compaction."""
+        log = SessionLog(tmp_path / "sessions.jsonl", compaction_min_records=3)
+        log._maybe_compact = lambda: None
+        log.append(_record("a"))
+        log.append(_record("a"))
+        assert not log.needs_compaction()
+        log.append(_record("a"))
+        log.append(_record("a"))
+        assert log.needs_compaction()
+
+
+@pytest.fixture(params=["json", "jsonl", "sqlite", "sharded"])
+def backend(request, tmp_path):
+    """Create each storage backend in a temporary directory."""
+    if request.param == "json":
+        instance = JSONFileBackend(tmp_path / "sessions.json")
+    elif request.param == "jsonl":
+        instance = JSONLBackend(tmp_path / "sessions.jsonl")
+    elif request.param == "sqlite":
+        instance = SQLiteBackend(tmp_path / "sessions.db")
+    else:
+        instance = ShardedJSONBackend(tmp_path / "sessions", shard_count=4)
+    yield instance
+    instance.close()
+
+
+def _second_instance(backend):
+    """Open another instance on the same files, as a second worker process would."""
+    if isinstance(backend, ShardedJSONBackend):
+        return ShardedJSONBackend(backend.directory, shard_count=backend.shard_count)
+    return type(backend)(backend.path)
+
+
+class TestStorageBackends:
+    """Behaviour shared by every storage backend."""
+
+    def test_save_and_load(self, backend):
+        """Test saving and loading a record."""
+        assert backend.save(_record("a")) is None
+        assert backend.load("a")["session_id"] == "a"
+        assert backend.load("missing") is None
+
+    def test_save_returns_previous(self, backend):
+        """Test that replacing a record returns the old one."""
+        backend.save(_record("a", answers=["old"]))
+        previous = backend.save(_record("a", answers=["new"]))
+        assert previous["answers"] == ["old"]
+        assert backend.load("a")["answers"] == ["new"]
+        assert backend.count() == 1
+
+    def test_concurrent_saves_each_replace_a_different_record(self, backend):
+        """Test that racing saves of one session never report the same previous record."""
+        backend.save(_record("a", answers=["start"]))
+        previous = []
+
+        def save(n):
+            previous.append(backend.save(_record("a", answers=[str(n)]))["answers"][0])
+
+        threads = [threading.Thread(target=save, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        replaced = sorted(previous + backend.load("a")["answers"])
+        assert replaced == sorted(["start"] + [str(n) for n in range(8)])
+
+    def test_generation_ignores_own_writes(self, backend):
+        """Test that the generation only moves on another instance's writes, from any thread."""
+        backend.save(_record("a"))
+        generation = backend.generation()
+        backend.save(_record("b"))
+        backend.delete("a")
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(backend.generation()))
+        thread.start()
+        thread.join()
+        assert seen == [generation]
+        assert backend.generation() == generation
+
+        other = _second_instance(backend)
+        other.save(_record("c"))
+        other.close()
+        assert backend.generation() != generation
+
+    def test_delete(self, backend):
+        """Test deleting a record."""
+        backend.save(_record("a"))
+        assert backend.delete("a")["session_id"] == "a"
+        assert backend.delete("a") is None
+        assert backend.count() == 0
+
+    def test_delete_many_skips_resaved_records(self, backend):
+        """Test that a batch delete only removes records whose timestamp still matches."""
+        for session_id in ("a", "b", "c"):
+            backend.save(_record(session_id, timestamp="2026-01-01T09:00:00"))
+        backend.save(_record("b", timestamp="2026-02-01T09:00:00"))
+
+        removed = backend.delete_many({
+            "a": "2026-01-01T09:00:00", "b": "2026-01-01T09:00:00", "missing": "2026-01-01T09:00:00"
+        })
+
+        assert [r["session_id"] for r in removed] == ["a"]
+        assert set(backend.load_all()) == {"b", "c"}
+
+    def test_iter_records_time_range(self, backend):
+        """Test streaming records filtered by timestamp."""
+        backend.save(_record("old", timestamp="2026-01-01T09:00:00"))
+        backend.save(_record("new", timestamp="2026-03-01T09:00:00"))
+
+        assert {r["session_id"] for r in backend.iter_records()} == {"old", "new"}
+        assert [r["session_id"] for r in backend.iter_records(since="2026-02-01")] == ["new"]
+        assert [r["session_id"] for r in backend.iter_records(until="2026-02-01")] == ["old"]
+
+    def test_delete_all_and_load_all(self, backend):
+        """Test bulk load and delete."""
+        backend.save(_record("a"))
+        backend.save(_record("b"))
+        assert set(backend.load_all()) == {"a", "b"}
+        backend.delete_all()
+        assert backend.load_all() == {}
+
+
+    def test_close_after_use_from_other_threads(self, backend):
+        """Test that close() releases connections opened by worker threads."""
+        worker = threading.Thread(target=lambda: backend.save(_record("a")))
+        worker.start()
+        worker.join()
+        backend.close()
+        assert backend.load("a")["session_id"] == "a"
+
+
+class TestShardedJSONBackend:
+    """Tests specific to the hash-sharded backend."""
+
+    def test_write_touches_one_shard(self, tmp_path):
+        """Test that a save rewrites only the session's own shard."""
+        backend = ShardedJSONBackend(tmp_path / "sessions", shard_count=8)
+        for i in range(32):
+            backend.save(_record(f"s{i}"))
+        before = {p.name: p.stat().st_mtime_ns for p in (tmp_path / "sessions").glob("shard-*.json")}
+
+        backend.save(_record("s0", answers=["updated"]))
+
+        after = {p.name: p.stat().st_mtime_ns for p in (tmp_path / "sessions").glob("shard-*.json")}
+        changed = [name for name in before if before[name] != after[name]]
+        assert changed == [f"shard-{backend.shard_for('s0'):03d}.json"]
+
+    def test_concurrent_writers_do_not_lose_updates(self, tmp_path):
+        """Test that parallel saves into the same shards are all kept."""
+        directory = tmp_path / "sessions"
+        writers = [ShardedJSONBackend(directory, shard_count=2) for _ in range(4)]
+
+        def save_many(backend, prefix):
+            for i in range(25):
+                backend.save(_record(f"{prefix}-{i}"))
+
+        threads = [
+            threading.Thread(target=save_many, args=(writer, f"w{n}"))
+            for n, writer in enumerate(writers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert ShardedJSONBackend(directory, shard_count=2).count() == 100
+        assert not list(directory.glob("*.tmp"))
+
+
+class TestStorageFacade:
+    """Tests for the module-level storage functions."""
+
+    @pytest.mark.parametrize("suffix,expected", [
+        (".json", "json"), (".jsonl", "jsonl"), (".db", "sqlite"), (".sqlite3", "sqlite"), ("", "sharded")
+    ])
+    def test_backend_inferred_from_path(self, storage_path, monkeypatch, suffix, expected):
+        """Test that STORAGE_PATH's suffix selects the backend."""
+        monkeypatch.setattr(Config, "STORAGE_PATH", storage_path.with_suffix(suffix))
+        assert storage.get_storage_backend().name == expected
+
+    def test_round_trip_anonymizes_pii(self, storage_path, monkeypatch):
+        """Test that saved sessions have PII masked."""
+        monkeypatch.setattr(Config, "STORAGE_BACKEND", "sqlite")
+        fields = {"full_name": "Jane Doe", "email": "jane@example.com"}
+        assert storage.save_session("s1", fields, ["Python"], [])
+
+        saved = storage.load_session("s1")
+        assert saved["pii"]["email"] == "j***@example.com"
+        assert storage.get_session_count() == 1
+        assert storage.delete_session("s1")
+        assert storage.get_session_count() == 0
+
+    def test_legacy_file_migrated_once(self, storage_path, monkeypatch):
+        """Test that an existing sessions.json is imported into a new backend."""
+        storage_path.write_text(json.dumps({"a": _record("a"), "b": _record("b")}))
+        monkeypatch.setattr(Config, "STORAGE_BACKEND", "jsonl")
+
+        assert storage.get_session_count() == 2
+        assert not storage_path.exists()
+
+    def test_iter_sessions_filters_by_tech(self, storage_path):
+        """Test that iter_sessions matches technologies case-insensitively."""
+        storage.save_session("s1", {}, ["Python", "Kubernetes"], [])
+        storage.save_session("s2", {}, ["Go"], [])
+
+        matches = [s["session_id"] for s in storage.iter_sessions(tech="kubernetes")]
+        assert matches == ["s1"]
+        assert len(list(storage.iter_sessions())) == 2
+
+    def test_metadata_tracks_saves_and_deletes(self, storage_path):
+        """Test that the metadata sidecar is maintained incrementally."""
+        storage.save_session("s1", {}, ["Python"], [])
+        storage.save_session("s1", {}, ["Python"], ["answer"])
+        storage.save_session("s2", {}, ["Go"], [])
+
+        meta = storage.get_storage_metadata()
+        assert meta["count"] == 2
+        assert sum(meta["daily"].values()) == 2
+        assert meta["last_modified"] is not None
+
+        storage.delete_session("s1")
+        assert storage.get_session_count() == 1
+
+        storage.delete_all_sessions()
+        assert storage.get_storage_metadata()["daily"] == {}
+
+    @pytest.mark.parametrize("backend_name", ["json", "jsonl", "sqlite", "sharded"])
+    def test_read_cache_sees_external_writes(self, storage_path, monkeypatch, backend_name):
+        """Test that cached reads are invalidated when another writer changes the store."""
+        monkeypatch.setattr(Config, "STORAGE_BACKEND", backend_name)
+        storage.save_session("s1", {}, ["Python"], ["one"])
+        assert storage.load_session("s1")["answers"] == ["one"]
+        assert storage.load_session("s1")["answers"] == ["one"]
+        assert storage._read_cache.hits >= 1
+
+        other = create_storage_backend(backend_name)
+        other.save(_record("s1", answers=["two"]))
+        other.close()
+
+        assert storage.load_session("s1")["answers"] == ["two"]
+
+    def test_read_cache_skips_record_read_before_a_save(self, storage_path, monkeypatch):
+        """Test that a load racing with this process's save does not cache the older record."""
+        storage.save_session("s1", {}, ["Python"], ["one"])
+        storage._read_cache.clear()
+        backend = storage.get_storage_backend()
+        load = backend.load
+
+        def save_while_loading(session_id):
+            record = load(session_id)
+            storage.write_session_record(_record("s1", answers=["two"]))
+            return record
+
+        monkeypatch.setattr(backend, "load", save_while_loading)
+        assert storage.load_session("s1")["answers"] == ["one"]
+        monkeypatch.setattr(backend, "load", load)
+
+        assert storage.load_session("s1")["answers"] == ["two"]
+
+    def test_sqlite_read_cache_hits_across_threads(self, storage_path, monkeypatch):
+        """Test that a record cached by one thread is a hit in another."""
+        monkeypatch.setattr(Config, "STORAGE_BACKEND", "sqlite")
+        storage.save_session("s1", {}, ["Python"], ["one"])
+        storage.load_session("s1")
+        backend = storage.get_storage_backend()
+        loads = []
+        monkeypatch.setattr(backend, "load", loads.append)
+
+        results = []
+        thread = threading.Thread(target=lambda: results.append(storage.load_session("s1")))
+        thread.start()
+        thread.join()
+
+        assert results[0]["answers"] == ["one"]
+        assert loads == []
+
+    def test_metadata_rebuilt_when_missing(self, storage_path):
+        """Test that a missing sidecar is rebuilt from the backend."""
+        storage.save_session("s1", {}, ["Python"], [])
+        Config.storage_meta_path().unlink()
+        storage._storage_meta = None
+
+        assert storage.get_session_count() == 1
+
+    def test_tech_stack_stats_track_saves_and_deletes(self, storage_path):
+        """Test that per-technology counters follow saves, re-saves and deletes."""
+        storage.write_session_record(_record(
+            "a", tech_stack=["Python", "Kubernetes", "kubernetes"], timestamp="2026-10-06T10:00:00"
+        ))
+        storage.write_session_record(_record("b", tech_stack=["Kubernetes"], timestamp="2026-10-13T10:00:00"))
+
+        stats = storage.get_tech_stack_stats()
+        assert stats["technologies"] == [
+            {"technology": "Kubernetes", "count": 2},
+            {"technology": "Python", "count": 1}
+        ]
+        last_week = storage.get_tech_stack_stats(
+            since=date(2026, 10, 5), until=date(2026, 10, 12), tech="KUBERNETES"
+        )
+        assert last_week["technologies"][0]["count"] == 1
+
+        storage.write_session_record(_record("a", tech_stack=["Go"], timestamp="2026-10-14T10:00:00"))
+        storage.delete_session("b")
+        assert storage.get_tech_stack_stats()["technologies"] == [{"technology": "Go", "count": 1}]
+
+    def test_tech_stack_stats_rebuilt_when_missing(self, storage_path):
+        """Test that the tech index is rebuilt from existing sessions."""
+        storage.save_session("s1", {}, ["Rust"], [])
+        storage._tech_index.close()
+        remove_tech_index(Config.tech_index_path())
+        storage._tech_index = None
+
+        assert storage.get_tech_stack_stats(tech="rust")["technologies"][0]["count"] == 1
+
+
+class TestTechStackIndex:
+    """Tests for the per-technology counters database."""
+
+    def test_counts_by_day_and_name(self, tmp_path):
+        """Test that counters follow saves and deletes and drop technologies that reach zero."""
+        index = TechStackIndex(tmp_path / "sessions.tech.db")
+        assert not index.exists()
+        first = _record("a", tech_stack=["Go", "Docker"], timestamp="2026-10-01T10:00:00")
+        index.record_save(first, None)
+        index.record_save(_record("b", tech_stack=["docker"], timestamp="2026-10-02T10:00:00"), None)
+
+        assert index.exists()
+        assert index.count_sessions("DOCKER") == 2
+        assert index.count_sessions("docker", since="2026-10-02") == 1
+        assert index.top() == [{"technology": "Docker", "count": 2}, {"technology": "Go", "count": 1}]
+
+        index.record_deletes([first])
+        index.record_save(_record("c", tech_stack=["GO"], timestamp="2026-10-03T10:00:00"), None)
+        assert index.top(limit=5, until="2026-10-03") == [{"technology": "Docker", "count": 1}]
+        assert index.top(limit=5, since="2026-10-03") == [{"technology": "GO", "count": 1}]
+        index.close()
+
+    def test_rebuild_replaces_counters(self, tmp_path):
+        """Test that a rebuild starts from an empty index."""
+        index = TechStackIndex(tmp_path / "sessions.tech.db")
+        index.record_save(_record("a", tech_stack=["Rust"]), None)
+        index.rebuild([_record("b", tech_stack=["Java"])])
+
+        assert index.count_sessions("rust") == 0
+        assert index.count_sessions("java") == 1
+        index.close()
+
+
+class TestWriteBehindQueue:
+    """Tests for the coalescing write-behind queue."""
+
+    def test_saves_coalesced_within_window(self):
+        """Test that repeated saves of one key produce a single write."""
+        written = []
+        queue = WriteBehindQueue(lambda payload: written.append(payload) or True, flush_interval=0.2)
+        for i in range(5):
+            queue.submit("a", i)
+        queue.submit("b", "only")
+
+        assert queue.flush(timeout=5)
+        queue.stop()
+        assert sorted(written, key=str) == [4, "only"]
+        assert queue.stats()["coalesced"] == 4
+
+    def test_overflow_writes_synchronously(self):
+        """Test that a full queue writes on the caller's thread."""
+        written = []
+        queue = WriteBehindQueue(lambda payload: written.append(payload) or True, max_size=1, flush_interval=10)
+        queue.submit("a", 1)
+        queue.submit("b", 2)
+
+        assert written == [2]
+        assert queue.stats()["overflow_writes"] == 1
+        queue.stop()
+        assert sorted(written) == [1, 2]
+
+    def test_enqueue_save_session_writes_on_flush(self, storage_path, monkeypatch):
+        """Test that queued saves reach the backend after a flush."""
+        monkeypatch.setattr(Config, "STORAGE_FLUSH_INTERVAL", 0.05)
+        assert storage.enqueue_save_session("s1", {}, ["Go"], [])
+        assert storage.flush_pending_saves(timeout=5)
+        assert storage.load_session("s1")["tech_stack"] == ["Go"]
+        storage.shutdown_storage()
+
+
+class TestRetention:
+    """Tests for the retention job."""
+
+    def _save(self, session_id: str, timestamp: str) -> None:
+        """Write a record with a fixed timestamp through the storage API."""
+        storage.write_session_record(_record(session_id, timestamp=timestamp))
+
+    def test_find_expired_by_age_and_count(self, storage_path):
+        """Test selection by maximum age and maximum count."""
+        now = datetime(2026, 10, 17, 12, 0, 0)
+        self._save("ancient", "2026-01-01T00:00:00")
+        self._save("older", "2026-10-10T00:00:00")
+        self._save("old", "2026-10-15T00:00:00")
+        self._save("new", "2026-10-17T00:00:00")
+
+        by_age = find_expired_sessions(max_age_days=30, now=now)
+        assert [session_id for _, session_id in by_age] == ["ancient"]
+
+        by_count = find_expired_sessions(max_count=2, now=now)
+        assert [session_id for _, session_id in by_count] == ["ancient", "older"]
+
+    def test_run_retention_purges_and_archives(self, storage_path, tmp_path, monkeypatch):
+        """Test that expired sessions are archived, deleted and reported."""
+        monkeypatch.setattr(Config, "STORAGE_BACKEND", "jsonl")
+        for i in range(5):
+            self._save(f"s{i}", f"2026-10-1{i}T00:00:00")
+        archive = tmp_path / "archive.ndjson.gz"
+
+        report = run_retention(max_count=2, archive_path=archive, batch_size=2, batch_pause=0)
+
+        assert report["purged"] == 3
+        assert report["archived"] == 3
+        assert report["bytes_reclaimed"] > 0
+        assert storage.get_session_count() == 2
+        with gzip.open(archive, "rt") as f:
+            assert [json.loads(line)["session_id"] for line in f] == ["s0", "s1", "s2"]
+
+    def test_run_retention_writes_once_per_batch(self, storage_path, monkeypatch):
+        """Test that the single-file backend is rewritten once per batch, not per session."""
+        for i in range(6):
+            self._save(f"s{i}", f"2020-01-0{i + 1}T00:00:00")
+        backend = storage.get_storage_backend()
+        writes = []
+        write = backend._write
+        monkeypatch.setattr(backend, "_write", lambda sessions: writes.append(1) or write(sessions))
+
+        report = run_retention(max_age_days=1, batch_size=4, batch_pause=0)
+
+        assert report["purged"] == 6
+        assert len(writes) == 2
+        assert storage.get_session_count() == 0
+
+    def test_dry_run_deletes_nothing(self, storage_path):
+        """Test that a dry run only reports candidates."""
+        self._save("a", "2020-01-01T00:00:00")
+
+        report = run_retention(max_age_days=1, dry_run=True)
+
+        assert report["candidates"] == 1
+        assert report["purged"] == 0
+        assert storage.get_session_count() == 1
+
+
+class TestColdArchive:
+    """Tests for the compressed cold-archive tier."""
+
+    @pytest.mark.parametrize("codec", ["gzip", "lzma"])
+    def test_add_get_and_iterate(self, tmp_path, codec):
+        """Test that archived records can be read back one by one and in bulk."""
+        archive = ColdArchive(tmp_path / "archive", codec=codec, block_records=2)
+        records = [_record(f"s{i}", timestamp=f"2026-01-0{i + 1}T00:00:00") for i in range(5)]
+
+        assert archive.add(records) > 0
+        assert len(archive) == 5
+        assert archive.get("s3") == records[3]
+        assert archive.get("missing") is None
+        assert sorted(r["session_id"] for r in archive.iter_records(since="2026-01-02")) == [
+            "s1", "s2", "s3", "s4"
+        ]
+
+    def test_delete_and_compact(self, tmp_path):
+        """Test that deleted records are dropped from disk by compact()."""
+        archive = ColdArchive(tmp_path / "archive", block_records=2)
+        archive.add([_record(f"s{i}", answers=["x" * 200]) for i in range(4)])
+        archive.add([_record("other")])
+
+        assert archive.delete("s0")["session_id"] == "s0"
+        assert archive.delete("s0") is None
+        assert archive.compact() >= 0
+        assert archive.stats()["segments"] == 2
+        assert sorted(r["session_id"] for r in archive.iter_records()) == ["other", "s1", "s2", "s3"]
+        assert archive.get("s2")["session_id"] == "s2"
+
+    def test_delete_many(self, tmp_path):
+        """Test that a batch delete reads each block once and checks timestamps."""
+        archive = ColdArchive(tmp_path / "archive", block_records=2)
+        archive.add([_record(f"s{i}", timestamp="2026-01-01T00:00:00") for i in range(4)])
+
+        removed = archive.delete_many({"s0": "2026-01-01T00:00:00", "s1": "2026-01-01T00:00:00",
+                                       "s2": "2025-01-01T00:00:00"})
+
+        assert sorted(r["session_id"] for r in removed) == ["s0", "s1"]
+        assert sorted(r["session_id"] for r in archive.iter_records()) == ["s2", "s3"]
+
+    def test_archived_sessions_stay_readable(self, storage_path, monkeypatch):
+        """Test that moving sessions to the archive is transparent to callers."""
+        monkeypatch.setattr(Config, "STORAGE_BACKEND", "jsonl")
+        now = datetime(2026, 10, 17, 12, 0, 0)
+        storage.write_session_record(_record("old", timestamp="2026-01-01T00:00:00"))
+        storage.write_session_record(_record("new", timestamp="2026-10-17T00:00:00"))
+
+        report = storage.archive_cold_sessions(30, now=now)
+
+        assert report["archived"] == 1
+        assert storage.get_storage_backend().load("old") is None
+        assert storage.load_session("old")["timestamp"] == "2026-01-01T00:00:00"
+        assert storage.get_session_count() == 2
+        assert sorted(s["session_id"] for s in storage.iter_sessions()) == ["new", "old"]
+        assert set(storage.load_all_sessions()) == {"new", "old"}
+
+    def test_resave_and_delete_archived_session(self, storage_path):
+        """Test that saving or deleting an archived session updates both tiers."""
+        storage.write_session_record(_record("old", timestamp="2020-01-01T00:00:00"))
+        storage.archive_cold_sessions(30)
+
+        storage.write_session_record(_record("old", timestamp="2026-10-17T00:00:00"))
+        assert "old" not in storage.get_cold_archive()
+        assert storage.get_session_count() == 1
+
+        storage.archive_cold_sessions(1, now=datetime(2030, 1, 1))
+        assert storage.delete_session("old")
+        assert storage.load_session("old") is None
+        assert storage.get_session_count() == 0
@@ -10,7 +10,7 @@ from core.state import (
     get_session_id
 )
 from core.config import config
-from core.storage import delete_session, get_session_count
+from core.storage import delete_session, get_storage_metadata
 
 
 def render_sidebar() -> None:
@@ -89,8 +89,9 @@ def render_sidebar() -> None:
         
         # Storage status
         if config.ENABLE_STORAGE:
-            session_count = get_session_count()
-            st.caption(f"📦 {session_count} session(s) stored")
+            # Served from the metadata sidecar; no sessions are deserialized
+            storage_stats = get_storage_metadata()
+            st.caption(f"📦 {storage_stats['count']} session(s) stored")
         
         # Footer
         st.markdown("---")